@@ -1,65 +1,63 @@
 from flask import Flask
 import logging
-from logging.config import dictConfig
-from pathlib import Path
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from attendance_logger.services.hashing import HashingService
+from attendance_logger.services.throttling import LoginLimiter
+from attendance_logger.services.user_cache import UserCache
+from attendance_logger.services.mail_outbox import OutboxSender, send_outbox_command
+from attendance_logger.services.email_domains import DomainDeliverabilityCache
+from attendance_logger.services.log_pipeline import LoggingPipeline
+from attendance_logger.services.metrics import Metrics
+from attendance_logger.services.prices import PriceIndex
+from attendance_logger.services.blob_store import BlobStore
+from attendance_logger.services.contracts import ContractNumberAllocator
+from attendance_logger.services.query_budget import QueryInspector
+
 
-LOG_DIR_FILE_PATH = Path(__file__).parent.parent / "logs" / "flask.log"
-LOG_DIR_FILE_PATH.parent.mkdir(exist_ok=True)
-dictConfig(
-    {
-        "version": 1,
-        "formatters": {
-            "default": {
-                "format": "[%(asctime)s] %(levelname)s in %(module)s: %(message)s",
-            },
-            "simple": {
-                "format": "[%(asctime)s] %(levelname)s : %(message)s",
-            },
-        },
-        "handlers": {
-            "wsgi": {
-                "class": "logging.StreamHandler",
-                "stream": "ext://flask.logging.wsgi_errors_stream",
-                "formatter": "default",
-                # 'formatter': 'simple',
-            },
-            "file-rotating": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "formatter": "default",
-                "filename": LOG_DIR_FILE_PATH,
-                "mode": "a",
-                "maxBytes": 1_000_000,
-                "backupCount": 5,
-                "encoding": "utf-8",
-            },
-        },
-        "root": {
-            "level": "INFO",
-            "handlers": ["wsgi", "file-rotating"],
-        },
-    }
-)
 logger = logging.getLogger(__name__)
+log_pipeline = LoggingPipeline()
+metrics = Metrics()
+query_inspector = QueryInspector()
 migrate = Migrate()
 jwt = JWTManager()
+hashing = HashingService()
+login_limiter = LoginLimiter()
+user_cache = UserCache()
+outbox = OutboxSender()
+email_domains = DomainDeliverabilityCache()
+price_index = PriceIndex()
+blob_store = BlobStore()
+contract_numbers = ContractNumberAllocator()
 
 
-def create_app() -> Flask:
+def create_app(config_object: str = "attendance_logger.config.DevConfig") -> Flask:
     app = Flask(__name__)
-    app.config.from_object("attendance_logger.config.DevConfig")
-
-    from attendance_logger.models.database import (
-        db,
-        init_db,
-        add_roles,
-        add_first_user_as_admin,
+    app.config.from_object(config_object)
+    log_pipeline.init_app(app)
+
+    from attendance_logger.models.database import db
+    from attendance_logger.models.bootstrap import (
+        MIGRATIONS_DIR,
+        bootstrap,
+        bootstrap_command,
     )
+    from attendance_logger.services import statistics
 
     db.init_app(app)
-    migrate.init_app(app, db)
+    statistics.listen()
+    migrate.init_app(app, db, directory=str(MIGRATIONS_DIR), render_as_batch=True)
     jwt.init_app(app)
+    hashing.init_app(app)
+    login_limiter.init_app(app)
+    user_cache.init_app(app)
+    outbox.init_app(app)
+    email_domains.init_app(app)
+    price_index.init_app(app)
+    blob_store.init_app(app)
+    contract_numbers.init_app(app)
+    metrics.init_app(app)
+    query_inspector.init_app(app)
 
     from attendance_logger.models.db_models import User
 
@@ -87,16 +85,57 @@ def create_app() -> Flask:
         Return: return_description
         """
 
-        identity = jwt_data["sub"]
-        return db.session.scalar(db.select(User).where(User.id_ == identity))
+        return user_cache.load(jwt_data["sub"])
 
-    with app.app_context():
-        init_db()
-        add_roles()
-        add_first_user_as_admin()
+    if app.config.get("BOOTSTRAP_ON_STARTUP", True):
+        with app.app_context():
+            app.extensions["bootstrap"] = bootstrap()
 
     from attendance_logger.blueprints.auth import routes_v1
 
     app.register_blueprint(routes_v1.auth_pb)
 
+    from attendance_logger.blueprints.metrics.routes_v1 import metrics_bp
+
+    app.register_blueprint(metrics_bp)
+
+    from attendance_logger.blueprints.groups.routes_v1 import groups_bp
+    from attendance_logger.blueprints.lessons.routes_v1 import lessons_bp
+
+    app.register_blueprint(groups_bp)
+    app.register_blueprint(lessons_bp)
+
+    from attendance_logger.blueprints.statistics.routes_v1 import statistics_bp
+
+    app.register_blueprint(statistics_bp)
+
+    from attendance_logger.blueprints.clients.routes_v1 import clients_bp
+    from attendance_logger.blueprints.contracts.routes_v1 import contracts_bp
+
+    app.register_blueprint(clients_bp)
+    app.register_blueprint(contracts_bp)
+
+    from attendance_logger.blueprints.prices.routes_v1 import prices_bp
+
+    app.register_blueprint(prices_bp)
+
+    from attendance_logger.blueprints.common.decorators import policies_command
+
+    app.cli.add_command(policies_command)
+    app.cli.add_command(send_outbox_command)
+    app.cli.add_command(bootstrap_command)
+
+    from attendance_logger.services.lessons import materialize_lessons_command
+
+    app.cli.add_command(materialize_lessons_command)
+    app.cli.add_command(statistics.rebuild_rollups_command)
+
+    from attendance_logger.services.contracts import collect_blobs_command
+
+    app.cli.add_command(collect_blobs_command)
+
+    from attendance_logger.services.imports import import_clients_command
+
+    app.cli.add_command(import_clients_command)
+
     return app
@@ -1,22 +1,37 @@
 import secrets
+import click
 from flask.blueprints import Blueprint
 from flask import request, current_app as app, url_for
 import logging
+from attendance_logger import hashing, login_limiter, outbox, email_domains
 from attendance_logger.models.database import db
 from attendance_logger.models.db_models import EmailConfirmation, User
 from attendance_logger.utils import utils, auth, communication
+from attendance_logger.services.hashing import HashingPoolSaturated, calibrate
+from attendance_logger.services import confirmations
+from attendance_logger.services.query_budget import query_budget
+from attendance_logger.blueprints.common.decorators import (
+    LEVEL_CLAIM,
+    level_required,
+    permission_level,
+)
+from attendance_logger.models.models import PermissionLevels
 import datetime as dt
 from attendance_logger.schemes import responses, auth_v1
 from typing import Any
-from flask_jwt_extended import jwt_required, current_user, create_access_token
+from flask_jwt_extended import current_user, create_access_token
 from pydantic import ValidationError
 
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 auth_pb = Blueprint("auth", __name__, url_prefix="/api/v1/auth")
 
 
+@auth_pb.errorhandler(HashingPoolSaturated)
+def hashing_pool_saturated(_error: HashingPoolSaturated) -> tuple[dict, int, dict]:
+    return responses.ServiceUnavailable().model_dump(), 503, {"Retry-After": "1"}
+
+
 @auth_pb.route("/register", methods=("POST",))
 def register() -> tuple[dict, int]:
     try:
@@ -35,7 +50,7 @@ def register() -> tuple[dict, int]:
         error_counter += 1
     # check email
     email = form.email
-    if not auth.validate_email(email, check_deliverability=True):
+    if not email_domains.validate_email(email):
         response.messages["email"] = "Email failed validation."
         error_counter += 1
     else:
@@ -58,7 +73,7 @@ def register() -> tuple[dict, int]:
         new_user = User(
             username=username,
             email=email,
-            password=auth.hash_password(password),
+            password=hashing.hash(password),
             created_datetime=dt.datetime.now(dt.UTC),
             created_timezone=0,
         )
@@ -115,6 +130,12 @@ def request_confirmation(
                 ).model_dump(),
                 400,
             )
+        # cap outstanding tokens per email
+        if confirmations.count_outstanding(email_) >= app.config.get(
+            "EMAIL_CONFIRMATION_MAX_OUTSTANDING", 3
+        ):
+            logger.warning("Too many outstanding confirmations for %s", email_)
+            return responses.TooManyRequests().model_dump(), 429
         new_confirmation = EmailConfirmation(
             email=email_,
             token=secrets.token_urlsafe(32),
@@ -122,7 +143,6 @@ def request_confirmation(
             created_timezone=0,
         )
         db.session.add(new_confirmation)
-        db.session.commit()
         message = f"""
         Dear {username_},
         
@@ -137,6 +157,8 @@ def request_confirmation(
             subject="Email confirmation",
             body=message,
         )
+        db.session.commit()
+        outbox.wake()
     return responses.Ok().model_dump(), 200
 
 
@@ -209,7 +231,8 @@ def confirm_email(token: str) -> tuple[dict, int]:
 
 
 @auth_pb.route("/login", methods=("POST",))
-def login() -> tuple[dict, int]:
+@query_budget(5)
+def login() -> tuple[dict, int] | tuple[dict, int, dict]:
     try:
         form = auth_v1.Login.model_validate_json(request.get_data())
     except ValidationError:
@@ -217,6 +240,14 @@ def login() -> tuple[dict, int]:
             responses.BadRequestWithMessage(message="Missing fields.").model_dump(),
             400,
         )
+    # throttle brute force attempts before any database or hashing work
+    retry_after = login_limiter.hit(request.remote_addr, form.email)
+    if retry_after > 0:
+        return (
+            responses.TooManyRequests().model_dump(),
+            429,
+            {"Retry-After": str(retry_after)},
+        )
     # check email
     email = form.email
     if not auth.validate_email(email=email, check_deliverability=False):
@@ -240,7 +271,7 @@ def login() -> tuple[dict, int]:
                 400,
             )
         error_counter = 0
-        if not auth.check_password_hash(password, user.password):
+        if not hashing.verify(password, user.password):
             logger.warning("Invalid password for user %s", user.email)
             error_counter += 1
         # check is user active
@@ -272,16 +303,22 @@ def login() -> tuple[dict, int]:
         user.current_login_ip = request.remote_addr
         user.login_count += 1
         user.changed_at = utils.get_current_utc_datetime()
+        # upgrade hashes created with outdated Argon2 parameters
+        if hashing.needs_rehash(user.password):
+            user.password = hashing.hash(password)
+            logger.info("Password hash of user %s is upgraded", user.email)
         db.session.commit()
+        roles = [role.name for role in user.roles]
         access_token = create_access_token(
             identity=user,
-            additional_claims={"roles": [role.name for role in user.roles]},
+            additional_claims={"roles": roles, LEVEL_CLAIM: permission_level(roles)},
         )
     return responses.OkAccessToken(access_token=access_token).model_dump(), 200
 
 
 @auth_pb.route("/logout", methods=("GET",))
-@jwt_required()
+@query_budget(5)
+@level_required(PermissionLevels.USER)
 def logout() -> tuple[dict, int]:
     user = current_user
     user.last_login_at = user.current_login_at
@@ -289,3 +326,37 @@ def logout() -> tuple[dict, int]:
     db.session.commit()
     logger.info("User %s logged out successfully", current_user.email)
     return responses.Ok().model_dump(), 200
+
+
+@auth_pb.cli.command("calibrate-argon2")
+@click.option("--target-ms", default=150.0, help="Target verification latency.")
+@click.option(
+    "--percentile",
+    default=95,
+    type=click.IntRange(1, 100),
+    help="Percentile compared to the target.",
+)
+@click.option("--parallelism", default=4, help="Argon2 parallelism.")
+@click.option("--samples", default=10, help="Verifications per parameter set.")
+def calibrate_argon2(
+    target_ms: float, percentile: int, parallelism: int, samples: int
+) -> None:
+    """Benchmark this host and print Argon2 parameters for the target latency."""
+    result = calibrate(
+        target_ms=target_ms,
+        percentile=percentile,
+        parallelism=parallelism,
+        samples=samples,
+    )
+    click.echo(f"# p{percentile} verification latency: {result['latency_ms']:.1f} ms")
+    click.echo(f"ARGON2_MEMORY_COST={result['memory_cost']}")
+    click.echo(f"ARGON2_TIME_COST={result['time_cost']}")
+    click.echo(f"ARGON2_PARALLELISM={result['parallelism']}")
+
+
+@auth_pb.cli.command("purge-confirmations")
+@click.option("--batch-size", default=500, help="Rows deleted per transaction.")
+def purge_confirmations(batch_size: int) -> None:
+    """Delete expired email confirmation tokens."""
+    deleted = confirmations.purge_expired(batch_size=batch_size)
+    click.echo(f"Deleted {deleted} expired email confirmations.")
@@ -0,0 +1,138 @@
+import io
+
+from flask import current_app, request
+from flask.blueprints import Blueprint
+
+from attendance_logger.blueprints.common.decorators import level_required
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Client
+from attendance_logger.models.loaders import loader_profile
+from attendance_logger.models.models import PermissionLevels
+from attendance_logger.schemes import responses
+from attendance_logger.services.imports import ImportFormatError, ImportReport, import_clients
+from attendance_logger.services.query_budget import query_budget
+from attendance_logger.utils.pagination import PaginationError, Paginator
+
+
+clients_bp = Blueprint("clients", __name__, url_prefix="/api/v1/clients")
+# every sort has an index on (column, id_)
+clients_pages = Paginator(
+    {
+        "id": Client.id_,
+        "name": Client.name,
+        "child_name": Client.child_name,
+        "birthday": Client.childs_birthday,
+    },
+    tie_breaker=Client.id_,
+    default="+name",
+)
+
+
+@clients_bp.errorhandler(PaginationError)
+def invalid_page(error: PaginationError) -> tuple[dict, int]:
+    return responses.BadRequestWithMessage(message=str(error)).model_dump(), 400
+
+
+@clients_bp.errorhandler(ImportFormatError)
+def invalid_import(error: ImportFormatError) -> tuple[dict, int]:
+    return responses.BadRequestWithMessage(message=str(error)).model_dump(), 400
+
+
+@clients_bp.route("", methods=("GET",))
+@query_budget(3)
+@level_required(PermissionLevels.EMPLOYEE)
+def list_clients() -> tuple[dict, int]:
+    page = clients_pages.paginate(db.select(Client), request.args)
+    items = [
+        {
+            "id": client.id_,
+            "active": client.active,
+            "name": client.name,
+            "child_name": client.child_name,
+            "childs_birthday": client.childs_birthday,
+        }
+        for client in page.items
+    ]
+    return (
+        responses.OkClients(items=items, next=page.next_cursor, page=page.page).model_dump(
+            mode="json"
+        ),
+        200,
+    )
+
+
+@clients_bp.route("/<int:client_id>", methods=("GET",))
+@query_budget(4)
+@level_required(PermissionLevels.EMPLOYEE)
+def client_card(client_id: int) -> tuple[dict, int]:
+    client = db.session.scalar(
+        db.select(Client).where(Client.id_ == client_id).options(*loader_profile("client_card"))
+    )
+    if client is None:
+        return responses.NotFound().model_dump(), 404
+    contracts = [
+        {
+            "id": contract.id_,
+            "number": contract.number,
+            "active": contract.active,
+            "client_id": contract.client_id,
+            "signed_on": contract.signed_on,
+            "canceled": contract.canceled,
+        }
+        for contract in client.contracts
+    ]
+    subscriptions = [
+        {
+            "id": subscription.id_,
+            "total_visits": subscription.total_visits,
+            "open_visits": subscription.open_visits,
+            "full_price": subscription.full_price.value,
+            "discount_percent": subscription.discount_percent,
+            "start_date": subscription.start_date,
+            "end_date": subscription.end_date,
+            "freezed": subscription.freezed,
+        }
+        for subscription in client.subscriptions
+    ]
+    participations = [
+        {
+            "group_id": participation.group.id_,
+            "group_name": participation.group.name,
+            "start_date": participation.start_date,
+            "end_date": participation.end_date,
+        }
+        for participation in client.participations
+    ]
+    return (
+        responses.OkClient(
+            id=client.id_,
+            active=client.active,
+            name=client.name,
+            child_name=client.child_name,
+            childs_birthday=client.childs_birthday,
+            address=client.address,
+            phone=client.phone,
+            notes=client.notes,
+            contracts=contracts,
+            subscriptions=subscriptions,
+            participations=participations,
+        ).model_dump(mode="json"),
+        200,
+    )
+
+
+# no query budget, the number of statements grows with the batches of the file
+@clients_bp.route("/import", methods=("POST",))
+@level_required(PermissionLevels.MANAGER)
+def import_csv() -> tuple[dict, int]:
+    if request.mimetype != "text/csv":
+        return (
+            responses.BadRequestWithMessage(message="Send a CSV file as text/csv.").model_dump(),
+            400,
+        )
+    # the body is parsed as a stream, it's never held in memory as a whole
+    lines = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+    report = import_clients(
+        lines, ImportReport(max_errors=current_app.config.get("IMPORT_MAX_REPORTED_ERRORS", 1000))
+    )
+    return responses.OkImport(**report.as_dict()).model_dump(), 200
@@ -1,16 +1,51 @@
 from functools import wraps
 from typing import Any
+import click
+from flask import current_app as app
+from flask.cli import with_appcontext
 from flask_jwt_extended import jwt_required, get_jwt
+from attendance_logger.models.models import PermissionLevels, UserRoles, ROLE_LEVELS
 from attendance_logger.schemes import responses
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
+# name of the token claim holding the permission level of the user
+LEVEL_CLAIM = "lvl"
 
-def roles_required(*roles, optional: bool = False) -> Callable:
-    """A decorator to restrict protected endpoints with certain user roles stored
-    in the token. Roles "admin" and "owner" don't require to be explicite meansioned.
+
+def permission_level(roles: Iterable[str]) -> int:
+    """Compute the permission level of a confirmed user from its roles
 
     Keyword arguments:
-    roles: list[str] - list of accepted user roles,
+    roles: Iterable[str] - names of user roles
+
+    Return: int - highest permission level, at least the level of a user
+    """
+    return max(
+        (ROLE_LEVELS[UserRoles(role)] for role in roles if role in ROLE_LEVELS),
+        default=PermissionLevels.USER,
+    )
+
+
+def current_level() -> int:
+    """Permission level of the user of the current request, read from the token
+
+    Return: int - see models.PermissionLevels
+    """
+    claims = get_jwt()
+    user_level = claims.get(LEVEL_CLAIM)
+    if user_level is None:
+        # tokens issued before the level claim was introduced
+        user_level = permission_level(claims.get("roles", ()))
+    return user_level
+
+
+def level_required(level: int, optional: bool = False) -> Callable:
+    """A decorator to restrict protected endpoints to users with at least the given
+    permission level stored in the token. The requirement is compiled once, the
+    check on request is a single integer comparison.
+
+    Keyword arguments:
+    level: int - minimal permission level, see models.PermissionLevels
     optional: bool - same as flask_jwt_extended(optional)
 
     Return: Callable
@@ -20,15 +55,51 @@ def roles_required(*roles, optional: bool = False) -> Callable:
         @wraps(func)
         @jwt_required(optional=optional)
         def decorated_function(*args, **kwargs) -> Any:
-            claims = get_jwt()["roles"]
-            roles_ = list(roles)
-            roles_.extend(("admin", "owner"))
-            roles_ = frozenset(roles_)
-            check_roles = [role for role in claims if role in roles_]
-            if not optional and len(check_roles) == 0:
+            if not optional and current_level() < level:
                 return responses.Forbidden().model_dump(), 403
             return func(*args, **kwargs)
 
+        decorated_function.required_level = PermissionLevels(level)
         return decorated_function
 
     return decorator
+
+
+def roles_required(*roles, optional: bool = False) -> Callable:
+    """A decorator to restrict protected endpoints with certain user roles stored
+    in the token. Roles follow the permission hierarchy, so every role with a higher
+    permission level than the lowest given role is accepted as well.
+
+    Keyword arguments:
+    roles: list[str] - list of accepted user roles,
+    optional: bool - same as flask_jwt_extended(optional)
+
+    Return: Callable
+    """
+    level = min(
+        (ROLE_LEVELS[UserRoles(role)] for role in roles),
+        default=PermissionLevels.USER,
+    )
+    return level_required(level, optional=optional)
+
+
+def policy_table() -> list[tuple[str, str, str, str]]:
+    """Collect compiled permission levels of all registered routes
+
+    Return: list[tuple[str, str, str, str]] - rule, methods, endpoint and level
+    """
+    table = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        view = app.view_functions[rule.endpoint]
+        level = getattr(view, "required_level", PermissionLevels.UNAUTHORIZED)
+        methods = ",".join(sorted(rule.methods - {"HEAD", "OPTIONS"}))
+        table.append((rule.rule, methods, rule.endpoint, f"{level.value} {level.name}"))
+    return table
+
+
+@click.command("policies")
+@with_appcontext
+def policies_command() -> None:
+    """Print the compiled route to permission level table."""
+    for row in policy_table():
+        click.echo("  ".join(row))
@@ -0,0 +1,119 @@
+import datetime as dt
+
+from flask import Response, request, send_file
+from flask.blueprints import Blueprint
+
+from attendance_logger import blob_store
+from attendance_logger.blueprints.common.decorators import level_required
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Contract
+from attendance_logger.models.models import PermissionLevels
+from attendance_logger.schemes import responses
+from attendance_logger.services import contracts
+from attendance_logger.services.blob_store import BlobTooLarge
+from attendance_logger.services.query_budget import query_budget
+from attendance_logger.utils.pagination import PaginationError, Paginator
+
+
+contracts_bp = Blueprint("contracts", __name__, url_prefix="/api/v1/contracts")
+# every sort has an index, number is unique
+contracts_pages = Paginator(
+    {"id": Contract.id_, "number": Contract.number, "client": Contract.client_id},
+    tie_breaker=Contract.id_,
+    default="-id",
+)
+# accepted mime types of contract documents
+DOCUMENT_TYPES = ("application/pdf",)
+
+
+@contracts_bp.errorhandler(PaginationError)
+def invalid_page(error: PaginationError) -> tuple[dict, int]:
+    return responses.BadRequestWithMessage(message=str(error)).model_dump(), 400
+
+
+@contracts_bp.errorhandler(BlobTooLarge)
+def document_too_large(error: BlobTooLarge) -> tuple[dict, int]:
+    return responses.PayloadTooLarge(message=str(error)).model_dump(), 413
+
+
+@contracts_bp.route("", methods=("GET",))
+@query_budget(3)
+@level_required(PermissionLevels.EMPLOYEE)
+def list_contracts() -> tuple[dict, int]:
+    query = db.select(Contract)
+    try:
+        if "client" in request.args:
+            query = query.where(Contract.client_id == int(request.args["client"]))
+    except ValueError:
+        raise PaginationError("client must be an integer.") from None
+    try:
+        if "date_from" in request.args:
+            query = query.where(
+                Contract.signed_on >= dt.date.fromisoformat(request.args["date_from"])
+            )
+        if "date_untill" in request.args:
+            query = query.where(
+                Contract.signed_on <= dt.date.fromisoformat(request.args["date_untill"])
+            )
+    except ValueError:
+        raise PaginationError("Dates must look like YYYY-MM-DD.") from None
+    page = contracts_pages.paginate(query, request.args)
+    items = [
+        {
+            "id": contract.id_,
+            "number": contract.number,
+            "active": contract.active,
+            "client_id": contract.client_id,
+            "signed_on": contract.signed_on,
+            "canceled": contract.canceled,
+        }
+        for contract in page.items
+    ]
+    return (
+        responses.OkContracts(items=items, next=page.next_cursor, page=page.page).model_dump(
+            mode="json"
+        ),
+        200,
+    )
+
+
+@contracts_bp.route("/<int:contract_id>/documents/<any(signed, canceled):kind>", methods=("PUT",))
+@query_budget(4)
+@level_required(PermissionLevels.EMPLOYEE)
+def upload_document(contract_id: int, kind: str) -> tuple[dict, int]:
+    if request.mimetype not in DOCUMENT_TYPES:
+        return (
+            responses.BadRequestWithMessage(message="Documents must be PDF files.").model_dump(),
+            400,
+        )
+    contract = db.session.get(Contract, contract_id)
+    if contract is None:
+        return responses.NotFound().model_dump(), 404
+    # the body is streamed to disk in chunks
+    blob = blob_store.put_stream(request.stream)
+    contracts.attach_document(contract, kind, blob, request.mimetype)
+    db.session.commit()
+    return (
+        responses.OkDocument(digest=blob.digest, size=blob.size, mime=request.mimetype).model_dump(),
+        200,
+    )
+
+
+@contracts_bp.route("/<int:contract_id>/documents/<any(signed, canceled):kind>", methods=("GET",))
+@query_budget(3)
+@level_required(PermissionLevels.EMPLOYEE)
+def download_document(contract_id: int, kind: str) -> Response | tuple[dict, int]:
+    document = db.session.execute(
+        db.select(*contracts.document_columns(kind)).where(Contract.id_ == contract_id)
+    ).one_or_none()
+    if document is None or document[0] is None or not blob_store.exists(document[0]):
+        return responses.NotFound().model_dump(), 404
+    digest, _size, mime = document
+    # the digest identifies the content, Range and If-None-Match are answered by werkzeug
+    return send_file(
+        blob_store.path(digest),
+        mimetype=mime,
+        download_name=f"contract-{contract_id}-{kind}.pdf",
+        etag=digest,
+        conditional=True,
+    )
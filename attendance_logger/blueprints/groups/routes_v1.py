@@ -0,0 +1,62 @@
+from flask import request
+from flask.blueprints import Blueprint
+
+from attendance_logger.blueprints.common.decorators import level_required
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Group
+from attendance_logger.models.loaders import loader_profile
+from attendance_logger.models.models import PermissionLevels
+from attendance_logger.schemes import responses
+from attendance_logger.services.query_budget import query_budget
+from attendance_logger.utils.pagination import PaginationError, Paginator
+
+
+groups_bp = Blueprint("groups", __name__, url_prefix="/api/v1/groups")
+groups_pages = Paginator({"id": Group.id_}, tie_breaker=Group.id_, default="+id")
+
+
+@groups_bp.errorhandler(PaginationError)
+def invalid_page(error: PaginationError) -> tuple[dict, int]:
+    return responses.BadRequestWithMessage(message=str(error)).model_dump(), 400
+
+
+@groups_bp.route("", methods=("GET",))
+@query_budget(3)
+@level_required(PermissionLevels.EMPLOYEE)
+def list_groups() -> tuple[dict, int]:
+    page = groups_pages.paginate(
+        db.select(Group).options(*loader_profile("group_list")), request.args
+    )
+    items = [
+        {
+            "id": group.id_,
+            "name": group.name,
+            "active_from": group.active_from,
+            "active_until": group.active_until,
+            "location": group.location and (group.location.name or group.location.address),
+            "schedules": [
+                {
+                    "weekday": schedule.weekday,
+                    "start_time_utc": schedule.start_time_utc,
+                    "end_time_utc": schedule.end_time_utc,
+                }
+                for schedule in group.schedules
+            ],
+            "teachers": [
+                {
+                    "user_id": teacher.user.id_,
+                    "username": teacher.user.username,
+                    "start_date": teacher.start_date,
+                    "end_date": teacher.end_date,
+                }
+                for teacher in group.teachers
+            ],
+        }
+        for group in page.items
+    ]
+    return (
+        responses.OkGroups(items=items, next=page.next_cursor, page=page.page).model_dump(
+            mode="json"
+        ),
+        200,
+    )
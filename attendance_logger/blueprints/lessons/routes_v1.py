@@ -0,0 +1,93 @@
+from flask import request
+from flask.blueprints import Blueprint
+from pydantic import ValidationError
+
+from attendance_logger.blueprints.common.decorators import level_required
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Lesson
+from attendance_logger.models.loaders import loader_profile
+from attendance_logger.models.models import PermissionLevels
+from attendance_logger.schemes import lessons_v1, responses
+from attendance_logger.services.attendance import AttendanceError, apply_attendance
+from attendance_logger.services.query_budget import query_budget
+
+
+lessons_bp = Blueprint("lessons", __name__, url_prefix="/api/v1/lessons")
+
+
+@lessons_bp.errorhandler(AttendanceError)
+def invalid_attendance(error: AttendanceError) -> tuple[dict, int]:
+    return responses.BadRequestWithMessages(messages=error.messages).model_dump(), 400
+
+
+@lessons_bp.route("/<int:lesson_id>/attendance", methods=("GET",))
+@query_budget(3)
+@level_required(PermissionLevels.EMPLOYEE)
+def attendance_sheet(lesson_id: int) -> tuple[dict, int]:
+    lesson = db.session.scalar(
+        db.select(Lesson)
+        .where(Lesson.id_ == lesson_id)
+        .options(*loader_profile("lesson_attendance_sheet"))
+    )
+    if lesson is None:
+        return responses.NotFound().model_dump(), 404
+    visitors = [
+        {
+            "client_id": visitor.subscription.client.id_,
+            "name": visitor.subscription.client.name,
+            "child_name": visitor.subscription.client.child_name,
+            "subscription_id": visitor.subscription_id,
+            "state": visitor.state,
+        }
+        for visitor in lesson.visitors
+    ]
+    teachers = [
+        {"user_id": teacher.user.id_, "username": teacher.user.username, "state": teacher.state}
+        for teacher in lesson.teachers
+    ]
+    location = lesson.location and (lesson.location.name or lesson.location.address)
+    return (
+        responses.OkLessonSheet(
+            id=lesson.id_,
+            state=lesson.state,
+            group_id=lesson.group.id_,
+            group_name=lesson.group.name,
+            location=location,
+            start_datetime_utc=lesson.start_datetime_utc,
+            end_datetime_utc=lesson.end_datetime_utc,
+            visitors=sorted(visitors, key=lambda visitor: visitor["child_name"]),
+            teachers=teachers,
+        ).model_dump(mode="json"),
+        200,
+    )
+
+
+@lessons_bp.route("/<int:lesson_id>/attendance", methods=("PUT",))
+@query_budget(13)
+@level_required(PermissionLevels.EMPLOYEE)
+def update_attendance(lesson_id: int) -> tuple[dict, int]:
+    try:
+        form = lessons_v1.Attendance.model_validate_json(request.get_data())
+    except ValidationError:
+        return (
+            responses.BadRequestWithMessage(message="Invalid attendance.").model_dump(),
+            400,
+        )
+    sheet = lessons_v1.LessonAttendance(lesson_id=lesson_id, **dict(form))
+    result = apply_attendance([sheet])
+    return responses.OkAttendance(**result).model_dump(), 200
+
+
+@lessons_bp.route("/attendance", methods=("PUT",))
+@query_budget(13)
+@level_required(PermissionLevels.EMPLOYEE)
+def update_attendance_batch() -> tuple[dict, int]:
+    try:
+        form = lessons_v1.AttendanceBatch.model_validate_json(request.get_data())
+    except ValidationError:
+        return (
+            responses.BadRequestWithMessage(message="Invalid attendance.").model_dump(),
+            400,
+        )
+    result = apply_attendance(form.lessons)
+    return responses.OkAttendance(**result).model_dump(), 200
@@ -0,0 +1,15 @@
+from flask import Response
+from flask.blueprints import Blueprint
+
+from attendance_logger import metrics
+from attendance_logger.blueprints.common.decorators import level_required
+from attendance_logger.models.models import PermissionLevels
+
+
+metrics_bp = Blueprint("metrics", __name__, url_prefix="/api/v1/metrics")
+
+
+@metrics_bp.route("", methods=("GET",))
+@level_required(PermissionLevels.ADMIN)
+def show_metrics() -> Response:
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
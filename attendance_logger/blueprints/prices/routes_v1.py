@@ -0,0 +1,51 @@
+from flask import Response, request
+from flask.blueprints import Blueprint
+
+from attendance_logger import price_index
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Price
+from attendance_logger.schemes import responses
+from attendance_logger.services.query_budget import query_budget
+from attendance_logger.utils.pagination import PaginationError, Paginator
+
+
+prices_bp = Blueprint("prices", __name__, url_prefix="/api/v1/prices")
+prices_pages = Paginator(
+    {"id": Price.id_, "category": Price.type_, "start": Price.start_datetime_utc},
+    tie_breaker=Price.id_,
+    default="+category,+start",
+)
+PAGE_PARAMETERS = ("page", "cursor", "sort", "limit")
+
+
+@prices_bp.errorhandler(PaginationError)
+def invalid_page(error: PaginationError) -> tuple[dict, int]:
+    return responses.BadRequestWithMessage(message=str(error)).model_dump(), 400
+
+
+@prices_bp.route("", methods=("GET",))
+@query_budget(1)
+def list_prices() -> Response | tuple[dict, int]:
+    if any(name in request.args for name in PAGE_PARAMETERS):
+        page = prices_pages.paginate(db.select(Price), request.args)
+        items = [
+            {
+                "id": price.id_,
+                "category": price.type_,
+                "value": price.value,
+                "start_datetime_utc": price.start_datetime_utc,
+                "end_datetime_utc": price.end_datetime_utc,
+                "notes": price.notes,
+            }
+            for price in page.items
+        ]
+        return (
+            responses.OkPrices(items=items, next=page.next_cursor, page=page.page).model_dump(
+                mode="json"
+            ),
+            200,
+        )
+    # serialized once per index build, clients revalidate with the ETag
+    response = Response(price_index.listing(), mimetype="application/json")
+    response.add_etag()
+    return response.make_conditional(request)
@@ -0,0 +1,123 @@
+import datetime as dt
+
+from flask import request
+from flask.blueprints import Blueprint
+from flask_jwt_extended import current_user
+
+from attendance_logger.blueprints.common.decorators import current_level, level_required
+from attendance_logger.models.models import PermissionLevels
+from attendance_logger.schemes import responses
+from attendance_logger.services import analytics, statistics
+from attendance_logger.services.query_budget import query_budget
+
+
+statistics_bp = Blueprint("statistics", __name__, url_prefix="/api/v1/statistics")
+# weeks returned if the request has no date range
+DEFAULT_WEEKS = 12
+
+
+class InvalidRange(ValueError):
+    pass
+
+
+@statistics_bp.errorhandler(InvalidRange)
+def invalid_range(error: InvalidRange) -> tuple[dict, int]:
+    return responses.BadRequestWithMessage(message=str(error)).model_dump(), 400
+
+
+@statistics_bp.errorhandler(analytics.AnalyticsUnavailable)
+def analytics_unavailable(error: analytics.AnalyticsUnavailable) -> tuple[dict, int]:
+    return responses.ServiceUnavailable(message=str(error)).model_dump(), 503
+
+
+def _date_range() -> tuple[dt.date, dt.date]:
+    """Dates of the optional `from` and `until` ISO parameters"""
+    try:
+        until = dt.date.fromisoformat(request.args.get("until", dt.date.today().isoformat()))
+        default_from = until - dt.timedelta(weeks=DEFAULT_WEEKS - 1)
+        first = dt.date.fromisoformat(request.args.get("from", default_from.isoformat()))
+    except ValueError:
+        raise InvalidRange("Dates must look like YYYY-MM-DD.") from None
+    if first > until:
+        raise InvalidRange("from must not be after until.")
+    return first, until
+
+
+def _weekly(**filters) -> tuple[dict, int]:
+    weeks = statistics.weekly(*_date_range(), **filters)
+    return responses.OkWeeklyStatistics(weeks=weeks).model_dump(mode="json"), 200
+
+
+def _totals(by: str) -> tuple[dict, int]:
+    items = statistics.totals(by, *_date_range())
+    return responses.OkTotalStatistics(items=items).model_dump(mode="json"), 200
+
+
+@statistics_bp.route("", methods=("GET",))
+@query_budget(5)
+@level_required(PermissionLevels.HEAD_MANAGER)
+def overview() -> tuple[dict, int]:
+    return _weekly()
+
+
+@statistics_bp.route("/employees", methods=("GET",))
+@query_budget(5)
+@level_required(PermissionLevels.MANAGER)
+def employees() -> tuple[dict, int]:
+    return _totals("user_id")
+
+
+@statistics_bp.route("/employees/<int:user_id>", methods=("GET",))
+@query_budget(5)
+@level_required(PermissionLevels.EMPLOYEE)
+def employee(user_id: int) -> tuple[dict, int]:
+    # employees see their own statistics only
+    if current_level() < PermissionLevels.MANAGER and current_user.id_ != user_id:
+        return responses.Forbidden().model_dump(), 403
+    return _weekly(user_id=user_id)
+
+
+@statistics_bp.route("/locations", methods=("GET",))
+@query_budget(5)
+@level_required(PermissionLevels.HEAD_MANAGER)
+def locations() -> tuple[dict, int]:
+    return _totals("location_id")
+
+
+@statistics_bp.route("/locations/<int:location_id>", methods=("GET",))
+@query_budget(5)
+@level_required(PermissionLevels.HEAD_MANAGER)
+def location(location_id: int) -> tuple[dict, int]:
+    return _weekly(location_id=location_id)
+
+
+@statistics_bp.route("/groups", methods=("GET",))
+@query_budget(5)
+@level_required(PermissionLevels.MANAGER)
+def groups() -> tuple[dict, int]:
+    return _totals("group_id")
+
+
+@statistics_bp.route("/groups/<int:group_id>", methods=("GET",))
+@query_budget(5)
+@level_required(PermissionLevels.EMPLOYEE)
+def group(group_id: int) -> tuple[dict, int]:
+    return _weekly(group_id=group_id)
+
+
+@statistics_bp.route("/attendance", methods=("GET",))
+@query_budget(3)
+@level_required(PermissionLevels.MANAGER)
+def attendance_percentiles() -> tuple[dict, int]:
+    result = analytics.AttendanceAnalytics(analytics.load_visits(*_date_range()))
+    items = result.group_percentiles()
+    return responses.OkGroupPercentiles(items=items).model_dump(mode="json"), 200
+
+
+@statistics_bp.route("/groups/<int:group_id>/attendance", methods=("GET",))
+@query_budget(3)
+@level_required(PermissionLevels.EMPLOYEE)
+def group_attendance(group_id: int) -> tuple[dict, int]:
+    visits = analytics.load_visits(*_date_range(), group_ids=[group_id])
+    items = analytics.AttendanceAnalytics(visits).children()
+    return responses.OkChildAttendance(items=items).model_dump(mode="json"), 200
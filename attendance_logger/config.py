@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 
 try:
     from dotenv import load_dotenv
@@ -17,6 +18,29 @@ class Config:
     SERVER_NAME = os.environ["SERVER_NAME"]
     SECRET_KEY = os.environ["SECRET_KEY"]
 
+    # Logging configuration
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    # per-module levels, e.g. "attendance_logger.blueprints=DEBUG,werkzeug=WARNING"
+    LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+    # "text" or "json" (one object per line with request id, user id and latency)
+    LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+    # rotating log file, disabled if empty
+    LOG_FILE = os.environ.get(
+        "LOG_FILE", str(Path(__file__).parent.parent / "logs" / "flask.log")
+    )
+    # records are dropped instead of blocking requests when the queue is full
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10_000))
+    # "drop_new" or "drop_old"
+    LOG_QUEUE_OVERFLOW = os.environ.get("LOG_QUEUE_OVERFLOW", "drop_new")
+
+    # SQL query budget and N+1 detection: "off", "warn" or "raise"
+    QUERY_BUDGET_MODE = os.environ.get("QUERY_BUDGET_MODE", "off")
+    # executions of one statement shape per request reported as N+1
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get("QUERY_REPEAT_THRESHOLD", 5))
+
+    # raise on lazy loads not planned by a loader profile, see models/loaders.py
+    LOADER_STRICT = os.environ.get("LOADER_STRICT", "false").lower() == "true"
+
     # Flask JWT extended configuration
     JWT_SECRET_KEY = os.environ["JWT_SECRET_KEY"]
 
@@ -25,6 +49,80 @@ class Config:
     EMAIL_SMTP_SERVER = os.environ["EMAIL_SMTP_SERVER"]
     EMAIL_SMTP_PORT = int(os.environ.get("EMAIL_SMTP_PORT"))
     EMAIL_PASSWORD = os.environ["EMAIL_PASSWORD"]
+    EMAIL_SMTP_SSL = os.environ.get("EMAIL_SMTP_SSL", "true").lower() == "true"
+    EMAIL_SMTP_TIMEOUT = float(os.environ.get("EMAIL_SMTP_TIMEOUT", 10))
+    # run the outbox sender as thread of this process, enable in one worker only
+    EMAIL_OUTBOX_WORKER = os.environ.get("EMAIL_OUTBOX_WORKER", "false").lower() == "true"
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", 50))
+    EMAIL_OUTBOX_POLL_INTERVAL = float(os.environ.get("EMAIL_OUTBOX_POLL_INTERVAL", 5))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 8))
+    # seconds before the first retry, doubled for every further attempt
+    EMAIL_OUTBOX_BACKOFF = float(os.environ.get("EMAIL_OUTBOX_BACKOFF", 30))
+    # Email deliverability checks on registration
+    # import path of the resolver, e.g.
+    # "attendance_logger.services.email_domains:syntax_only_resolver" for offline use
+    EMAIL_DNS_RESOLVER = os.environ.get("EMAIL_DNS_RESOLVER", "")
+    EMAIL_DNS_TIMEOUT = float(os.environ.get("EMAIL_DNS_TIMEOUT", 2))
+    EMAIL_DNS_CACHE_SIZE = int(os.environ.get("EMAIL_DNS_CACHE_SIZE", 10_000))
+    # seconds to cache deliverable, undeliverable and unknown domains
+    EMAIL_DNS_POSITIVE_TTL = float(os.environ.get("EMAIL_DNS_POSITIVE_TTL", 86_400))
+    EMAIL_DNS_NEGATIVE_TTL = float(os.environ.get("EMAIL_DNS_NEGATIVE_TTL", 600))
+    EMAIL_DNS_UNKNOWN_TTL = float(os.environ.get("EMAIL_DNS_UNKNOWN_TTL", 60))
+    # unconfirmed and not expired confirmation tokens per email
+    EMAIL_CONFIRMATION_MAX_OUTSTANDING = int(
+        os.environ.get("EMAIL_CONFIRMATION_MAX_OUTSTANDING", 3)
+    )
+
+    # Password hashing configuration
+    # "thread" or "process"
+    HASHING_EXECUTOR = os.environ.get("HASHING_EXECUTOR", "thread")
+    # every concurrent Argon2 job allocates its memory cost (64 MiB by default)
+    HASHING_MAX_WORKERS = int(os.environ.get("HASHING_MAX_WORKERS", 2))
+    HASHING_MAX_QUEUE = int(os.environ.get("HASHING_MAX_QUEUE", 8))
+    # seconds to wait for a free slot before answering with 503
+    HASHING_QUEUE_TIMEOUT = float(os.environ.get("HASHING_QUEUE_TIMEOUT", 0.5))
+    # Argon2 parameters, see `flask auth calibrate-argon2`
+    ARGON2_MEMORY_COST = int(os.environ.get("ARGON2_MEMORY_COST", 65536))
+    ARGON2_TIME_COST = int(os.environ.get("ARGON2_TIME_COST", 3))
+    ARGON2_PARALLELISM = int(os.environ.get("ARGON2_PARALLELISM", 4))
+
+    # Login throttling configuration
+    # attempts per window in seconds
+    LOGIN_LIMIT_PER_IP = int(os.environ.get("LOGIN_LIMIT_PER_IP", 100))
+    LOGIN_LIMIT_IP_WINDOW = int(os.environ.get("LOGIN_LIMIT_IP_WINDOW", 60))
+    LOGIN_LIMIT_PER_EMAIL = int(os.environ.get("LOGIN_LIMIT_PER_EMAIL", 10))
+    LOGIN_LIMIT_EMAIL_WINDOW = int(os.environ.get("LOGIN_LIMIT_EMAIL_WINDOW", 300))
+    # SQLite file shared by worker processes, per-process memory if empty
+    LOGIN_LIMIT_SQLITE_PATH = os.environ.get("LOGIN_LIMIT_SQLITE_PATH", "")
+
+    # User cache for the JWT user lookup
+    USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 1024))
+    # seconds, bounds staleness of changes made by other worker processes
+    USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", 30))
+
+    # Price index and the cached price listing
+    # seconds, bounds staleness of changes made by other worker processes
+    PRICE_CACHE_TTL = float(os.environ.get("PRICE_CACHE_TTL", 60))
+
+    # Contract documents, content-addressed files
+    BLOB_STORE_PATH = os.environ.get(
+        "BLOB_STORE_PATH", str(Path(__file__).parent.parent / "blobs")
+    )
+    # bytes per document, uploads are streamed in chunks of BLOB_CHUNK_SIZE
+    BLOB_MAX_SIZE = int(os.environ.get("BLOB_MAX_SIZE", 20 * 1024 * 1024))
+    BLOB_CHUNK_SIZE = int(os.environ.get("BLOB_CHUNK_SIZE", 64 * 1024))
+
+    # Contract numbers: "sequence" from a counter per year or "random"
+    CONTRACT_NUMBER_MODE = os.environ.get("CONTRACT_NUMBER_MODE", "sequence")
+    # format of sequence numbers with the fields year and number
+    CONTRACT_NUMBER_FORMAT = os.environ.get("CONTRACT_NUMBER_FORMAT", "{year}/{number:06d}")
+    # numbers reserved per process with one statement, unused ones are skipped
+    CONTRACT_NUMBER_BLOCK_SIZE = int(os.environ.get("CONTRACT_NUMBER_BLOCK_SIZE", 20))
+
+    # CSV import of clients, rows written and committed per batch
+    IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 500))
+    # errors returned by the upload endpoint, the counts include all of them
+    IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get("IMPORT_MAX_REPORTED_ERRORS", 1000))
 
 
 class DevConfig(Config):
@@ -40,6 +138,15 @@ class DevConfig(Config):
     APP_ADMIN_EMAIL = os.environ["ADMIN_EMAIL"]
     APP_ADMIN_DEFAULT_PASSWORD = os.environ["ADMIN_PASSWORD"]
 
+    # Bootstrap: migrations and seed data
+    BOOTSTRAP_ON_STARTUP = (
+        os.environ.get("BOOTSTRAP_ON_STARTUP", "true").lower() == "true"
+    )
+    BOOTSTRAP_TIME_BUDGET_MS = float(os.environ.get("BOOTSTRAP_TIME_BUDGET_MS", 1000))
+
+    # Query budget checks of request handlers
+    QUERY_BUDGET_MODE = os.environ.get("QUERY_BUDGET_MODE", "warn")
+
     # Faker configuration
     FAKER_LOCALE = "ru_RU"
 
@@ -0,0 +1,203 @@
+import functools
+import logging
+import time
+from pathlib import Path
+
+import click
+import flask_migrate
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from alembic.script import ScriptDirectory
+from flask import current_app as app
+from flask.cli import with_appcontext
+from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
+
+from attendance_logger.models.database import db
+from attendance_logger.models.models import UserRoles
+from attendance_logger.utils import utils
+
+
+logger = logging.getLogger(__name__)
+MIGRATIONS_DIR = Path(__file__).parent.parent.parent / "migrations"
+# revision matching the schema of databases created by db.create_all()
+INITIAL_REVISION = "2b1f0c3a9d47"
+# increase after changing the seed data below
+SEED_VERSION = 1
+ROLE_DESCRIPTIONS = {
+    UserRoles.USER: "Regular user with limited access",
+    UserRoles.EMPLOYEE: "Employee with limited access",
+    UserRoles.MANAGER: "Manager with elevated access",
+    UserRoles.HEAD_MANAGER: "Head Manager with broad access",
+    UserRoles.OWNER: "Owner of the service with full access",
+    UserRoles.ADMIN: "Administrator with full access",
+}
+
+
+def bootstrap(force: bool = False) -> dict:
+    """Bring schema and seed data up to date. If the version marker stored in the
+    database matches, a single query is executed and nothing else is done.
+
+    Keyword arguments:
+    force: bool - run all steps even if the marker matches
+
+    Return: dict - "skipped": bool, "elapsed_ms": float, "version": str
+    """
+    start = time.perf_counter()
+    version = current_version()
+    skipped = not force and stored_version() == version
+    if not skipped:
+        upgrade_schema()
+        seed_roles()
+        add_first_user_as_admin()
+        store_version(version)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    budget_ms = app.config.get("BOOTSTRAP_TIME_BUDGET_MS", 1000)
+    if elapsed_ms > budget_ms:
+        logger.warning(
+            "Bootstrap took %.1f ms, budget is %.1f ms", elapsed_ms, budget_ms
+        )
+    logger.debug(
+        "Bootstrap %s in %.1f ms", "skipped" if skipped else "done", elapsed_ms
+    )
+    return {"skipped": skipped, "elapsed_ms": elapsed_ms, "version": version}
+
+
+@functools.cache
+def current_version() -> str:
+    """Version marker of this code base: Alembic head and seed version
+
+    Return: str
+    """
+    heads = ScriptDirectory(str(MIGRATIONS_DIR)).get_heads()
+    return f"{','.join(sorted(heads))}:{SEED_VERSION}"
+
+
+def stored_version() -> str | None:
+    """Read version marker from the database
+
+    Return: str | None - None if the database isn't bootstrapped yet
+    """
+    from attendance_logger.models.db_models import BootstrapState
+
+    try:
+        return db.session.scalar(
+            db.select(BootstrapState.value).where(BootstrapState.key == "version")
+        )
+    except SQLAlchemyError:
+        db.session.rollback()
+        return None
+
+
+def store_version(version: str) -> None:
+    """Write version marker to the database
+
+    Keyword arguments:
+    version: str - see current_version
+    """
+    from attendance_logger.models.db_models import BootstrapState
+
+    db.session.merge(
+        BootstrapState(
+            key="version",
+            value=version,
+            changed_datetime=utils.get_current_utc_datetime(),
+        )
+    )
+    db.session.commit()
+
+
+def upgrade_schema() -> None:
+    """Apply Alembic migrations. Databases created by db.create_all() before
+    migrations were introduced get the missing tables and indexes of the
+    initial revision and are stamped with it first.
+    """
+    tables = inspect(db.engine).get_table_names()
+    if "alembic_version" not in tables and "users" in tables:
+        logger.info("Stamping database created without migrations.")
+        create_initial_schema()
+        flask_migrate.stamp(directory=str(MIGRATIONS_DIR), revision=INITIAL_REVISION)
+    flask_migrate.upgrade(directory=str(MIGRATIONS_DIR))
+
+
+def create_initial_schema() -> None:
+    """Run the DDL of INITIAL_REVISION, skipping tables and indexes that
+    exist. Objects of the current models are left to later migrations, they
+    would collide with them.
+    """
+    script = ScriptDirectory(str(MIGRATIONS_DIR)).get_revision(INITIAL_REVISION)
+    with db.engine.begin() as connection:
+        inspector = inspect(connection)
+        tables = set(inspector.get_table_names())
+        indexes = {
+            index["name"] for table in tables for index in inspector.get_indexes(table)
+        }
+        context = MigrationContext.configure(connection)
+        impl = context.impl
+        create_table, create_index = impl.create_table, impl.create_index
+        impl.create_table = lambda table, **kw: (
+            None if table.name in tables else create_table(table, **kw)
+        )
+        impl.create_index = lambda index, **kw: (
+            None if index.name in indexes else create_index(index, **kw)
+        )
+        with Operations.context(context):
+            script.module.upgrade()
+
+
+def seed_roles() -> None:
+    """Insert missing user roles with one query and one bulk insert"""
+    from attendance_logger.models.db_models import UserRole
+
+    existing = set(
+        db.session.scalars(
+            db.select(UserRole.name).where(
+                UserRole.name.in_([role.value for role in ROLE_DESCRIPTIONS])
+            )
+        )
+    )
+    missing = [
+        {"name": role.value, "description": description}
+        for role, description in ROLE_DESCRIPTIONS.items()
+        if role.value not in existing
+    ]
+    if missing:
+        db.session.execute(db.insert(UserRole), missing)
+        db.session.commit()
+        logger.debug("Added missing roles to the database")
+    else:
+        logger.debug("All roles already exist in the database")
+
+
+def add_first_user_as_admin() -> None:
+    from attendance_logger.models.db_models import User, UserRole
+    from attendance_logger.utils.auth import hash_password
+
+    if db.session.scalar(db.select(User.id_).limit(1)) is None:
+        logger.info("List of users is empty. Adding first user.")
+        data = app.config.get_namespace("APP_ADMIN")
+        admin = User(
+            username="admin",
+            email=data["_email"],
+            password=hash_password(data["_default_password"]),
+            created_datetime=utils.get_current_utc_datetime(),
+            created_timezone=0,
+            confirmed_at_utc=utils.get_current_utc_datetime(),
+        )
+        admin_role = db.session.scalar(
+            db.select(UserRole).where(UserRole.name == UserRoles.ADMIN.value)
+        )
+        admin.roles.append(admin_role)
+        db.session.add(admin)
+        db.session.commit()
+        logger.info("Admin is added to user's list.")
+
+
+@click.command("bootstrap")
+@click.option("--force", is_flag=True, help="Run all steps even if up to date.")
+@with_appcontext
+def bootstrap_command(force: bool) -> None:
+    """Apply migrations and seed data."""
+    result = bootstrap(force=force)
+    state = "skipped" if result["skipped"] else "done"
+    click.echo(f"Bootstrap {state} in {result['elapsed_ms']:.1f} ms ({result['version']}).")
@@ -1,9 +1,11 @@
 from __future__ import annotations
 from sqlalchemy.orm import (
+    column_property,
     mapped_column,
     Mapped,
     relationship,
 )
+from sqlalchemy.ext.hybrid import hybrid_method, hybrid_property
 from sqlalchemy import (
     Integer,
     String,
@@ -15,11 +17,13 @@ from sqlalchemy import (
     Column,
     Table,
     Time,
-    LargeBinary,
+    Text,
+    Index,
+    UniqueConstraint,
 )
 import datetime as dt
 from attendance_logger.models.database import db
-from attendance_logger.models.models import VisitRoles
+from attendance_logger.models.models import COUNTED_VISIT_STATES, OutboxStates
 from attendance_logger.utils import utils
 
 
@@ -86,7 +90,7 @@ class User(CreatedAtMixin):
     favorites: Mapped[Favorites] = relationship(back_populates="user")
 
     def __repr__(self) -> str:
-        return f"<User id_:{self.id_} email:{self.email} active:{self.active} name:{self.username} roles:{[role.name for role in self.roles]}>"
+        return f"<User id_:{self.id_} email:{self.email} active:{self.active} name:{self.username}>"
 
     def get_id(self) -> str:
         return str(self.id_)
@@ -97,6 +101,12 @@ class User(CreatedAtMixin):
 
 class Client(CreatedAtMixin):
     __tablename__ = "clients"
+    # keyset pagination of sortable columns, see utils.pagination
+    __table_args__ = (
+        Index(None, "name", "id_"),
+        Index(None, "child_name", "id_"),
+        Index(None, "childs_birthday", "id_"),
+    )
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
     active: Mapped[bool] = mapped_column(Boolean, default=True)
     name: Mapped[str] = mapped_column(String(100))
@@ -117,6 +127,7 @@ class Client(CreatedAtMixin):
 
 class Contract(CreatedAtMixin):
     __tablename__ = "contracts"
+    __table_args__ = (Index(None, "client_id", "id_"),)
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
     number: Mapped[str] = mapped_column(String(100), unique=True)
     active: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -124,20 +135,36 @@ class Contract(CreatedAtMixin):
     client: Mapped[Client] = relationship(back_populates="contracts")
     signed_on: Mapped[dt.date | None] = mapped_column(Date)
     canceled: Mapped[dt.date | None] = mapped_column(Date)
-    signed_pdf: Mapped[bytes | None] = mapped_column(LargeBinary)
-    canceled_pdf: Mapped[bytes | None] = mapped_column(LargeBinary)
+    # documents are files of services.blob_store, rows keep their digest only
+    signed_pdf_digest: Mapped[str | None] = mapped_column(String(64))
+    signed_pdf_size: Mapped[int | None] = mapped_column(Integer)
+    signed_pdf_mime: Mapped[str | None] = mapped_column(String(100))
+    canceled_pdf_digest: Mapped[str | None] = mapped_column(String(64))
+    canceled_pdf_size: Mapped[int | None] = mapped_column(Integer)
+    canceled_pdf_mime: Mapped[str | None] = mapped_column(String(100))
 
     def __repr__(self):
         return f"<Contract id_:{self.id_} number:{self.number} active:{self.active}>"
 
 
+class ContractNumberCounter(db.Model):
+    __tablename__ = "contract_number_counters"
+    year: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    # first number not reserved yet, processes reserve blocks, see services/contracts.py
+    next_value: Mapped[int] = mapped_column(Integer, default=1)
+
+    def __repr__(self) -> str:
+        return f"<ContractNumberCounter year:{self.year} next_value:{self.next_value}>"
+
+
 class Group(CreatedAtMixin):
     __tablename__ = "groups"
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(100))
-    active_from: Mapped[dt.date] = mapped_column(Date, default=dt.date.today())
+    # computed per row on insert
+    active_from: Mapped[dt.date] = mapped_column(Date, default=dt.date.today)
     active_until: Mapped[dt.date] = mapped_column(
-        Date, default=dt.date.today() + dt.timedelta(days=365)
+        Date, default=lambda: dt.date.today() + dt.timedelta(days=365)
     )
     teachers: Mapped[list["UserParticipant"]] = relationship(back_populates="group")
     lessons: Mapped[list["Lesson"]] = relationship(back_populates="group")
@@ -160,20 +187,23 @@ class ParticipentMixin(CreatedAtMixin):
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
     start_date: Mapped[dt.date] = mapped_column(Date)
     end_date: Mapped[dt.date] = mapped_column(Date)
-    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id_"), primary_key=True)
+    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id_"))
 
 
 class ClientParticipant(ParticipentMixin):
     __tablename__ = "client_participants"
+    # participants of a group on a date
+    __table_args__ = (Index(None, "group_id", "start_date", "end_date"),)
     group: Mapped[Group] = relationship(back_populates="participants")
-    client_id: Mapped[int] = mapped_column(ForeignKey("clients.id_"), primary_key=True)
+    client_id: Mapped[int] = mapped_column(ForeignKey("clients.id_"))
     client: Mapped[Client] = relationship(back_populates="participations")
 
 
 class UserParticipant(ParticipentMixin):
     __tablename__ = "user_participants"
+    __table_args__ = (Index(None, "group_id", "start_date", "end_date"),)
     group: Mapped[Group] = relationship(back_populates="teachers")
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id_"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id_"))
     user: Mapped[User] = relationship(back_populates="groups")
 
 
@@ -203,14 +233,17 @@ _group_schedule_table = Table(
 
 class Subscription(CreatedAtMixin):
     __tablename__ = "subscriptions"
+    # lookup of valid subscriptions of clients on a date
+    __table_args__ = (Index(None, "client_id", "freezed", "start_date", "end_date"),)
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
     total_visits: Mapped[int] = mapped_column(Integer)
     full_price_id: Mapped[int] = mapped_column(ForeignKey("prices.id_"))
     full_price: Mapped[Price] = relationship()
     discount_percent: Mapped[int] = mapped_column(Integer, default=0)
-    start_date: Mapped[dt.date] = mapped_column(Date, default=dt.date.today())
+    # computed per row on insert
+    start_date: Mapped[dt.date] = mapped_column(Date, default=dt.date.today)
     end_date: Mapped[dt.date | None] = mapped_column(
-        Date, default=dt.date.today() + dt.timedelta(days=31)
+        Date, default=lambda: dt.date.today() + dt.timedelta(days=31)
     )
     freezed: Mapped[bool] = mapped_column(Boolean, default=False)
     client_id: Mapped[int] = mapped_column(ForeignKey("clients.id_"))
@@ -220,31 +253,57 @@ class Subscription(CreatedAtMixin):
     def __repr__(
         self,
     ):
-        return f"<Subscription id_:{self.id_} active:{self.active} freezed:{self.freezed} total_visits:{self.total_visits} used_visits:{self.open_visits}>"
+        return f"<Subscription id_:{self.id_} client_id:{self.client_id} freezed:{self.freezed} total_visits:{self.total_visits} start:{self.start_date} end:{self.end_date}>"
 
-    @property
+    # used_visits: int - column property defined below Visitor
+
+    @hybrid_property
     def open_visits(self) -> int:
-        return self.total_visits - len(
-            [
-                visit
-                for visit in self.visits
-                if visit.state in [VisitRoles.PRESENT.value, VisitRoles.ILL.value]
-            ]
+        return self.total_visits - self.used_visits
+
+    @open_visits.inplace.expression
+    @classmethod
+    def _open_visits_expression(cls):
+        return cls.total_visits - cls.used_visits
+
+    @hybrid_method
+    def active_on(self, date: dt.date) -> bool:
+        """Not freezed and the date lies between start and end date, open end
+        if end date is None"""
+        return (
+            not self.freezed
+            and self.start_date <= date
+            and (self.end_date is None or self.end_date >= date)
         )
 
-    @property
+    @active_on.inplace.expression
+    @classmethod
+    def _active_on_expression(cls, date: dt.date):
+        return db.and_(
+            cls.freezed == db.false(),
+            cls.start_date <= date,
+            db.or_(cls.end_date.is_(None), cls.end_date >= date),
+        )
+
+    @hybrid_property
     def active(self) -> bool:
-        if self.end_date and self.end_date > dt.date.today() and not self.freezed:
-            return False
-        return True
+        return self.active_on(dt.date.today())
+
+    @active.inplace.expression
+    @classmethod
+    def _active_expression(cls):
+        return cls.active_on(db.func.current_date())
 
 
 class Lesson(CreatedAtMixin):
     __tablename__ = "lessons"
+    __table_args__ = (Index(None, "group_id", "start_datetime_utc"),)
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
     state: Mapped[str] = mapped_column(String(256))
     group_id: Mapped[int] = mapped_column(ForeignKey("groups.id_"))
     group: Mapped[Group] = relationship(back_populates="lessons")
+    # set for lessons generated from a schedule, see services/lessons.py
+    schedule_id: Mapped[int | None] = mapped_column(ForeignKey("schedules.id_"))
     start_datetime_utc: Mapped[dt.datetime] = mapped_column(DateTime)
     start_timezone: Mapped[int] = mapped_column(Integer)
     end_datetime_utc: Mapped[dt.datetime] = mapped_column(DateTime)
@@ -258,7 +317,7 @@ class Lesson(CreatedAtMixin):
     )
 
     def __repr__(self):
-        return f"<Lesson id_:{self.id_} group:{self.group.name} start:{self.start_datetime_utc} state:{self.state}>"
+        return f"<Lesson id_:{self.id_} group_id:{self.group_id} start:{self.start_datetime_utc} state:{self.state}>"
 
     @property
     def duration(self) -> dt.timedelta:
@@ -273,31 +332,106 @@ class Lesson(CreatedAtMixin):
         return self.end_datetime_utc, self.end_timezone
 
 
+class LessonMaterialization(db.Model):
+    __tablename__ = "lesson_materializations"
+    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id_"), primary_key=True)
+    # last date lessons of the group are generated for
+    materialized_until: Mapped[dt.date] = mapped_column(Date)
+    # hash of group dates, location and schedules used for the generation
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    changed_datetime: Mapped[dt.datetime] = mapped_column(DateTime)
+
+    def __repr__(self) -> str:
+        return f"<LessonMaterialization group_id:{self.group_id} until:{self.materialized_until}>"
+
+
 class VisitorMixin(CreatedAtMixin):
     __abstract__ = True
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
     state: Mapped[str] = mapped_column(String(256))
-    lesson_id: Mapped[int] = mapped_column(ForeignKey("lessons.id_"), primary_key=True)
+    lesson_id: Mapped[int] = mapped_column(ForeignKey("lessons.id_"))
 
 
 class Teacher(VisitorMixin):
     __tablename__ = "teachers"
+    __table_args__ = (
+        UniqueConstraint("lesson_id", "user_id"),
+        # lessons of an employee
+        Index(None, "user_id", "lesson_id"),
+    )
     lesson: Mapped[Lesson] = relationship(back_populates="teachers")
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id_"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id_"))
     user: Mapped[User] = relationship(back_populates="works")
 
 
 class Visitor(VisitorMixin):
     __tablename__ = "visitors"
-    lesson: Mapped[Lesson] = relationship(back_populates="visitors")
-    subscription_id: Mapped[int] = mapped_column(
-        ForeignKey("subscriptions.id_"), primary_key=True
+    __table_args__ = (
+        UniqueConstraint("lesson_id", "subscription_id"),
+        Index(None, "lesson_id", "state"),
+        Index(None, "subscription_id", "state"),
     )
+    lesson: Mapped[Lesson] = relationship(back_populates="visitors")
+    subscription_id: Mapped[int] = mapped_column(ForeignKey("subscriptions.id_"))
     subscription: Mapped[Subscription] = relationship(back_populates="visits")
 
 
+# counted in SQL with every loaded subscription instead of loading its visits
+Subscription.used_visits = column_property(
+    db.select(db.func.count(Visitor.id_))
+    .where(
+        Visitor.subscription_id == Subscription.id_,
+        Visitor.state.in_(COUNTED_VISIT_STATES),
+    )
+    .correlate_except(Visitor)
+    .scalar_subquery()
+)
+
+
+class RollupMixin(db.Model):
+    """Number of rows per group, location, ISO week and state, maintained by
+    services.statistics"""
+
+    __abstract__ = True
+    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id_"), primary_key=True)
+    location_id: Mapped[int] = mapped_column(
+        ForeignKey("locations.id_"), primary_key=True
+    )
+    # Monday of the ISO week of the lesson start in UTC
+    week: Mapped[dt.date] = mapped_column(Date, primary_key=True)
+    state: Mapped[str] = mapped_column(String(256), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class LessonRollup(RollupMixin):
+    __tablename__ = "lesson_rollups"
+    __table_args__ = (Index(None, "location_id", "week"),)
+
+    def __repr__(self) -> str:
+        return f"<LessonRollup group_id:{self.group_id} week:{self.week} state:{self.state} count:{self.count}>"
+
+
+class VisitorRollup(RollupMixin):
+    __tablename__ = "visitor_rollups"
+    __table_args__ = (Index(None, "location_id", "week"),)
+
+    def __repr__(self) -> str:
+        return f"<VisitorRollup group_id:{self.group_id} week:{self.week} state:{self.state} count:{self.count}>"
+
+
+class TeacherRollup(RollupMixin):
+    __tablename__ = "teacher_rollups"
+    # first column of the primary key, statistics of one employee use its prefix
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id_"), primary_key=True)
+
+    def __repr__(self) -> str:
+        return f"<TeacherRollup user_id:{self.user_id} group_id:{self.group_id} week:{self.week} state:{self.state} count:{self.count}>"
+
+
 class Price(CreatedAtMixin):
     __tablename__ = "prices"
+    # price of a type valid at a moment
+    __table_args__ = (Index(None, "type_", "start_datetime_utc"),)
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
     type_: Mapped[int] = mapped_column(Integer)
     value: Mapped[float] = mapped_column(Float)
@@ -326,13 +460,44 @@ class Location(db.Model):
 
 class EmailConfirmation(CreatedAtMixin):
     __tablename__ = "email_confirmations"
+    __table_args__ = (Index(None, "email", "expired_datetime_utc"),)
     id_: Mapped[int] = mapped_column(Integer, primary_key=True)
     email: Mapped[str] = mapped_column(String(256))
     token: Mapped[str] = mapped_column(String(256), unique=True)
     confirmed_at_utc: Mapped[dt.datetime | None] = mapped_column(DateTime)
+    # computed per row on insert
     expired_datetime_utc: Mapped[dt.datetime] = mapped_column(
-        DateTime, default=utils.get_current_utc_datetime_plus_hours(2)
+        DateTime, default=lambda: utils.get_current_utc_datetime_plus_hours(2)
+    )
+
+
+class EmailOutbox(CreatedAtMixin):
+    __tablename__ = "email_outbox"
+    __table_args__ = (Index(None, "state", "next_attempt_utc"),)
+    id_: Mapped[int] = mapped_column(Integer, primary_key=True)
+    email_to: Mapped[str] = mapped_column(String(256))
+    subject: Mapped[str] = mapped_column(String(256))
+    body: Mapped[str] = mapped_column(Text)
+    state: Mapped[str] = mapped_column(String(20), default=OutboxStates.PENDING.value)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_utc: Mapped[dt.datetime] = mapped_column(
+        DateTime, default=utils.get_current_utc_datetime
     )
+    last_error: Mapped[str | None] = mapped_column(String(1000))
+    sent_at_utc: Mapped[dt.datetime | None] = mapped_column(DateTime)
+
+    def __repr__(self) -> str:
+        return f"<EmailOutbox id_:{self.id_} email_to:{self.email_to} state:{self.state} attempts:{self.attempts}>"
+
+
+class BootstrapState(db.Model):
+    __tablename__ = "bootstrap_state"
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[str] = mapped_column(String(256))
+    changed_datetime: Mapped[dt.datetime] = mapped_column(DateTime)
+
+    def __repr__(self) -> str:
+        return f"<BootstrapState key:{self.key} value:{self.value}>"
 
 
 class Favorites(CreatedAtMixin):
@@ -0,0 +1,138 @@
+from collections.abc import Callable
+
+from flask import current_app, has_app_context
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+
+from attendance_logger.models.db_models import (
+    Client,
+    ClientParticipant,
+    Contract,
+    Group,
+    Lesson,
+    Location,
+    Subscription,
+    Teacher,
+    User,
+    UserParticipant,
+    Visitor,
+)
+
+
+def _strict(strict: bool) -> tuple[ORMOption, ...]:
+    # relationships of an entity that aren't listed in the profile raise if they
+    # need SQL, many-to-one objects already in the identity map are fine
+    return (raiseload("*", sql_only=True),) if strict else ()
+
+
+def _lesson_attendance_sheet(strict: bool) -> list[ORMOption]:
+    return [
+        joinedload(Lesson.group).options(
+            load_only(Group.id_, Group.name, raiseload=strict), *_strict(strict)
+        ),
+        joinedload(Lesson.location).options(*_strict(strict)),
+        selectinload(Lesson.visitors).options(
+            joinedload(Visitor.subscription).options(
+                joinedload(Subscription.client).options(
+                    load_only(
+                        Client.id_,
+                        Client.name,
+                        Client.child_name,
+                        Client.active,
+                        raiseload=strict,
+                    ),
+                    *_strict(strict),
+                ),
+                *_strict(strict),
+            ),
+            *_strict(strict),
+        ),
+        selectinload(Lesson.teachers).options(
+            joinedload(Teacher.user).options(
+                load_only(User.id_, User.username, User.email, raiseload=strict),
+                *_strict(strict),
+            ),
+            *_strict(strict),
+        ),
+    ]
+
+
+def _client_card(strict: bool) -> list[ORMOption]:
+    return [
+        selectinload(Client.contracts).options(
+            load_only(
+                Contract.id_,
+                Contract.number,
+                Contract.active,
+                Contract.signed_on,
+                Contract.canceled,
+                Contract.client_id,
+                raiseload=strict,
+            ),
+            *_strict(strict),
+        ),
+        selectinload(Client.subscriptions).options(
+            joinedload(Subscription.full_price).options(*_strict(strict)),
+            *_strict(strict),
+        ),
+        selectinload(Client.participations).options(
+            joinedload(ClientParticipant.group).options(
+                load_only(
+                    Group.id_,
+                    Group.name,
+                    Group.active_from,
+                    Group.active_until,
+                    raiseload=strict,
+                ),
+                *_strict(strict),
+            ),
+            *_strict(strict),
+        ),
+    ]
+
+
+def _group_list(strict: bool) -> list[ORMOption]:
+    return [
+        joinedload(Group.location).options(
+            load_only(Location.id_, Location.name, raiseload=strict), *_strict(strict)
+        ),
+        selectinload(Group.schedules).options(*_strict(strict)),
+        selectinload(Group.teachers).options(
+            joinedload(UserParticipant.user).options(
+                load_only(User.id_, User.username, raiseload=strict),
+                *_strict(strict),
+            ),
+            *_strict(strict),
+        ),
+    ]
+
+
+# name -> factory of loader options, the root entity is part of the name
+PROFILES: dict[str, Callable[[bool], list[ORMOption]]] = {
+    "lesson_attendance_sheet": _lesson_attendance_sheet,
+    "client_card": _client_card,
+    "group_list": _group_list,
+}
+# profile options are built once per name and mode
+_cache: dict[tuple[str, bool], tuple[ORMOption, ...]] = {}
+
+
+def loader_profile(name: str, strict: bool | None = None) -> tuple[ORMOption, ...]:
+    """Loader options of a named use case, e.g.
+    `db.select(Lesson).options(*loader_profile("lesson_attendance_sheet"))`
+
+    Keyword arguments:
+    name: str - one of PROFILES
+    strict: bool | None - raise on every lazy load that isn't part of the
+    profile, LOADER_STRICT of the current app if None
+
+    Return: tuple[ORMOption, ...]
+    """
+    if name not in PROFILES:
+        raise KeyError(f"Unknown loader profile {name!r}")
+    if strict is None:
+        strict = has_app_context() and current_app.config.get("LOADER_STRICT", False)
+    key = (name, strict)
+    if key not in _cache:
+        _cache[key] = (*PROFILES[name](strict), *_strict(strict))
+    return _cache[key]
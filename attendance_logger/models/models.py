@@ -10,6 +10,27 @@ class UserRoles(StrEnum):
     USER = "user"
 
 
+class PermissionLevels(IntEnum):
+    UNAUTHORIZED = 0
+    UNCONFIRMED = 1
+    USER = 2
+    EMPLOYEE = 3
+    MANAGER = 4
+    HEAD_MANAGER = 5
+    OWNER = 6
+    ADMIN = 7
+
+
+ROLE_LEVELS = {
+    UserRoles.USER: PermissionLevels.USER,
+    UserRoles.EMPLOYEE: PermissionLevels.EMPLOYEE,
+    UserRoles.MANAGER: PermissionLevels.MANAGER,
+    UserRoles.HEAD_MANAGER: PermissionLevels.HEAD_MANAGER,
+    UserRoles.OWNER: PermissionLevels.OWNER,
+    UserRoles.ADMIN: PermissionLevels.ADMIN,
+}
+
+
 class PriceCategories(IntEnum):
     CATEGORY_1 = 1
     CATEGORY_2 = 2
@@ -41,3 +62,13 @@ class VisitRoles(StrEnum):
     POSTPONED = "postponed"
     PLANED = "planed"
     PASSED = "passed"
+
+
+# visits deducted from a subscription
+COUNTED_VISIT_STATES = (VisitRoles.PRESENT.value, VisitRoles.ILL.value)
+
+
+class OutboxStates(StrEnum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
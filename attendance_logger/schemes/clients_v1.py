@@ -0,0 +1,47 @@
+import datetime as dt
+
+from pydantic import BaseModel
+
+
+class ClientItem(BaseModel):
+    id: int
+    active: bool
+    name: str
+    child_name: str
+    childs_birthday: dt.date
+
+
+class ContractItem(BaseModel):
+    id: int
+    number: str
+    active: bool
+    client_id: int
+    signed_on: dt.date | None
+    canceled: dt.date | None
+
+
+class SubscriptionItem(BaseModel):
+    id: int
+    total_visits: int
+    open_visits: int
+    full_price: float
+    discount_percent: int
+    start_date: dt.date
+    end_date: dt.date | None
+    freezed: bool
+
+
+class ParticipationItem(BaseModel):
+    group_id: int
+    group_name: str
+    start_date: dt.date
+    end_date: dt.date
+
+
+class ClientCard(ClientItem):
+    address: str
+    phone: str
+    notes: str
+    contracts: list[ContractItem]
+    subscriptions: list[SubscriptionItem]
+    participations: list[ParticipationItem]
@@ -0,0 +1,26 @@
+import datetime as dt
+
+from pydantic import BaseModel
+
+
+class ScheduleItem(BaseModel):
+    weekday: int
+    start_time_utc: dt.time
+    end_time_utc: dt.time
+
+
+class GroupTeacher(BaseModel):
+    user_id: int
+    username: str
+    start_date: dt.date
+    end_date: dt.date
+
+
+class GroupItem(BaseModel):
+    id: int
+    name: str
+    active_from: dt.date
+    active_until: dt.date
+    location: str | None
+    schedules: list[ScheduleItem]
+    teachers: list[GroupTeacher]
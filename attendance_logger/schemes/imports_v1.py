@@ -0,0 +1,59 @@
+import datetime as dt
+
+from pydantic import BaseModel, Field, ValidationInfo, field_validator, model_validator
+
+
+# optional text columns stored as empty strings
+_TEXT = ("address", "phone", "notes")
+
+
+class ClientRow(BaseModel):
+    """One CSV row: a client with an optional contract and group participation"""
+
+    name: str = Field(min_length=1, max_length=100)
+    child_name: str = Field(min_length=1, max_length=100)
+    address: str = Field(default="", max_length=100)
+    phone: str = Field(default="", max_length=100)
+    childs_birthday: dt.date
+    notes: str = Field(default="", max_length=1000)
+    # a contract is added if a number or a signing date is given, empty
+    # numbers are allocated
+    contract_number: str | None = Field(default=None, max_length=100)
+    contract_signed_on: dt.date | None = None
+    # group name, the location name or address tells groups of the same name apart
+    group: str | None = None
+    location: str | None = None
+    participation_start: dt.date | None = None
+    # end of the group if empty
+    participation_end: dt.date | None = None
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def empty_cells(cls, value, info: ValidationInfo):
+        # csv gives empty strings for empty cells and None for missing ones
+        if isinstance(value, str):
+            value = value.strip()
+        if value in ("", None):
+            return "" if info.field_name in _TEXT else None
+        return value
+
+    @model_validator(mode="after")
+    def participation(self) -> "ClientRow":
+        if self.group is None:
+            if self.location or self.participation_start or self.participation_end:
+                raise ValueError("participation requires a group")
+            return self
+        if self.participation_start is None:
+            raise ValueError("participation_start is required with a group")
+        if self.participation_end and self.participation_end < self.participation_start:
+            raise ValueError("participation_end is before participation_start")
+        return self
+
+    @property
+    def has_contract(self) -> bool:
+        return self.contract_number is not None or self.contract_signed_on is not None
+
+
+class RowError(BaseModel):
+    row: int
+    messages: dict[str, str]
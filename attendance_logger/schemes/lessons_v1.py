@@ -0,0 +1,54 @@
+import datetime as dt
+
+from pydantic import BaseModel
+
+from attendance_logger.models.models import VisitRoles
+
+
+class VisitorState(BaseModel):
+    client_id: int
+    state: VisitRoles
+
+
+class TeacherState(BaseModel):
+    user_id: int
+    state: VisitRoles
+
+
+class Attendance(BaseModel):
+    visitors: list[VisitorState] = []
+    teachers: list[TeacherState] = []
+
+
+class LessonAttendance(Attendance):
+    lesson_id: int
+
+
+class AttendanceBatch(BaseModel):
+    lessons: list[LessonAttendance]
+
+
+class SheetVisitor(BaseModel):
+    client_id: int
+    name: str
+    child_name: str
+    subscription_id: int
+    state: str
+
+
+class SheetTeacher(BaseModel):
+    user_id: int
+    username: str
+    state: str
+
+
+class LessonSheet(BaseModel):
+    id: int
+    state: str
+    group_id: int
+    group_name: str
+    location: str | None
+    start_datetime_utc: dt.datetime
+    end_datetime_utc: dt.datetime
+    visitors: list[SheetVisitor]
+    teachers: list[SheetTeacher]
@@ -0,0 +1,14 @@
+import datetime as dt
+
+from pydantic import BaseModel
+
+from attendance_logger.models.models import PriceCategories
+
+
+class PriceItem(BaseModel):
+    id: int
+    category: PriceCategories
+    value: float
+    start_datetime_utc: dt.datetime
+    end_datetime_utc: dt.datetime | None
+    notes: str | None
@@ -1,5 +1,17 @@
 from pydantic import BaseModel
 
+from attendance_logger.schemes.clients_v1 import ClientCard, ClientItem, ContractItem
+from attendance_logger.schemes.groups_v1 import GroupItem
+from attendance_logger.schemes.imports_v1 import RowError
+from attendance_logger.schemes.lessons_v1 import LessonSheet
+from attendance_logger.schemes.prices_v1 import PriceItem
+from attendance_logger.schemes.statistics_v1 import (
+    ChildAttendance,
+    GroupPercentiles,
+    TotalStatistics,
+    WeekStatistics,
+)
+
 
 class Ok(BaseModel):
     status: str = "OK"
@@ -13,6 +25,74 @@ class OkWithMessage(Ok):
     message: str
 
 
+class OkAttendance(Ok):
+    inserted: int
+    updated: int
+
+
+class OkDocument(Ok):
+    digest: str
+    size: int
+    mime: str
+
+
+class OkClient(Ok, ClientCard):
+    pass
+
+
+class OkLessonSheet(Ok, LessonSheet):
+    pass
+
+
+class OkImport(Ok):
+    rows: int
+    clients: int
+    contracts: int
+    participants: int
+    rejected: int
+    # first errors, see IMPORT_MAX_REPORTED_ERRORS
+    errors: list[RowError]
+
+
+class OkPage(Ok):
+    # cursor of the next page, None on the last page
+    next: str | None = None
+    # page number if paged with `page`
+    page: int | None = None
+
+
+class OkClients(OkPage):
+    items: list[ClientItem]
+
+
+class OkContracts(OkPage):
+    items: list[ContractItem]
+
+
+class OkGroups(OkPage):
+    items: list[GroupItem]
+
+
+class OkPrices(OkPage):
+    items: list[PriceItem]
+
+
+class OkWeeklyStatistics(Ok):
+    weeks: list[WeekStatistics]
+
+
+class OkTotalStatistics(Ok):
+    items: list[TotalStatistics]
+
+
+class OkChildAttendance(Ok):
+    items: list[ChildAttendance]
+
+
+class OkGroupPercentiles(Ok):
+    items: list[GroupPercentiles]
+
+
 class BadRequest(BaseModel):
     status: str = "Bad Request"
 
@@ -28,3 +108,23 @@ class BadRequestWithMessages(BadRequest):
 class Forbidden(BaseModel):
     status: str = "Forbidden"
     message: str = "Insufficient Permissions."
+
+
+class NotFound(BaseModel):
+    status: str = "Not Found"
+    message: str = "Resource doesn't exist."
+
+
+class PayloadTooLarge(BaseModel):
+    status: str = "Payload Too Large"
+    message: str
+
+
+class TooManyRequests(BaseModel):
+    status: str = "Too Many Requests"
+    message: str = "Too many attempts. Try again later."
+
+
+class ServiceUnavailable(BaseModel):
+    status: str = "Service Unavailable"
+    message: str = "Server is busy. Try again later."
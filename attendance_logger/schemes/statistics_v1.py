@@ -0,0 +1,37 @@
+import datetime as dt
+
+from pydantic import BaseModel
+
+
+class StateCounts(BaseModel):
+    lessons: dict[str, int] = {}
+    visitors: dict[str, int] = {}
+    teachers: dict[str, int] = {}
+
+
+class WeekStatistics(StateCounts):
+    week: dt.date
+
+
+class TotalStatistics(StateCounts):
+    id: int
+
+
+class ChildAttendance(BaseModel):
+    client_id: int
+    group_id: int
+    lessons: int
+    attended: int
+    excused: int
+    rate: float | None
+    current_streak: int
+    longest_streak: int
+    absence_clusters: int
+    longest_absence: int
+    last_visit: dt.date | None
+
+
+class GroupPercentiles(BaseModel):
+    group_id: int
+    children: int
+    percentiles: dict[str, float]
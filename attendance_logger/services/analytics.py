@@ -0,0 +1,251 @@
+import datetime as dt
+from collections.abc import Iterable, Sequence
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    ClientParticipant,
+    Lesson,
+    Subscription,
+    Visitor,
+)
+from attendance_logger.models.models import VisitRoles
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, `pip install backend[analytics]`
+    np = None
+
+
+# outcome of a lesson for a child
+ATTENDED, ABSENT, EXCUSED = 1, 0, -1
+ATTENDED_STATES = (VisitRoles.PRESENT.value, VisitRoles.TRIAL_VISIT.value)
+EXCUSED_STATES = (VisitRoles.ILL_WITH_AVIDENCE.value, VisitRoles.VACATION.value)
+# lessons that didn't take place aren't expected from anybody
+SKIPPED_LESSON_STATES = (VisitRoles.CANCELED.value, VisitRoles.POSTPONED.value)
+# planned lessons are expected once attendance of anybody is recorded, before
+# that they may lie in the future
+PLANNED_LESSON_STATE = VisitRoles.PLANED.value
+PERCENTILES = (10, 25, 50, 75, 90)
+_CHUNK = 100_000
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """Raised if NumPy isn't installed"""
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise AnalyticsUnavailable("Attendance analytics require NumPy.")
+
+
+class VisitArrays:
+    """One row per expected lesson of a child as parallel arrays, sorted by
+    client, group and day"""
+
+    def __init__(self, client, group, day, outcome) -> None:
+        _require_numpy()
+        order = np.lexsort((day, group, client))
+        self.client = np.asarray(client, dtype=np.int64)[order]
+        self.group = np.asarray(group, dtype=np.int64)[order]
+        self.day = np.asarray(day, dtype="datetime64[D]")[order]
+        self.outcome = np.asarray(outcome, dtype=np.int8)[order]
+
+    def __len__(self) -> int:
+        return len(self.client)
+
+
+def load_visits(
+    first: dt.date, last: dt.date, group_ids: Iterable[int] | None = None
+) -> VisitArrays:
+    """Expected lessons of children with their outcome, read with one query.
+
+    A child is expected at every lesson of a group that took place while it
+    participated in the group. Planned lessons took place if a visitor or
+    teacher row was recorded for them. Lessons without a visitor row of the
+    child count as absence.
+
+    Keyword arguments:
+    first: dt.date - first lesson date
+    last: dt.date - last lesson date
+    group_ids: Iterable[int] | None - limit to these groups, all groups if None
+    Return: VisitArrays
+    """
+    _require_numpy()
+    lesson_date = db.func.date(Lesson.start_datetime_utc, type_=db.Date)
+    visit = (
+        db.select(Visitor.lesson_id, Visitor.state, Subscription.client_id)
+        .join(Visitor.subscription)
+        .subquery()
+    )
+    outcome = db.case(
+        (visit.c.state.in_(ATTENDED_STATES), ATTENDED),
+        (visit.c.state.in_(EXCUSED_STATES), EXCUSED),
+        else_=ABSENT,
+    )
+    query = (
+        db.select(ClientParticipant.client_id, Lesson.group_id, lesson_date, outcome)
+        .join(
+            ClientParticipant,
+            db.and_(
+                ClientParticipant.group_id == Lesson.group_id,
+                lesson_date >= ClientParticipant.start_date,
+                lesson_date <= ClientParticipant.end_date,
+            ),
+        )
+        .outerjoin(
+            visit,
+            db.and_(
+                visit.c.lesson_id == Lesson.id_,
+                visit.c.client_id == ClientParticipant.client_id,
+            ),
+        )
+        .where(
+            Lesson.start_datetime_utc >= dt.datetime.combine(first, dt.time()),
+            Lesson.start_datetime_utc
+            < dt.datetime.combine(last + dt.timedelta(days=1), dt.time()),
+            Lesson.state.not_in(SKIPPED_LESSON_STATES),
+            db.or_(
+                Lesson.state != PLANNED_LESSON_STATE,
+                Lesson.visitors.any(),
+                Lesson.teachers.any(),
+            ),
+        )
+    )
+    if group_ids is not None:
+        query = query.where(Lesson.group_id.in_(list(group_ids)))
+    dtypes = (np.int64, np.int64, "datetime64[D]", np.int8)
+    chunks: list[list] = [[] for _ in dtypes]
+    # rows are converted per chunk, only the Python objects of one chunk are alive
+    for rows in db.session.execute(query).partitions(_CHUNK):
+        for chunk, dtype, values in zip(chunks, dtypes, zip(*rows)):
+            chunk.append(np.array(values, dtype=dtype))
+    return VisitArrays(
+        *(
+            np.concatenate(chunk) if chunk else np.array([], dtype=dtype)
+            for chunk, dtype in zip(chunks, dtypes)
+        )
+    )
+
+
+class AttendanceAnalytics:
+    """Attendance rates, streaks and absence clusters per child and group.
+
+    Excused lessons neither count for the rate nor break a streak. A streak is
+    a run of attended lessons, an absence cluster a run of at least
+    `cluster_length` absences.
+    """
+
+    def __init__(self, visits: VisitArrays, cluster_length: int = 2) -> None:
+        _require_numpy()
+        counted = visits.outcome != EXCUSED
+        # one pair per child and group
+        new_pair = np.ones(len(visits), dtype=bool)
+        new_pair[1:] = (visits.client[1:] != visits.client[:-1]) | (
+            visits.group[1:] != visits.group[:-1]
+        )
+        pair_of_row = np.cumsum(new_pair) - 1
+        starts = np.flatnonzero(new_pair)
+        self.client = visits.client[starts]
+        self.group = visits.group[starts]
+        size = len(starts)
+        self.lessons = np.bincount(pair_of_row, minlength=size)
+        self.excused = np.bincount(pair_of_row[~counted], minlength=size)
+        attended = visits.outcome == ATTENDED
+        self.attended = np.bincount(pair_of_row[attended], minlength=size)
+        expected = self.lessons - self.excused
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.rate = np.where(expected > 0, self.attended / expected, np.nan)
+        # NaT is the smallest datetime64 as integer
+        last_visit = np.full(size, np.iinfo(np.int64).min, dtype=np.int64)
+        np.maximum.at(
+            last_visit, pair_of_row[attended], visits.day[attended].astype(np.int64)
+        )
+        self.last_visit = last_visit.view("datetime64[D]")
+
+        # runs of equal outcomes within a pair, excused lessons are left out
+        pair = pair_of_row[counted]
+        value = attended[counted]
+        new_run = np.ones(len(pair), dtype=bool)
+        new_run[1:] = (pair[1:] != pair[:-1]) | (value[1:] != value[:-1])
+        run_start = np.flatnonzero(new_run)
+        run_length = np.diff(np.append(run_start, len(pair)))
+        run_pair = pair[run_start]
+        run_attended = value[run_start]
+
+        self.longest_streak = np.zeros(size, dtype=np.int64)
+        np.maximum.at(self.longest_streak, run_pair[run_attended], run_length[run_attended])
+        self.current_streak = np.zeros(size, dtype=np.int64)
+        last_run = np.ones(len(run_pair), dtype=bool)
+        last_run[:-1] = run_pair[1:] != run_pair[:-1]
+        current = last_run & run_attended
+        self.current_streak[run_pair[current]] = run_length[current]
+        clusters = ~run_attended & (run_length >= cluster_length)
+        self.absence_clusters = np.bincount(run_pair[clusters], minlength=size)
+        self.longest_absence = np.zeros(size, dtype=np.int64)
+        np.maximum.at(self.longest_absence, run_pair[~run_attended], run_length[~run_attended])
+
+    def children(self) -> list[dict]:
+        """Figures per child and group
+
+        Return: list[dict] - sorted by client and group, rate is None without
+        counted lessons, last_visit is None without attended lessons
+        """
+        columns = {
+            "client_id": self.client,
+            "group_id": self.group,
+            "lessons": self.lessons,
+            "attended": self.attended,
+            "excused": self.excused,
+            "rate": np.round(self.rate, 4),
+            "current_streak": self.current_streak,
+            "longest_streak": self.longest_streak,
+            "absence_clusters": self.absence_clusters,
+            "longest_absence": self.longest_absence,
+            "last_visit": self.last_visit,
+        }
+        # one conversion per column instead of one per value
+        values = [column.tolist() for column in columns.values()]
+        children = [dict(zip(columns, row)) for row in zip(*values)]
+        for child in children:
+            if child["rate"] != child["rate"]:
+                child["rate"] = None
+        return children
+
+    def group_percentiles(self, percentiles: Sequence[int] = PERCENTILES) -> list[dict]:
+        """Percentiles of the attendance rates of children per group, linear
+        interpolation like numpy.percentile
+
+        Keyword arguments:
+        percentiles: Sequence[int] - percentiles between 0 and 100
+        Return: list[dict] - group id, number of children and rate per percentile
+        """
+        known = ~np.isnan(self.rate)
+        group = self.group[known]
+        rate = self.rate[known]
+        if not len(rate):
+            return []
+        order = np.lexsort((rate, group))
+        group, rate = group[order], rate[order]
+        new_group = np.ones(len(group), dtype=bool)
+        new_group[1:] = group[1:] != group[:-1]
+        starts = np.flatnonzero(new_group)
+        counts = np.diff(np.append(starts, len(group)))
+        values = {}
+        for percentile in percentiles:
+            position = starts + (counts - 1) * (percentile / 100)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            values[percentile] = rate[lower] + (rate[upper] - rate[lower]) * (position - lower)
+        return [
+            {
+                "group_id": group_id,
+                "children": children,
+                "percentiles": {
+                    f"p{percentile}": round(float(values[percentile][index]), 4)
+                    for percentile in percentiles
+                },
+            }
+            for index, (group_id, children) in enumerate(
+                zip(group[starts].tolist(), counts.tolist())
+            )
+        ]
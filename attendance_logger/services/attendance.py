@@ -0,0 +1,282 @@
+import datetime as dt
+import logging
+from collections.abc import Sequence
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Lesson,
+    Subscription,
+    Teacher,
+    TeacherRollup,
+    User,
+    Visitor,
+    VisitorRollup,
+)
+from attendance_logger.models.models import COUNTED_VISIT_STATES
+from attendance_logger.schemes.lessons_v1 import LessonAttendance
+from attendance_logger.services.statistics import RollupDeltas
+from attendance_logger.utils import utils
+
+
+logger = logging.getLogger(__name__)
+
+
+class AttendanceError(Exception):
+    """Raised if a sheet can't be applied, nothing is written then"""
+
+    def __init__(self, messages: dict[str, str]) -> None:
+        super().__init__(f"{len(messages)} invalid attendance entries")
+        self.messages = messages
+
+
+def apply_attendance(sheets: Sequence[LessonAttendance]) -> dict[str, int]:
+    """Write visitor and teacher states of many lessons in one transaction.
+
+    Existing rows of a lesson get the new state, new clients get a visit on the
+    subscription ending first that is valid on the lesson date and, for counted
+    states, still has open visits. Existing rows changed to a counted state
+    need an open visit of their subscription as well, rows leaving a counted
+    state free one. Rows missing in a sheet are left untouched.
+    All entries are validated before anything is written, the number of
+    statements doesn't depend on the number of lessons or rows.
+
+    Keyword arguments:
+    sheets: Sequence[LessonAttendance] - states per lesson
+    Return: dict[str, int] - numbers of inserted and updated rows
+    """
+    messages: dict[str, str] = {}
+    lesson_ids = {sheet.lesson_id for sheet in sheets}
+    if not lesson_ids:
+        return {"inserted": 0, "updated": 0}
+    lessons = {
+        lesson_id: (group_id, location_id, start)
+        for lesson_id, group_id, location_id, start in db.session.execute(
+            db.select(
+                Lesson.id_, Lesson.group_id, Lesson.location_id, Lesson.start_datetime_utc
+            ).where(Lesson.id_.in_(lesson_ids))
+        )
+    }
+    lesson_dates = {lesson_id: key[2].date() for lesson_id, key in lessons.items()}
+    # open visits per subscription, decremented while the sheets are applied
+    remaining: dict[int, int] = {}
+    # (lesson, client) to (row id, current state, subscription id)
+    visitors: dict[tuple[int, int], tuple[int, str, int]] = {}
+    for visitor_id, state, lesson_id, client_id, subscription_id, open_visits in (
+        db.session.execute(
+            db.select(
+                Visitor.id_,
+                Visitor.state,
+                Visitor.lesson_id,
+                Subscription.client_id,
+                Subscription.id_,
+                Subscription.open_visits,
+            )
+            .join(Visitor.subscription)
+            .where(Visitor.lesson_id.in_(lesson_ids))
+        )
+    ):
+        visitors[(lesson_id, client_id)] = (visitor_id, state, subscription_id)
+        remaining[subscription_id] = open_visits
+    # (lesson, user) to (row id, current state)
+    teachers = {
+        (lesson_id, user_id): (teacher_id, state)
+        for teacher_id, state, lesson_id, user_id in db.session.execute(
+            db.select(Teacher.id_, Teacher.state, Teacher.lesson_id, Teacher.user_id).where(
+                Teacher.lesson_id.in_(lesson_ids)
+            )
+        )
+    }
+
+    new_clients = {
+        entry.client_id
+        for sheet in sheets
+        if sheet.lesson_id in lesson_dates
+        for entry in sheet.visitors
+        if (sheet.lesson_id, entry.client_id) not in visitors
+    }
+    candidates = _candidate_subscriptions(
+        new_clients,
+        min(lesson_dates.values(), default=None),
+        max(lesson_dates.values(), default=None),
+        remaining,
+    )
+    new_users = {
+        entry.user_id
+        for sheet in sheets
+        if sheet.lesson_id in lesson_dates
+        for entry in sheet.teachers
+        if (sheet.lesson_id, entry.user_id) not in teachers
+    }
+    known_users = (
+        set(db.session.scalars(db.select(User.id_).where(User.id_.in_(new_users))))
+        if new_users
+        else set()
+    )
+
+    now = utils.get_current_utc_datetime()
+    changed = {"changed_datetime": now, "changed_timezone": 0}
+    created = {"created_datetime": now, "created_timezone": 0}
+    visitor_updates: list[dict] = []
+    visitor_inserts: list[dict] = []
+    teacher_updates: list[dict] = []
+    teacher_inserts: list[dict] = []
+    deltas = RollupDeltas()
+    seen: set[tuple[str, int, int]] = set()
+    for index, sheet in enumerate(sheets):
+        date = lesson_dates.get(sheet.lesson_id)
+        if date is None:
+            messages[f"lessons.{index}"] = f"Lesson {sheet.lesson_id} doesn't exist."
+            continue
+        for position, entry in enumerate(sheet.visitors):
+            key = (sheet.lesson_id, entry.client_id)
+            field = f"lessons.{index}.visitors.{position}"
+            if ("visitor", *key) in seen:
+                messages[field] = f"Client {entry.client_id} is listed twice."
+                continue
+            seen.add(("visitor", *key))
+            if key in visitors:
+                visitor_id, state, subscription_id = visitors[key]
+                counted = entry.state.value in COUNTED_VISIT_STATES
+                if counted and state not in COUNTED_VISIT_STATES:
+                    if remaining[subscription_id] <= 0:
+                        messages[field] = (
+                            f"Subscription {subscription_id} of client "
+                            f"{entry.client_id} has no open visits."
+                        )
+                        continue
+                    remaining[subscription_id] -= 1
+                elif not counted and state in COUNTED_VISIT_STATES:
+                    remaining[subscription_id] += 1
+                visitor_updates.append(
+                    {"id_": visitor_id, "state": entry.state.value, **changed}
+                )
+                deltas.add(VisitorRollup, lessons[sheet.lesson_id], state, -1)
+                deltas.add(VisitorRollup, lessons[sheet.lesson_id], entry.state.value)
+                continue
+            subscription = _pick_subscription(
+                candidates.get(entry.client_id, []),
+                date,
+                entry.state.value in COUNTED_VISIT_STATES,
+                remaining,
+            )
+            if subscription is None:
+                messages[field] = (
+                    f"Client {entry.client_id} has no valid subscription on {date}."
+                )
+                continue
+            visitor_inserts.append(
+                {
+                    "state": entry.state.value,
+                    "lesson_id": sheet.lesson_id,
+                    "subscription_id": subscription[0],
+                    **created,
+                }
+            )
+            deltas.add(VisitorRollup, lessons[sheet.lesson_id], entry.state.value)
+        for position, entry in enumerate(sheet.teachers):
+            key = (sheet.lesson_id, entry.user_id)
+            field = f"lessons.{index}.teachers.{position}"
+            if ("teacher", *key) in seen:
+                messages[field] = f"User {entry.user_id} is listed twice."
+                continue
+            seen.add(("teacher", *key))
+            if key in teachers:
+                teacher_id, state = teachers[key]
+                teacher_updates.append(
+                    {"id_": teacher_id, "state": entry.state.value, **changed}
+                )
+                deltas.add(
+                    TeacherRollup, lessons[sheet.lesson_id], state, -1, entry.user_id
+                )
+            elif entry.user_id in known_users:
+                teacher_inserts.append(
+                    {
+                        "state": entry.state.value,
+                        "lesson_id": sheet.lesson_id,
+                        "user_id": entry.user_id,
+                        **created,
+                    }
+                )
+            else:
+                messages[field] = f"User {entry.user_id} doesn't exist."
+                continue
+            deltas.add(
+                TeacherRollup, lessons[sheet.lesson_id], entry.state.value, 1, entry.user_id
+            )
+    if messages:
+        db.session.rollback()
+        raise AttendanceError(messages)
+
+    # executemany per table and kind instead of one statement per row
+    for model, updates, inserts in (
+        (Visitor, visitor_updates, visitor_inserts),
+        (Teacher, teacher_updates, teacher_inserts),
+    ):
+        if updates:
+            db.session.execute(db.update(model), updates)
+        if inserts:
+            db.session.execute(db.insert(model), inserts)
+    deltas.apply()
+    db.session.commit()
+    result = {
+        "inserted": len(visitor_inserts) + len(teacher_inserts),
+        "updated": len(visitor_updates) + len(teacher_updates),
+    }
+    logger.info("Attendance of %d lessons applied: %s", len(lesson_ids), result)
+    return result
+
+
+def _candidate_subscriptions(
+    client_ids: set[int],
+    first: dt.date | None,
+    last: dt.date | None,
+    remaining: dict[int, int],
+) -> dict[int, list[tuple[int, dt.date, dt.date | None]]]:
+    """Subscriptions of clients overlapping the dates, ordered by end date, as
+    (id, start, end). Their open visits are added to `remaining`."""
+    if not client_ids or first is None:
+        return {}
+    rows = db.session.execute(
+        db.select(
+            Subscription.client_id,
+            Subscription.id_,
+            Subscription.start_date,
+            Subscription.end_date,
+            Subscription.open_visits,
+        )
+        .where(
+            Subscription.client_id.in_(client_ids),
+            Subscription.freezed == db.false(),
+            Subscription.start_date <= last,
+            db.or_(Subscription.end_date.is_(None), Subscription.end_date >= first),
+        )
+        .order_by(
+            Subscription.end_date.is_(None),
+            Subscription.end_date,
+            Subscription.start_date,
+            Subscription.id_,
+        )
+    )
+    candidates: dict[int, list[tuple[int, dt.date, dt.date | None]]] = {}
+    for client_id, subscription_id, start, end, open_visits in rows:
+        candidates.setdefault(client_id, []).append((subscription_id, start, end))
+        remaining.setdefault(subscription_id, open_visits)
+    return candidates
+
+
+def _pick_subscription(
+    subscriptions: list[tuple[int, dt.date, dt.date | None]],
+    date: dt.date,
+    counted: bool,
+    remaining: dict[int, int],
+) -> tuple[int, dt.date, dt.date | None] | None:
+    for subscription in subscriptions:
+        subscription_id, start, end = subscription
+        if start > date or (end is not None and end < date):
+            continue
+        if counted:
+            if remaining[subscription_id] <= 0:
+                continue
+            remaining[subscription_id] -= 1
+        return subscription
+    return None
@@ -0,0 +1,148 @@
+import functools
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from flask import Flask
+
+
+logger = logging.getLogger(__name__)
+DEFAULT_ROOT = Path(__file__).parent.parent.parent / "blobs"
+DEFAULT_MAX_SIZE = 20 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+class BlobTooLarge(ValueError):
+    """Raised if a blob exceeds the maximal size, nothing is stored then"""
+
+
+class Blob(NamedTuple):
+    # SHA-256 of the content as hex
+    digest: str
+    size: int
+
+
+class BlobStore:
+    """Content-addressed files on disk.
+
+    A blob is stored once under its SHA-256 digest, identical uploads share the
+    file. Writes go to a temporary file that is renamed into place after the
+    content is complete, readers never see partial blobs. Blobs aren't deleted
+    with their rows, see collect_garbage.
+    """
+
+    def __init__(self, app: Flask | None = None, root: str | Path | None = None) -> None:
+        self.root = Path(root or DEFAULT_ROOT)
+        self.max_size = DEFAULT_MAX_SIZE
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure directory and limits
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.root = Path(app.config.get("BLOB_STORE_PATH") or DEFAULT_ROOT)
+        self.max_size = app.config.get("BLOB_MAX_SIZE", DEFAULT_MAX_SIZE)
+        self.chunk_size = app.config.get("BLOB_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+        app.extensions["blob_store"] = self
+
+    def path(self, digest: str) -> Path:
+        """File of a blob, two directory levels keep directories small
+
+        Keyword arguments:
+        digest: str - SHA-256 as hex
+        Return: Path - the file may not exist
+        """
+        if not _DIGEST.fullmatch(digest):
+            raise ValueError(f"Invalid blob digest {digest!r}")
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).is_file()
+
+    def put(self, chunks: Iterable[bytes]) -> Blob:
+        """Store content from chunks without holding it in memory
+
+        Keyword arguments:
+        chunks: Iterable[bytes] - content
+        Return: Blob - digest and size
+        """
+        incoming = self.root / "incoming"
+        incoming.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        descriptor, name = tempfile.mkstemp(dir=incoming)
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_size:
+                        raise BlobTooLarge(f"Documents are limited to {self.max_size} bytes.")
+                    digest.update(chunk)
+                    file.write(chunk)
+                file.flush()
+                os.fsync(file.fileno())
+            blob = Blob(digest.hexdigest(), size)
+            target = self.path(blob.digest)
+            if target.is_file():
+                # deduplicated, the content is already stored, the new mtime
+                # protects it from a garbage collection before the row commits
+                os.unlink(name)
+                os.utime(target)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(name, target)
+        except BaseException:
+            if os.path.exists(name):
+                os.unlink(name)
+            raise
+        logger.debug("Stored blob %s with %d bytes", blob.digest, blob.size)
+        return blob
+
+    def put_stream(self, stream: BinaryIO) -> Blob:
+        """Store content read from a file like object in chunks
+
+        Keyword arguments:
+        stream: BinaryIO - e.g. request.stream
+        Return: Blob - digest and size
+        """
+        return self.put(iter(functools.partial(stream.read, self.chunk_size), b""))
+
+    def read(self, digest: str) -> Iterator[bytes]:
+        """Content of a blob in chunks
+
+        Keyword arguments:
+        digest: str - SHA-256 as hex
+        Return: Iterator[bytes]
+        """
+        with self.path(digest).open("rb") as file:
+            yield from iter(functools.partial(file.read, self.chunk_size), b"")
+
+    def collect_garbage(self, referenced: set[str], min_age: float = 3600) -> int:
+        """Delete blobs that aren't referenced anymore. Recent files are kept,
+        they may belong to an upload whose row isn't committed yet.
+
+        Keyword arguments:
+        referenced: set[str] - digests still in use
+        min_age: float - seconds since the last modification
+        Return: int - number of deleted blobs
+        """
+        deleted = 0
+        limit = time.time() - min_age
+        for file in self.root.glob("??/??/*"):
+            if file.name in referenced or file.stat().st_mtime > limit:
+                continue
+            file.unlink(missing_ok=True)
+            deleted += 1
+        logger.info("Deleted %d unreferenced blobs", deleted)
+        return deleted
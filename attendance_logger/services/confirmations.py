@@ -0,0 +1,56 @@
+import datetime as dt
+import logging
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import EmailConfirmation
+from attendance_logger.utils import utils
+
+
+logger = logging.getLogger(__name__)
+
+
+def count_outstanding(email: str, now: dt.datetime | None = None) -> int:
+    """Count unconfirmed and not expired confirmation tokens of an email
+
+    Keyword arguments:
+    email: str - email address
+    now: dt.datetime | None - reference time, current UTC time if None
+    Return: int
+    """
+    now = now or utils.get_current_utc_datetime()
+    return db.session.scalar(
+        db.select(db.func.count(EmailConfirmation.id_)).where(
+            EmailConfirmation.email == email,
+            EmailConfirmation.expired_datetime_utc >= now,
+            EmailConfirmation.confirmed_at_utc.is_(None),
+        )
+    )
+
+
+def purge_expired(batch_size: int = 500, now: dt.datetime | None = None) -> int:
+    """Delete expired confirmation tokens in batches. Every batch is committed
+    separately to keep locks short.
+
+    Keyword arguments:
+    batch_size: int - number of rows deleted per transaction
+    now: dt.datetime | None - reference time, current UTC time if None
+    Return: int - number of deleted rows
+    """
+    now = now or utils.get_current_utc_datetime()
+    deleted = 0
+    while True:
+        ids = db.session.scalars(
+            db.select(EmailConfirmation.id_)
+            .where(EmailConfirmation.expired_datetime_utc < now)
+            .order_by(EmailConfirmation.id_)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.session.execute(
+            db.delete(EmailConfirmation).where(EmailConfirmation.id_.in_(ids))
+        )
+        db.session.commit()
+        deleted += len(ids)
+    logger.info("Purged %d expired email confirmations", deleted)
+    return deleted
@@ -1,20 +1,217 @@
+import logging
+import os
 import secrets
+import threading
 import datetime as dt
 
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import InstrumentedAttribute
 
-def generate_contract_number(user_defined: str = "") -> str:
-    """Generate a contract number
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Contract, ContractNumberCounter
+from attendance_logger.services.blob_store import Blob, BlobStore
 
-    The results start always with a year followed by slash and a unique combination
-    of 8 ASCII digits.
+
+logger = logging.getLogger(__name__)
+# documents of a contract, stored in the blob store
+DOCUMENTS = ("signed", "canceled")
+# "sequence" numbers from the counter table, "random" YEAR/<8 hex digits>
+NUMBER_MODES = ("sequence", "random")
+DEFAULT_NUMBER_FORMAT = "{year}/{number:06d}"
+
+
+def generate_contract_number(user_defined: str = "", year: int | None = None) -> str:
+    """Generate a random contract number
+
+    The results start always with a year followed by slash and a random combination
+    of 8 hex digits. Uniqueness is left to the caller, see ContractNumberAllocator.
 
     Keyword arguments:
     user_defined: str - user defined contract_number
+    year: int | None - year of the number, the current year if None
 
-    Return: str - unique contract number
+    Return: str - contract number
     """
     if len(user_defined) > 0:
         return user_defined
-    year = dt.datetime.today().year
+    year = year or dt.datetime.today().year
     token = secrets.token_hex(4)
     return f"{year}/{token}"
+
+
+class ContractNumberAllocator:
+    """Unique contract numbers per year.
+
+    In the sequence mode every process reserves a block of numbers from the
+    per-year counter table with one statement in its own transaction and hands
+    them out from memory. Bulk creation needs one round trip per block instead
+    of one per contract. Numbers of a block the process doesn't use are
+    skipped, so numbers are unique but may have gaps. Reserve the numbers of a
+    batch before writing it, on SQLite an open write transaction of the
+    session blocks the reservation.
+
+    The random mode keeps the former YEAR/<8 hex digits> numbers and checks a
+    batch against existing numbers with one query.
+    """
+
+    def __init__(self, app: Flask | None = None) -> None:
+        self.mode = "sequence"
+        self.format = DEFAULT_NUMBER_FORMAT
+        self.block_size = 20
+        self.reservations = 0
+        self._lock = threading.Lock()
+        # year to the next and the end of the reserved block
+        self._blocks: dict[int, list[int]] = {}
+        self._pid = os.getpid()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure mode, format and block size
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.mode = app.config.get("CONTRACT_NUMBER_MODE", "sequence")
+        if self.mode not in NUMBER_MODES:
+            raise ValueError(f"Unknown contract number mode {self.mode!r}")
+        self.format = app.config.get("CONTRACT_NUMBER_FORMAT", DEFAULT_NUMBER_FORMAT)
+        self.block_size = app.config.get("CONTRACT_NUMBER_BLOCK_SIZE", 20)
+        with self._lock:
+            self._blocks.clear()
+        app.extensions["contract_numbers"] = self
+
+    def next(self, user_defined: str = "") -> str:
+        """Number of a new contract
+
+        Keyword arguments:
+        user_defined: str - number chosen by the user, returned as it is
+        Return: str
+        """
+        if user_defined:
+            return user_defined
+        return self.allocate()[0]
+
+    def allocate(self, count: int = 1, year: int | None = None) -> list[str]:
+        """Numbers of many new contracts
+
+        Keyword arguments:
+        count: int - number of contract numbers
+        year: int | None - year of the numbers, the current year if None
+        Return: list[str] - unique numbers in ascending order
+        """
+        year = year or dt.date.today().year
+        if self.mode == "random":
+            return self._random(count, year)
+        return [self.format.format(year=year, number=value) for value in self._values(count, year)]
+
+    def metrics(self) -> dict[str, int]:
+        """Allocator counters
+
+        Return: dict[str, int]
+        """
+        return {"reservations_total": self.reservations}
+
+    def _values(self, count: int, year: int) -> list[int]:
+        values: list[int] = []
+        with self._lock:
+            if self._pid != os.getpid():
+                # blocks of the parent process belong to the parent
+                self._blocks.clear()
+                self._pid = os.getpid()
+            block = self._blocks.get(year)
+            while len(values) < count:
+                if block is None or block[0] >= block[1]:
+                    size = max(self.block_size, count - len(values))
+                    start = self._reserve(year, size)
+                    block = self._blocks[year] = [start, start + size]
+                taken = min(count - len(values), block[1] - block[0])
+                values.extend(range(block[0], block[0] + taken))
+                block[0] += taken
+        return values
+
+    def _reserve(self, year: int, size: int) -> int:
+        """First number of a block reserved in its own transaction"""
+        table = ContractNumberCounter.__table__
+        for _attempt in range(2):
+            with db.engine.begin() as connection:
+                end = connection.scalar(
+                    db.update(table)
+                    .where(table.c.year == year)
+                    .values(next_value=table.c.next_value + size)
+                    .returning(table.c.next_value)
+                )
+            if end is not None:
+                self.reservations += 1
+                logger.debug("Reserved contract numbers %d to %d of %d", end - size, end - 1, year)
+                return end - size
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(db.insert(table).values(year=year, next_value=1))
+            except IntegrityError:
+                # created by another process in the meantime
+                pass
+        raise RuntimeError(f"No contract number counter for {year}")
+
+    def _random(self, count: int, year: int) -> list[str]:
+        numbers: set[str] = set()
+        while len(numbers) < count:
+            candidates = {
+                generate_contract_number(year=year) for _ in range(count - len(numbers))
+            } - numbers
+            taken = set(
+                db.session.scalars(
+                    db.select(Contract.number).where(Contract.number.in_(candidates))
+                )
+            )
+            numbers |= candidates - taken
+        return sorted(numbers)
+
+
+def document_columns(kind: str) -> tuple[InstrumentedAttribute, ...]:
+    """Digest, size and mime type columns of a contract document
+
+    Keyword arguments:
+    kind: str - "signed" or "canceled"
+    Return: tuple[InstrumentedAttribute, ...]
+    """
+    if kind not in DOCUMENTS:
+        raise ValueError(f"Unknown contract document {kind!r}")
+    return tuple(getattr(Contract, f"{kind}_pdf_{field}") for field in ("digest", "size", "mime"))
+
+
+def attach_document(contract: Contract, kind: str, blob: Blob, mime: str) -> None:
+    """Point a contract document to a stored blob, the caller commits
+
+    Keyword arguments:
+    contract: Contract - contract of the document
+    kind: str - "signed" or "canceled"
+    blob: Blob - stored content
+    mime: str - mime type of the content
+    """
+    for column, value in zip(document_columns(kind), (blob.digest, blob.size, mime)):
+        setattr(contract, column.key, value)
+
+
+def referenced_blobs() -> set[str]:
+    """Digests of all contract documents
+
+    Return: set[str]
+    """
+    digests: set[str] = set()
+    for kind in DOCUMENTS:
+        column = document_columns(kind)[0]
+        digests.update(db.session.scalars(db.select(column).where(column.is_not(None))))
+    return digests
+
+
+@click.command("collect-blobs")
+@click.option("--min-age", default=3600, help="Keep blobs changed in the last seconds.")
+@with_appcontext
+def collect_blobs_command(min_age: int) -> None:
+    """Delete stored documents no contract refers to."""
+    store: BlobStore = current_app.extensions["blob_store"]
+    click.echo(f"{store.collect_garbage(referenced_blobs(), min_age)} blobs deleted")
@@ -0,0 +1,134 @@
+import logging
+import threading
+from collections.abc import Callable
+
+import dns.resolver
+import email_validator
+from email_validator.deliverability import validate_email_deliverability
+from flask import Flask
+from werkzeug.utils import import_string
+
+from attendance_logger.utils.cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+# resolver(domain, timeout) -> True if deliverable, False if not, None if unknown
+Resolver = Callable[[str, float], bool | None]
+
+
+def dns_resolver(domain: str, timeout: float) -> bool | None:
+    """Check MX (or A/AAAA fallback) records of a domain
+
+    Keyword arguments:
+    domain: str - ASCII domain name
+    timeout: float - DNS lifetime in seconds
+    Return: bool | None - None if the DNS didn't answer in time
+    """
+    resolver = dns.resolver.Resolver()
+    resolver.lifetime = timeout
+    try:
+        info = validate_email_deliverability(domain, domain, dns_resolver=resolver)
+    except email_validator.EmailUndeliverableError:
+        return False
+    if "unknown-deliverability" in info:
+        return None
+    return True
+
+
+def syntax_only_resolver(domain: str, timeout: float) -> None:
+    """Resolver for offline deployments, deliverability is always unknown"""
+    return None
+
+
+class DomainDeliverabilityCache:
+    """Email validation with a per-domain cache of DNS deliverability checks.
+
+    Deliverable and undeliverable domains are cached with separate TTLs.
+    If the resolver can't answer within the timeout the email is accepted
+    after syntax validation and the domain is retried after a short TTL.
+    """
+
+    def __init__(self, app: Flask | None = None, resolver: Resolver | None = None):
+        self.resolver = resolver
+        self.cache = TTLCache(maxsize=10_000, ttl=86_400)
+        self._lock = threading.Lock()
+        self._lookups = 0
+        self._unknown = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure cache and resolver
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.positive_ttl = app.config.get("EMAIL_DNS_POSITIVE_TTL", 86_400)
+        self.negative_ttl = app.config.get("EMAIL_DNS_NEGATIVE_TTL", 600)
+        self.unknown_ttl = app.config.get("EMAIL_DNS_UNKNOWN_TTL", 60)
+        self.timeout = app.config.get("EMAIL_DNS_TIMEOUT", 2.0)
+        self.cache = TTLCache(
+            maxsize=app.config.get("EMAIL_DNS_CACHE_SIZE", 10_000),
+            ttl=self.positive_ttl,
+        )
+        resolver = app.config.get("EMAIL_DNS_RESOLVER")
+        if resolver:
+            self.resolver = import_string(resolver)
+        elif self.resolver is None:
+            self.resolver = dns_resolver
+        app.extensions["email_domains"] = self
+
+    def validate_email(self, email: str) -> bool:
+        """Validate email syntax and deliverability of its domain
+
+        Keyword arguments:
+        email: str - email address
+        Return: bool - False if the syntax is invalid or the domain doesn't
+        accept emails
+        """
+        try:
+            validated = email_validator.validate_email(email, check_deliverability=False)
+        except email_validator.EmailNotValidError:
+            return False
+        return self.is_deliverable(validated.ascii_domain)
+
+    def is_deliverable(self, domain: str) -> bool:
+        """Cached deliverability of a domain, unknown domains count as deliverable
+
+        Keyword arguments:
+        domain: str - ASCII domain name
+        Return: bool
+        """
+        domain = domain.lower()
+        deliverable = self.cache.get(domain)
+        if deliverable is not None:
+            return deliverable
+        with self._lock:
+            self._lookups += 1
+        deliverable = self.resolver(domain, self.timeout)
+        if deliverable is None:
+            logger.warning("Deliverability of %s is unknown, checked syntax only.", domain)
+            with self._lock:
+                self._unknown += 1
+            self.cache.set(domain, True, ttl=self.unknown_ttl)
+            return True
+        self.cache.set(
+            domain,
+            deliverable,
+            ttl=self.positive_ttl if deliverable else self.negative_ttl,
+        )
+        return deliverable
+
+    def metrics(self) -> dict[str, int]:
+        """Cache and resolver counters
+
+        Return: dict[str, int]
+        """
+        with self._lock:
+            return {
+                "cache_hits_total": self.cache.hits,
+                "cache_misses_total": self.cache.misses,
+                "lookups_total": self._lookups,
+                "unknown_total": self._unknown,
+            }
@@ -0,0 +1,238 @@
+import logging
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from flask import Flask
+
+from attendance_logger.utils import auth
+
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when no Argon2 slot frees up within the configured queue timeout."""
+
+
+class HashingService:
+    """Run Argon2 hashing and verification on a bounded worker pool.
+
+    Every Argon2 job holds up to `memory_cost` KiB, so the number of concurrent
+    jobs is capped by the pool size. Callers wait at most `HASHING_QUEUE_TIMEOUT`
+    seconds for a free slot, afterwards `HashingPoolSaturated` is raised and the
+    request can be answered with 503 instead of piling up.
+    """
+
+    def __init__(self, app: Flask | None = None) -> None:
+        self._executor: Executor | None = None
+        self._slots: threading.BoundedSemaphore | None = None
+        self._lock = threading.Lock()
+        self.max_workers = 0
+        self.queue_timeout = 0.0
+        self._in_flight = 0
+        self._jobs = 0
+        self._rejected = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Create the worker pool from the app configuration
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.max_workers = app.config.get("HASHING_MAX_WORKERS", 2)
+        max_queue = app.config.get("HASHING_MAX_QUEUE", 8)
+        self.queue_timeout = app.config.get("HASHING_QUEUE_TIMEOUT", 0.5)
+        executor_type = app.config.get("HASHING_EXECUTOR", "thread")
+        parameters = (
+            app.config.get("ARGON2_MEMORY_COST", 65536),
+            app.config.get("ARGON2_TIME_COST", 3),
+            app.config.get("ARGON2_PARALLELISM", 4),
+        )
+        auth.configure_password_hasher(*parameters)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if executor_type == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=auth.configure_password_hasher,
+                initargs=parameters,
+            )
+        else:
+            # argon2-cffi releases the GIL while hashing, threads are sufficient
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="argon2"
+            )
+        self._slots = threading.BoundedSemaphore(self.max_workers + max_queue)
+        app.extensions["hashing"] = self
+        logger.debug(
+            "Hashing pool started: %s executor, %d workers, %d queued jobs",
+            executor_type,
+            self.max_workers,
+            max_queue,
+        )
+
+    def hash(self, password: str) -> str:
+        """Hash password on the worker pool
+
+        Keyword arguments:
+        password: str - plain text password
+        Return: str - hashed password
+        """
+        return self._run(auth.hash_password, password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """Check password against its hash on the worker pool
+
+        Keyword arguments:
+        password: str - plain text password
+        hashed: str - hashed password
+        Return: bool - True if password matches its hash, False otherwise
+        """
+        return self._run(auth.check_password_hash, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Check whether the stored hash uses outdated Argon2 parameters
+
+        Keyword arguments:
+        hashed: str - hashed password
+        Return: bool - True if password should be hashed again
+        """
+        return auth.password_needs_rehash(hashed)
+
+    def metrics(self) -> dict[str, float]:
+        """Snapshot of pool usage
+
+        Return: dict[str, float] - queue depth, jobs in flight, finished and
+        rejected jobs as well as latency statistics in seconds
+        """
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.max_workers),
+                "jobs_total": self._jobs,
+                "rejected_total": self._rejected,
+                "latency_seconds_sum": self._latency_sum,
+                "latency_seconds_max": self._latency_max,
+            }
+
+    def _run(self, func: Callable, *args: Any) -> Any:
+        if self._executor is None or self._slots is None:
+            raise RuntimeError("HashingService is not initialized.")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._rejected += 1
+            logger.warning("Hashing pool saturated, rejecting job.")
+            raise HashingPoolSaturated
+        start = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            latency = time.perf_counter() - start
+            with self._lock:
+                self._in_flight -= 1
+                self._jobs += 1
+                self._latency_sum += latency
+                self._latency_max = max(self._latency_max, latency)
+            self._slots.release()
+
+
+def measure_verify_latency(
+    memory_cost: int, time_cost: int, parallelism: int, samples: int
+) -> list[float]:
+    """Measure Argon2 verification time for given parameters
+
+    Keyword arguments:
+    memory_cost: int - memory usage in KiB
+    time_cost: int - number of iterations
+    parallelism: int - number of parallel threads
+    samples: int - number of verifications
+    Return: list[float] - measured latencies in milliseconds
+    """
+    hasher = auth.build_password_hasher(memory_cost, time_cost, parallelism)
+    hashed = hasher.hash("calibration password")
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.verify(hashed, "calibration password")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def calibrate(
+    target_ms: float = 150.0,
+    percentile: int = 95,
+    parallelism: int = 4,
+    max_memory_cost: int = 262144,
+    min_memory_cost: int = 19456,
+    max_time_cost: int = 10,
+    samples: int = 10,
+    measure: Callable[[int, int, int, int], list[float]] = measure_verify_latency,
+) -> dict[str, float]:
+    """Find the strongest Argon2 parameters whose verification stays within
+    the target latency on this host.
+
+    Memory cost is preferred over time cost: starting with `max_memory_cost`
+    the memory is halved until a single iteration fits the target, then the
+    number of iterations is raised as long as the target holds.
+
+    Keyword arguments:
+    target_ms: float - target verification latency in milliseconds
+    percentile: int - percentile of measured latencies compared to the target,
+    1 to 100 where 100 is the slowest measurement
+    parallelism: int - number of parallel threads
+    max_memory_cost: int - upper bound for memory usage in KiB
+    min_memory_cost: int - lower bound for memory usage in KiB
+    max_time_cost: int - upper bound for number of iterations
+    samples: int - verifications per measured parameter set
+    measure: Callable - benchmark function, see measure_verify_latency
+
+    Return: dict[str, float] - memory_cost, time_cost, parallelism and the
+    measured latency in milliseconds
+    """
+
+    if not 1 <= percentile <= 100:
+        raise ValueError(f"Percentile must be between 1 and 100, got {percentile}")
+
+    def latency(memory_cost: int, time_cost: int) -> float:
+        measured = measure(memory_cost, time_cost, parallelism, samples)
+        if len(measured) < 2 or percentile == 100:
+            return max(measured)
+        return statistics.quantiles(measured, n=100, method="inclusive")[
+            percentile - 1
+        ]
+
+    memory_cost = max_memory_cost
+    measured = latency(memory_cost, 1)
+    while measured > target_ms and memory_cost // 2 >= min_memory_cost:
+        memory_cost //= 2
+        measured = latency(memory_cost, 1)
+    time_cost = 1
+    while time_cost < max_time_cost:
+        candidate = latency(memory_cost, time_cost + 1)
+        if candidate > target_ms:
+            break
+        time_cost += 1
+        measured = candidate
+    logger.info(
+        "Calibrated Argon2: memory_cost=%d time_cost=%d p%d=%.1f ms",
+        memory_cost,
+        time_cost,
+        percentile,
+        measured,
+    )
+    return {
+        "memory_cost": memory_cost,
+        "time_cost": time_cost,
+        "parallelism": parallelism,
+        "latency_ms": measured,
+    }
@@ -0,0 +1,300 @@
+import csv
+import datetime as dt
+import itertools
+import logging
+from collections.abc import Callable, Iterable
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Client, ClientParticipant, Contract, Group, Location
+from attendance_logger.schemes.imports_v1 import ClientRow
+from attendance_logger.utils import utils
+
+
+logger = logging.getLogger(__name__)
+REQUIRED_COLUMNS = frozenset(
+    name for name, field in ClientRow.model_fields.items() if field.is_required()
+)
+# group name to (location name, location address, group id, group end) of its groups
+GroupLookup = dict[str, list[tuple[str | None, str | None, int, dt.date]]]
+
+
+class ImportFormatError(ValueError):
+    """Raised if the CSV header lacks required columns, nothing is imported then"""
+
+
+class ImportReport:
+    """Counts of an import and the errors of rejected rows. Only the first
+    `max_errors` errors are kept, `on_error` sees all of them."""
+
+    def __init__(
+        self,
+        max_errors: int = 1000,
+        on_error: Callable[[int, dict[str, str]], None] | None = None,
+    ) -> None:
+        self.rows = 0
+        self.clients = 0
+        self.contracts = 0
+        self.participants = 0
+        self.rejected = 0
+        self.errors: list[dict] = []
+        self.max_errors = max_errors
+        self.on_error = on_error
+
+    def reject(self, row: int, messages: dict[str, str]) -> None:
+        """Record an invalid row
+
+        Keyword arguments:
+        row: int - number of the data row, the header isn't counted
+        messages: dict[str, str] - message per column, "row" for the whole row
+        """
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "messages": messages})
+        if self.on_error is not None:
+            self.on_error(row, messages)
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "clients": self.clients,
+            "contracts": self.contracts,
+            "participants": self.participants,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+def import_clients(
+    lines: Iterable[str], report: ImportReport | None = None, batch_size: int | None = None
+) -> ImportReport:
+    """Import clients with their contracts and group participations from CSV.
+
+    Rows are read as a stream and handled in batches, memory doesn't depend on
+    the size of the file. Every batch is validated, written with one executemany
+    insert per table and committed. Invalid rows are reported and skipped, the
+    other rows of their batch are imported. Groups are resolved by name and
+    location from a lookup loaded once, contract numbers left empty are
+    allocated per batch.
+
+    Keyword arguments:
+    lines: Iterable[str] - CSV with a header, e.g. an open file
+    report: ImportReport | None - collects counts and errors, a new one if None
+    batch_size: int | None - rows per batch, IMPORT_BATCH_SIZE if None
+    Return: ImportReport
+    """
+    report = report or ImportReport()
+    batch_size = batch_size or current_app.config.get("IMPORT_BATCH_SIZE", 500)
+    reader = csv.DictReader(lines)
+    missing = REQUIRED_COLUMNS - set(reader.fieldnames or ())
+    if missing:
+        raise ImportFormatError(f"Missing columns: {', '.join(sorted(missing))}.")
+    groups = _group_lookup()
+    for batch in itertools.batched(enumerate(reader, start=1), batch_size):
+        _import_batch(batch, groups, report)
+    logger.info(
+        "Imported %d clients, %d contracts and %d participants, %d of %d rows rejected",
+        report.clients,
+        report.contracts,
+        report.participants,
+        report.rejected,
+        report.rows,
+    )
+    return report
+
+
+def _group_lookup() -> GroupLookup:
+    groups: GroupLookup = {}
+    for group_id, name, until, location_name, address in db.session.execute(
+        db.select(Group.id_, Group.name, Group.active_until, Location.name, Location.address)
+        .outerjoin(Group.location)
+    ):
+        groups.setdefault(name.casefold(), []).append((location_name, address, group_id, until))
+    return groups
+
+
+def _resolve_group(groups: GroupLookup, row: ClientRow) -> tuple[int, dt.date] | str:
+    """Group id and end of the group or an error message"""
+    candidates = groups.get(row.group.casefold(), [])
+    if row.location:
+        location = row.location.casefold()
+        candidates = [
+            candidate
+            for candidate in candidates
+            if location in ((candidate[0] or "").casefold(), (candidate[1] or "").casefold())
+        ]
+    if not candidates:
+        return f"Unknown group {row.group!r}."
+    if len(candidates) > 1:
+        return f"Several groups are called {row.group!r}, add the location."
+    _name, _address, group_id, until = candidates[0]
+    return group_id, until
+
+
+def _import_batch(
+    batch: tuple[tuple[int, dict], ...], groups: GroupLookup, report: ImportReport
+) -> None:
+    valid: list[tuple[int, ClientRow, tuple[int, dt.date] | None]] = []
+    for number, cells in batch:
+        report.rows += 1
+        if None in cells:
+            report.reject(number, {"row": "More cells than columns."})
+            continue
+        try:
+            row = ClientRow.model_validate(cells)
+        except ValidationError as error:
+            report.reject(
+                number,
+                {
+                    ".".join(str(part) for part in detail["loc"]) or "row": detail["msg"]
+                    for detail in error.errors()
+                },
+            )
+            continue
+        group = None
+        if row.group is not None:
+            group = _resolve_group(groups, row)
+            if isinstance(group, str):
+                report.reject(number, {"group": group})
+                continue
+            if (row.participation_end or group[1]) < row.participation_start:
+                report.reject(number, {"participation_start": "The group ends before."})
+                continue
+        valid.append((number, row, group))
+
+    # contract numbers must be new in the database and within the batch
+    given = {row.contract_number for _number, row, _group in valid if row.contract_number}
+    taken = (
+        set(db.session.scalars(db.select(Contract.number).where(Contract.number.in_(given))))
+        if given
+        else set()
+    )
+    rows: list[tuple[int, ClientRow, tuple[int, dt.date] | None]] = []
+    for number, row, group in valid:
+        if row.contract_number is not None:
+            if row.contract_number in taken:
+                report.reject(number, {"contract_number": "Contract number exists."})
+                continue
+            taken.add(row.contract_number)
+        rows.append((number, row, group))
+    if not rows:
+        return
+    # reserved before writing, see ContractNumberAllocator
+    allocated = iter(
+        current_app.extensions["contract_numbers"].allocate(
+            sum(1 for _number, row, _group in rows if row.has_contract and not row.contract_number)
+        )
+    )
+
+    now = utils.get_current_utc_datetime()
+    created = {"created_datetime": now, "created_timezone": 0}
+    try:
+        client_ids = _insert_clients(rows, created)
+        contracts = [
+            {
+                "number": row.contract_number or next(allocated),
+                "client_id": client_id,
+                "signed_on": row.contract_signed_on,
+                **created,
+            }
+            for client_id, (_number, row, _group) in zip(client_ids, rows)
+            if row.has_contract
+        ]
+        participants = [
+            {
+                "client_id": client_id,
+                "group_id": group[0],
+                "start_date": row.participation_start,
+                "end_date": row.participation_end or group[1],
+                **created,
+            }
+            for client_id, (_number, row, group) in zip(client_ids, rows)
+            if group is not None
+        ]
+        for model, values in ((Contract, contracts), (ClientParticipant, participants)):
+            if values:
+                db.session.execute(db.insert(model), values)
+        db.session.commit()
+    except IntegrityError as error:
+        # e.g. a contract number added by somebody else since the check above
+        db.session.rollback()
+        logger.warning("Import batch rejected: %s", error.orig)
+        for number, _row, _group in rows:
+            report.reject(number, {"row": "Conflicts with changes made meanwhile."})
+        return
+    report.clients += len(client_ids)
+    report.contracts += len(contracts)
+    report.participants += len(participants)
+
+
+def _insert_clients(
+    rows: list[tuple[int, ClientRow, tuple[int, dt.date] | None]], created: dict
+) -> list[int]:
+    """Insert the clients of a batch, return their ids in the order of the rows.
+
+    RETURNING rows of a multi-row insert come in no guaranteed order and SQLite
+    can't sort them without inserting row by row, so the ids are matched by the
+    inserted values. Rows with equal values are interchangeable.
+    """
+    columns = (
+        Client.name,
+        Client.child_name,
+        Client.address,
+        Client.phone,
+        Client.childs_birthday,
+        Client.notes,
+    )
+    values = [
+        (row.name, row.child_name, row.address, row.phone, row.childs_birthday, row.notes)
+        for _number, row, _group in rows
+    ]
+    ids: dict[tuple, list[int]] = {}
+    for id_, *key in db.session.execute(
+        db.insert(Client).returning(Client.id_, *columns),
+        [{column.key: value for column, value in zip(columns, key)} | created for key in values],
+    ):
+        ids.setdefault(tuple(key), []).append(id_)
+    return [ids[key].pop() for key in values]
+
+
+@click.command("import-clients")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", type=int, default=None, help="Rows per batch.")
+@click.option(
+    "--errors",
+    "errors_path",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write rejected rows to this CSV file.",
+)
+@with_appcontext
+def import_clients_command(path: str, batch_size: int | None, errors_path: str | None) -> None:
+    """Import clients, contracts and group participations from a CSV file."""
+    with open(path, newline="", encoding="utf-8-sig") as source:
+        if errors_path is None:
+            report = ImportReport(
+                max_errors=0,
+                on_error=lambda row, messages: click.echo(f"row {row}: {messages}", err=True),
+            )
+            import_clients(source, report, batch_size)
+        else:
+            with open(errors_path, "w", newline="", encoding="utf-8") as target:
+                writer = csv.writer(target)
+                writer.writerow(("row", "column", "message"))
+                report = ImportReport(
+                    max_errors=0,
+                    on_error=lambda row, messages: writer.writerows(
+                        (row, column, message) for column, message in messages.items()
+                    ),
+                )
+                import_clients(source, report, batch_size)
+    click.echo(
+        f"{report.clients} clients, {report.contracts} contracts, "
+        f"{report.participants} participants imported, "
+        f"{report.rejected} of {report.rows} rows rejected"
+    )
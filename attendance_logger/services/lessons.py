@@ -0,0 +1,241 @@
+import datetime as dt
+import hashlib
+import logging
+from collections.abc import Iterable, Iterator
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy.orm import selectinload
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Group,
+    Lesson,
+    LessonMaterialization,
+    LessonRollup,
+)
+from attendance_logger.models.models import VisitRoles
+from attendance_logger.services.statistics import RollupDeltas
+from attendance_logger.utils import utils
+
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(group: Group) -> str:
+    """Hash of everything lessons of a group are generated from
+
+    Keyword arguments:
+    group: Group - group with loaded schedules
+    Return: str - hex digest
+    """
+    schedules = sorted(
+        (
+            schedule.id_,
+            schedule.weekday,
+            schedule.start_time_utc.isoformat(),
+            schedule.start_timezone,
+            schedule.end_time_utc.isoformat(),
+            schedule.end_timezone,
+        )
+        for schedule in group.schedules
+    )
+    source = repr((group.active_from, group.active_until, group.location_id, schedules))
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def occurrences(
+    group: Group, first: dt.date, last: dt.date
+) -> Iterator[tuple[int, dt.datetime, int, dt.datetime, int]]:
+    """Lessons of a group between two dates, both included. The weekday of a
+    schedule (1 Monday ... 7 Sunday) refers to the UTC start date.
+
+    Keyword arguments:
+    group: Group - group with loaded schedules
+    first: dt.date - first date
+    last: dt.date - last date
+    Return: Iterator of (schedule id, start, start timezone, end, end timezone)
+    """
+    first = max(first, group.active_from)
+    last = min(last, group.active_until)
+    for schedule in group.schedules:
+        date = first + dt.timedelta(days=(schedule.weekday - first.isoweekday()) % 7)
+        while date <= last:
+            start = dt.datetime.combine(date, schedule.start_time_utc)
+            end = dt.datetime.combine(date, schedule.end_time_utc)
+            if end <= start:
+                # lesson passes midnight UTC
+                end += dt.timedelta(days=1)
+            yield schedule.id_, start, schedule.start_timezone, end, schedule.end_timezone
+            date += dt.timedelta(days=7)
+
+
+def materialize_lessons(
+    until: dt.date,
+    start: dt.date | None = None,
+    group_ids: Iterable[int] | None = None,
+) -> dict[str, int]:
+    """Generate planned lessons from schedules up to a date.
+
+    Groups whose dates, location and schedules are unchanged since the last run
+    only get the lessons after their stored materialized date. For changed
+    groups the planned future lessons are diffed against the schedules:
+    missing ones are inserted, obsolete ones nobody refers to are deleted.
+    Past lessons are never touched.
+
+    Keyword arguments:
+    until: dt.date - last date to generate lessons for
+    start: dt.date | None - first date that may be changed, today if None
+    group_ids: Iterable[int] | None - limit to these groups, all groups if None
+    Return: dict[str, int] - number of processed groups, inserted and deleted lessons
+    """
+    start = start or dt.date.today()
+    query = (
+        db.select(Group)
+        .options(selectinload(Group.schedules))
+        .where(
+            db.or_(
+                db.and_(Group.active_until >= start, Group.active_from <= until),
+                # materialized before, their lessons may be obsolete now
+                Group.id_.in_(db.select(LessonMaterialization.group_id)),
+            )
+        )
+    )
+    if group_ids is not None:
+        query = query.where(Group.id_.in_(list(group_ids)))
+    groups = db.session.scalars(query).all()
+    states = {
+        state.group_id: state
+        for state in db.session.scalars(
+            db.select(LessonMaterialization).where(
+                LessonMaterialization.group_id.in_([group.id_ for group in groups])
+            )
+        )
+    }
+    now = utils.get_current_utc_datetime()
+    rows: list[dict] = []
+    changed: dict[int, set[tuple[int, dt.datetime]]] = {}
+    for group in groups:
+        digest = fingerprint(group)
+        state = states.get(group.id_)
+        if group.active_until < start or group.active_from > until:
+            # diffed against no lessons, the state is added again if the
+            # group returns to the range
+            changed[group.id_] = set()
+            if state is not None:
+                db.session.delete(state)
+            continue
+        if state is not None and state.fingerprint == digest:
+            if state.materialized_until >= until:
+                continue
+            first = max(start, state.materialized_until + dt.timedelta(days=1))
+            rows.extend(
+                _lesson_row(group, occurrence, now)
+                for occurrence in occurrences(group, first, until)
+            )
+        else:
+            changed[group.id_] = set()
+            for occurrence in occurrences(group, start, until):
+                changed[group.id_].add((occurrence[0], occurrence[1]))
+                rows.append(_lesson_row(group, occurrence, now))
+        if state is None:
+            state = LessonMaterialization(group_id=group.id_)
+            db.session.add(state)
+        state.materialized_until = until
+        state.fingerprint = digest
+        state.changed_datetime = now
+
+    deltas = RollupDeltas()
+    deleted = _diff_changed_groups(changed, rows, start, deltas)
+    if rows:
+        # executemany of plain rows, no ORM objects are built
+        db.session.execute(db.insert(Lesson), rows)
+        for row in rows:
+            deltas.add(
+                LessonRollup,
+                (row["group_id"], row["location_id"], row["start_datetime_utc"]),
+                row["state"],
+            )
+    deltas.apply()
+    db.session.commit()
+    result = {"groups": len(groups), "inserted": len(rows), "deleted": deleted}
+    logger.info("Materialized lessons until %s: %s", until, result)
+    return result
+
+
+def _diff_changed_groups(
+    changed: dict[int, set[tuple[int, dt.datetime]]],
+    rows: list[dict],
+    start: dt.date,
+    deltas: RollupDeltas,
+) -> int:
+    """Drop rows of lessons that already exist and delete obsolete planned
+    lessons of changed groups. Returns the number of deleted lessons."""
+    if not changed:
+        return 0
+    existing = db.session.execute(
+        db.select(Lesson.id_, Lesson.group_id, Lesson.schedule_id, Lesson.start_datetime_utc)
+        .where(
+            Lesson.group_id.in_(changed),
+            Lesson.schedule_id.is_not(None),
+            Lesson.start_datetime_utc >= dt.datetime.combine(start, dt.time()),
+        )
+    ).all()
+    present = set()
+    obsolete = []
+    for lesson_id, group_id, schedule_id, start_datetime in existing:
+        if (schedule_id, start_datetime) in changed[group_id]:
+            present.add((group_id, schedule_id, start_datetime))
+        else:
+            obsolete.append(lesson_id)
+    rows[:] = [
+        row
+        for row in rows
+        if (row["group_id"], row["schedule_id"], row["start_datetime_utc"]) not in present
+    ]
+    if not obsolete:
+        return 0
+    unused = db.session.execute(
+        db.select(Lesson.id_, Lesson.group_id, Lesson.location_id, Lesson.start_datetime_utc)
+        .where(
+            Lesson.id_.in_(obsolete),
+            Lesson.state == VisitRoles.PLANED.value,
+            ~Lesson.visitors.any(),
+            ~Lesson.teachers.any(),
+            ~Lesson.favorites.any(),
+        )
+    ).all()
+    if not unused:
+        return 0
+    db.session.execute(db.delete(Lesson).where(Lesson.id_.in_([row[0] for row in unused])))
+    for _lesson_id, *lesson in unused:
+        deltas.add(LessonRollup, tuple(lesson), VisitRoles.PLANED.value, -1)
+    return len(unused)
+
+
+def _lesson_row(group: Group, occurrence: tuple, now: dt.datetime) -> dict:
+    schedule_id, start, start_timezone, end, end_timezone = occurrence
+    return {
+        "state": VisitRoles.PLANED.value,
+        "group_id": group.id_,
+        "schedule_id": schedule_id,
+        "location_id": group.location_id,
+        "start_datetime_utc": start,
+        "start_timezone": start_timezone,
+        "end_datetime_utc": end,
+        "end_timezone": end_timezone,
+        "created_datetime": now,
+        "created_timezone": 0,
+    }
+
+
+@click.command("materialize-lessons")
+@click.option("--days", default=90, show_default=True, help="Horizon in days from today.")
+@with_appcontext
+def materialize_lessons_command(days: int) -> None:
+    """Generate planned lessons from group schedules."""
+    result = materialize_lessons(dt.date.today() + dt.timedelta(days=days))
+    click.echo(
+        f"{result['groups']} groups, {result['inserted']} lessons added, "
+        f"{result['deleted']} removed."
+    )
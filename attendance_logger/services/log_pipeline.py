@@ -0,0 +1,253 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from flask import Flask, Response, g, has_request_context, request
+
+
+access_logger = logging.getLogger("attendance_logger.access")
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
+REQUEST_ID_HEADER = "X-Request-ID"
+# kept in the WSGI environ, routes may push app contexts with a fresh `g`
+_ID_KEY = "attendance_logger.request_id"
+_START_KEY = "attendance_logger.request_start"
+
+
+class RequestContextFilter(logging.Filter):
+    """Add request id, user id and request latency to records logged while a
+    request is handled. Runs on the calling thread before the record is queued.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = None
+        record.user_id = None
+        record.latency_ms = None
+        if has_request_context():
+            record.request_id = request.environ.get(_ID_KEY)
+            record.user_id = _current_user_id()
+            start = request.environ.get(_START_KEY)
+            if start is not None:
+                record.latency_ms = round((time.perf_counter() - start) * 1000, 3)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "user_id": getattr(record, "user_id", None),
+            "latency_ms": getattr(record, "latency_ms", None),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        if record.stack_info:
+            data["stack_info"] = record.stack_info
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the logging thread.
+
+    If the queue is full the record is dropped ("drop_new") or the oldest queued
+    record is discarded to make room ("drop_old"). Dropped records are counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "drop_new") -> None:
+        super().__init__(log_queue)
+        if overflow not in ("drop_new", "drop_old"):
+            raise ValueError(f"Unknown overflow policy {overflow!r}")
+        self.overflow = overflow
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge arguments and render the traceback now, but leave the
+        # formatting to the handlers of the listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow == "drop_new":
+                self._count(dropped=1)
+                return
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+            self._count(dropped=1)
+        else:
+            self._count(queued=1)
+
+    def _count(self, queued: int = 0, dropped: int = 0) -> None:
+        with self._lock:
+            self.queued += queued
+            self.dropped += dropped
+
+
+class LoggingPipeline:
+    """Process-wide logging through a bounded queue.
+
+    Loggers only put records into the queue, a listener thread writes them to
+    stderr and the rotating log file. Levels of single loggers come from
+    `LOG_LEVELS`, e.g. "attendance_logger.blueprints=DEBUG,sqlalchemy.engine=INFO".
+    """
+
+    def __init__(self, app: Flask | None = None) -> None:
+        self.handler: DroppingQueueHandler | None = None
+        self.listener: QueueListener | None = None
+        atexit.register(self.stop)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Replace root handlers with the queue and register request hooks
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.configure(
+            level=app.config.get("LOG_LEVEL", "INFO"),
+            levels=app.config.get("LOG_LEVELS", ""),
+            log_format=app.config.get("LOG_FORMAT", "text"),
+            log_file=app.config.get("LOG_FILE", ""),
+            queue_size=app.config.get("LOG_QUEUE_SIZE", 10_000),
+            overflow=app.config.get("LOG_QUEUE_OVERFLOW", "drop_new"),
+        )
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
+        app.extensions["log_pipeline"] = self
+
+    def configure(
+        self,
+        level: str = "INFO",
+        levels: str = "",
+        log_format: str = "text",
+        log_file: str = "",
+        queue_size: int = 10_000,
+        overflow: str = "drop_new",
+        handlers: list[logging.Handler] | None = None,
+    ) -> None:
+        """Set up the queue, the listener and logger levels
+
+        Keyword arguments:
+        level: str - level of the root logger
+        levels: str - comma separated "logger=LEVEL" pairs
+        log_format: str - "text" or "json"
+        log_file: str - path of the rotating log file, disabled if empty
+        queue_size: int - maximum number of queued records
+        overflow: str - "drop_new" or "drop_old"
+        handlers: list[logging.Handler] | None - output handlers, stderr and
+        log_file if None
+        """
+        self.stop()
+        if handlers is None:
+            handlers = [logging.StreamHandler(sys.stderr)]
+            if log_file:
+                Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+                handlers.append(
+                    RotatingFileHandler(
+                        log_file, maxBytes=1_000_000, backupCount=5, encoding="utf-8"
+                    )
+                )
+        formatter = JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        self.handler = DroppingQueueHandler(queue.Queue(queue_size), overflow)
+        self.handler.addFilter(RequestContextFilter())
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(level.upper())
+        for name, name_level in parse_levels(levels).items():
+            logging.getLogger(name).setLevel(name_level)
+
+        self.listener = QueueListener(
+            self.handler.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Flush queued records and stop the listener thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        if self.handler is not None:
+            logging.getLogger().removeHandler(self.handler)
+
+    def metrics(self) -> dict[str, int]:
+        """Queue depth and counters of queued and dropped records
+
+        Return: dict[str, int]
+        """
+        if self.handler is None:
+            return {"queue_depth": 0, "queued_total": 0, "dropped_total": 0}
+        return {
+            "queue_depth": self.handler.queue.qsize(),
+            "queued_total": self.handler.queued,
+            "dropped_total": self.handler.dropped,
+        }
+
+
+def parse_levels(levels: str) -> dict[str, str]:
+    """Parse "logger=LEVEL" pairs separated by commas
+
+    Keyword arguments:
+    levels: str - e.g. "attendance_logger.blueprints=DEBUG,werkzeug=WARNING"
+    Return: dict[str, str] - logger name to upper case level name
+    """
+    parsed = {}
+    for pair in levels.split(","):
+        if not pair.strip():
+            continue
+        name, _, level = pair.partition("=")
+        if not level.strip():
+            raise ValueError(f"Logger level {pair!r} must look like name=LEVEL")
+        parsed[name.strip()] = level.strip().upper()
+    return parsed
+
+
+def _current_user_id() -> str | None:
+    jwt_data = g.get("_jwt_extended_jwt")
+    return jwt_data.get("sub") if jwt_data else None
+
+
+def _start_request() -> None:
+    request.environ[_START_KEY] = time.perf_counter()
+    # ids of upstream proxies are kept, but truncated
+    request.environ[_ID_KEY] = (
+        request.headers.get(REQUEST_ID_HEADER, "")[:64] or uuid.uuid4().hex
+    )
+
+
+def _finish_request(response: Response) -> Response:
+    response.headers[REQUEST_ID_HEADER] = request.environ.get(_ID_KEY, "")
+    access_logger.info(
+        "%s %s %s", request.method, request.path, response.status_code
+    )
+    return response
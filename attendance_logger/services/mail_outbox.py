@@ -0,0 +1,221 @@
+import datetime as dt
+import logging
+import smtplib
+import threading
+from collections.abc import Callable
+
+import click
+from flask import Flask
+from flask.cli import with_appcontext
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import EmailOutbox
+from attendance_logger.models.models import OutboxStates
+from attendance_logger.utils import communication, utils
+
+
+logger = logging.getLogger(__name__)
+# errors caused by a single message, the connection stays usable
+_MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+class OutboxSender:
+    """Deliver queued emails over one reused SMTP connection.
+
+    Messages are sent in batches. A failed message is retried with exponential
+    backoff until `EMAIL_OUTBOX_MAX_ATTEMPTS` is reached. Only one sender should
+    run per database, either as the background thread of a single worker
+    (`EMAIL_OUTBOX_WORKER`) or as `flask send-outbox --loop`.
+    """
+
+    def __init__(
+        self,
+        app: Flask | None = None,
+        smtp_factory: Callable[[], smtplib.SMTP] = communication.connect_smtp,
+    ) -> None:
+        self.app: Flask | None = None
+        self.smtp_factory = smtp_factory
+        self._smtp: smtplib.SMTP | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Read outbox settings and start the background thread if enabled
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.app = app
+        self.batch_size = app.config.get("EMAIL_OUTBOX_BATCH_SIZE", 50)
+        self.poll_interval = app.config.get("EMAIL_OUTBOX_POLL_INTERVAL", 5.0)
+        self.max_attempts = app.config.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 8)
+        self.backoff = app.config.get("EMAIL_OUTBOX_BACKOFF", 30.0)
+        app.extensions["outbox_sender"] = self
+        if app.config.get("EMAIL_OUTBOX_WORKER", False):
+            self.start()
+
+    def start(self) -> None:
+        """Start the background sender thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="email-outbox", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and close the SMTP connection"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._disconnect()
+
+    def wake(self) -> None:
+        """Notify the background thread about new messages"""
+        self._wake.set()
+
+    def run(self) -> None:
+        """Send batches until stopped, sleeping while the outbox is empty"""
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    sent = self.send_batch()
+            except Exception:
+                logger.exception("Email outbox sender failed.")
+                sent = 0
+            if sent == 0:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        self._disconnect()
+
+    def send_batch(self) -> int:
+        """Send one batch of due messages. Requires an application context.
+
+        Return: int - number of processed messages, 0 while the server is unreachable
+        """
+        now = utils.get_current_utc_datetime()
+        messages = db.session.scalars(
+            db.select(EmailOutbox)
+            .where(
+                EmailOutbox.state == OutboxStates.PENDING.value,
+                EmailOutbox.next_attempt_utc <= now,
+            )
+            .order_by(EmailOutbox.next_attempt_utc, EmailOutbox.id_)
+            .limit(self.batch_size)
+        ).all()
+        processed = 0
+        for message in messages:
+            processed += 1
+            try:
+                self._send(message)
+            except _MESSAGE_ERRORS as error:
+                self._schedule_retry(message, error, now)
+            except (smtplib.SMTPException, OSError) as error:
+                # the server is unreachable, no message is charged an attempt
+                # and the caller waits before connecting again
+                message.last_error = str(error)[:1000]
+                logger.warning("Email server is unreachable: %s", error)
+                processed = 0
+                break
+            else:
+                message.state = OutboxStates.SENT.value
+                message.sent_at_utc = utils.get_current_utc_datetime()
+                message.attempts += 1
+                with self._lock:
+                    self._sent += 1
+        db.session.commit()
+        return processed
+
+    def metrics(self) -> dict[str, int]:
+        """Outbox queue depth and delivery counters. Requires an application context.
+
+        Return: dict[str, int]
+        """
+        depth = db.session.scalar(
+            db.select(db.func.count(EmailOutbox.id_)).where(
+                EmailOutbox.state == OutboxStates.PENDING.value
+            )
+        )
+        with self._lock:
+            return {
+                "queue_depth": depth,
+                "sent_total": self._sent,
+                "retried_total": self._retried,
+                "failed_total": self._failed,
+            }
+
+    def _send(self, message: EmailOutbox) -> None:
+        msg = communication.build_message(message.email_to, message.subject, message.body)
+        try:
+            if self._smtp is None:
+                self._smtp = self.smtp_factory()
+            try:
+                self._smtp.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # the server closed the idle connection, reconnect once
+                self._smtp = self.smtp_factory()
+                self._smtp.send_message(msg)
+        except _MESSAGE_ERRORS:
+            raise
+        except (smtplib.SMTPException, OSError):
+            self._disconnect()
+            raise
+
+    def _schedule_retry(
+        self, message: EmailOutbox, error: Exception, now: dt.datetime
+    ) -> None:
+        message.attempts += 1
+        message.last_error = str(error)[:1000]
+        if message.attempts >= self.max_attempts:
+            message.state = OutboxStates.FAILED.value
+            logger.error("Giving up email %d to %s: %s", message.id_, message.email_to, error)
+            with self._lock:
+                self._failed += 1
+            return
+        delay = min(self.backoff * 2 ** (message.attempts - 1), 3600)
+        message.next_attempt_utc = now + dt.timedelta(seconds=delay)
+        logger.warning(
+            "Sending email %d failed, retry in %d s: %s", message.id_, delay, error
+        )
+        with self._lock:
+            self._retried += 1
+
+    def _disconnect(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+
+@click.command("send-outbox")
+@click.option("--loop", is_flag=True, help="Keep sending until interrupted.")
+@with_appcontext
+def send_outbox_command(loop: bool) -> None:
+    """Deliver queued emails."""
+    from flask import current_app
+
+    sender: OutboxSender = current_app.extensions["outbox_sender"]
+    if loop:
+        sender.run()
+        return
+    total = 0
+    while (sent := sender.send_batch()) > 0:
+        total += sent
+    sender._disconnect()
+    click.echo(f"Processed {total} emails.")
@@ -0,0 +1,226 @@
+import bisect
+import re
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+
+from flask import Flask, Response, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from attendance_logger.models.database import db
+
+
+# seconds, close to the default buckets of the Prometheus clients
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+_START_KEY = "attendance_logger.metrics_start"
+_QUERIES_KEY = "attendance_logger.metrics_queries"
+_DB_TIME_KEY = "attendance_logger.metrics_db_time"
+_QUERY_START = "attendance_logger.metrics_query_start"
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds"""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # the last slot counts observations above the largest bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Count one observation, the caller holds the registry lock"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Bucket bounds with cumulative counts, "+Inf" last
+
+        Return: list[tuple[str, int]]
+        """
+        total = 0
+        result = []
+        for bound, count in zip((*map(_number, self.buckets), "+Inf"), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics:
+    """Request, database and connection pool metrics in Prometheus text format.
+
+    Recording is a few dictionary updates under one lock per request and per
+    query. Counters of other extensions (hashing pool, login limiter, email
+    outbox, ...) are collected from their `metrics()` only when scraped.
+    """
+
+    def __init__(self, app: Flask | None = None) -> None:
+        self._lock = threading.Lock()
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.db_queries: dict[tuple[str, str], Histogram] = {}
+        self.db_time: dict[tuple[str, str], Histogram] = {}
+        self.responses: defaultdict[tuple[str, str, int], int] = defaultdict(int)
+        self.queries_total = 0
+        self.query_seconds_total = 0.0
+        self.pool = {"connects_total": 0, "checkouts_total": 0, "checked_out": 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Register request hooks and SQLAlchemy engine and pool events
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.app = app
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        listeners = (
+            (Engine, "before_cursor_execute", self._before_cursor_execute),
+            (Engine, "after_cursor_execute", self._after_cursor_execute),
+            (Pool, "connect", self._on_connect),
+            (Pool, "checkout", self._on_checkout),
+            (Pool, "checkin", self._on_checkin),
+        )
+        for target, identifier, listener in listeners:
+            if not event.contains(target, identifier, listener):
+                event.listen(target, identifier, listener)
+        app.extensions["metrics"] = self
+
+    def render(self) -> str:
+        """Current values in the Prometheus text exposition format
+
+        Return: str
+        """
+        lines: list[str] = []
+        with self._lock:
+            _histograms(
+                lines,
+                "http_request_duration_seconds",
+                "Request latency by endpoint.",
+                self.latency,
+            )
+            _histograms(
+                lines,
+                "http_request_db_queries",
+                "Database queries per request by endpoint.",
+                self.db_queries,
+            )
+            _histograms(
+                lines,
+                "http_request_db_seconds",
+                "Database time per request by endpoint.",
+                self.db_time,
+            )
+            lines.append("# HELP http_responses_total Responses by endpoint and status.")
+            lines.append("# TYPE http_responses_total counter")
+            for (endpoint, method, status), count in sorted(self.responses.items()):
+                labels = _labels(endpoint=endpoint, method=method, status=status)
+                lines.append(f"http_responses_total{labels} {count}")
+            _sample(lines, "db_queries_total", "counter", self.queries_total)
+            _sample(lines, "db_query_seconds_total", "counter", self.query_seconds_total)
+            _sample(lines, "db_pool_connects_total", "counter", self.pool["connects_total"])
+            _sample(lines, "db_pool_checkouts_total", "counter", self.pool["checkouts_total"])
+            _sample(lines, "db_pool_checked_out", "gauge", self.pool["checked_out"])
+        pool = db.engine.pool
+        # QueuePool only, SQLite in memory uses a pool without limits
+        for attribute in ("size", "overflow"):
+            if callable(getattr(pool, attribute, None)):
+                _sample(lines, f"db_pool_{attribute}", "gauge", getattr(pool, attribute)())
+        for name, extension in sorted(self.app.extensions.items()):
+            if extension is self or not callable(getattr(extension, "metrics", None)):
+                continue
+            for key, value in extension.metrics().items():
+                kind = "counter" if key.endswith(("_total", "_sum")) else "gauge"
+                _sample(lines, re.sub(r"\W", "_", f"{name}_{key}"), kind, value)
+        return "\n".join(lines) + "\n"
+
+    def _start_request(self) -> None:
+        request.environ[_START_KEY] = time.perf_counter()
+        request.environ[_QUERIES_KEY] = 0
+        request.environ[_DB_TIME_KEY] = 0.0
+
+    def _finish_request(self, response: Response) -> Response:
+        start = request.environ.get(_START_KEY)
+        if start is None:
+            return response
+        latency = time.perf_counter() - start
+        key = (request.endpoint or "unmatched", request.method)
+        with self._lock:
+            if key not in self.latency:
+                self.latency[key] = Histogram()
+                self.db_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+                self.db_time[key] = Histogram()
+            self.latency[key].observe(latency)
+            self.db_queries[key].observe(request.environ[_QUERIES_KEY])
+            self.db_time[key].observe(request.environ[_DB_TIME_KEY])
+            self.responses[(*key, response.status_code)] += 1
+        return response
+
+    def _before_cursor_execute(self, conn, _cursor, _statement, *_args) -> None:
+        conn.info[_QUERY_START] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, _cursor, _statement, *_args) -> None:
+        start = conn.info.pop(_QUERY_START, None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.queries_total += 1
+            self.query_seconds_total += elapsed
+        if has_request_context() and _QUERIES_KEY in request.environ:
+            request.environ[_QUERIES_KEY] += 1
+            request.environ[_DB_TIME_KEY] += elapsed
+
+    def _on_connect(self, *_args) -> None:
+        with self._lock:
+            self.pool["connects_total"] += 1
+
+    def _on_checkout(self, *_args) -> None:
+        with self._lock:
+            self.pool["checkouts_total"] += 1
+            self.pool["checked_out"] += 1
+
+    def _on_checkin(self, *_args) -> None:
+        with self._lock:
+            self.pool["checked_out"] -= 1
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else f"{value:g}"
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    pairs = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _sample(lines: list[str], name: str, kind: str, value: float) -> None:
+    lines.append(f"# TYPE {name} {kind}")
+    lines.append(f"{name} {_number(value)}")
+
+
+def _histograms(
+    lines: list[str],
+    name: str,
+    description: str,
+    histograms: dict[tuple[str, str], Histogram],
+) -> None:
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} histogram")
+    for (endpoint, method), histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            labels = _labels(endpoint=endpoint, method=method, le=bound)
+            lines.append(f"{name}_bucket{labels} {count}")
+        labels = _labels(endpoint=endpoint, method=method)
+        lines.append(f"{name}_sum{labels} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{labels} {histogram.count}")
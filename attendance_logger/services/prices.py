@@ -0,0 +1,242 @@
+import bisect
+import datetime as dt
+import heapq
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import NamedTuple
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Price
+from attendance_logger.schemes import responses
+
+
+logger = logging.getLogger(__name__)
+
+
+class AppliedPrice(NamedTuple):
+    price_id: int
+    value: float
+
+
+# starts of the segments of a category for bisect and the segments
+_Category = tuple[list[dt.datetime], list["_Segment"]]
+
+
+class _Segment(NamedTuple):
+    start: dt.datetime
+    # None for open ended prices
+    end: dt.datetime | None
+    price: AppliedPrice
+
+
+class PriceIndex:
+    """Per-process index of the price applied to a category at a moment.
+
+    Prices of a category are flattened into disjoint segments sorted by start,
+    a lookup is one bisect. Where ranges overlap the price starting last
+    applies. The index and the serialized `GET /prices` listing are built
+    together with one query on first use after an invalidation. Flushes and
+    bulk statements touching prices drop them immediately and once more after
+    commit, the TTL bounds staleness for changes made by other processes.
+    """
+
+    def __init__(
+        self, app: Flask | None = None, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.ttl = 60.0
+        self.clock = clock
+        self.builds = 0
+        self._lock = threading.Lock()
+        self._generation = 0
+        # expiry, segments per category and the listing
+        self._state: tuple[float, dict[int, _Category], bytes] | None = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure the TTL and hook invalidation events
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.ttl = app.config.get("PRICE_CACHE_TTL", 60)
+        listeners = (
+            (Price, "after_insert", self._on_price_flushed),
+            (Price, "after_update", self._on_price_flushed),
+            (Price, "after_delete", self._on_price_flushed),
+            (Session, "after_commit", self._on_commit),
+            (Session, "do_orm_execute", self._on_orm_execute),
+            (Engine, "after_execute", self._on_execute),
+        )
+        for target, identifier, listener in listeners:
+            if not event.contains(target, identifier, listener):
+                event.listen(target, identifier, listener)
+        app.extensions["price_index"] = self
+
+    def resolve(self, category: int, moment: dt.datetime) -> AppliedPrice | None:
+        """Price applied to a category at a moment
+
+        Keyword arguments:
+        category: int - see models.PriceCategories
+        moment: dt.datetime - naive UTC or aware
+        Return: AppliedPrice | None - None if no price covers the moment
+        """
+        return self.resolve_many([(category, moment)])[0]
+
+    def resolve_many(
+        self, pairs: Iterable[tuple[int, dt.datetime]]
+    ) -> list[AppliedPrice | None]:
+        """Prices applied to many (category, moment) pairs
+
+        Keyword arguments:
+        pairs: Iterable[tuple[int, dt.datetime]] - categories with moments
+        Return: list[AppliedPrice | None] - in the order of the pairs
+        """
+        categories = self._load()[1]
+        result = []
+        for category, moment in pairs:
+            moment = _naive_utc(moment)
+            starts, rows = categories.get(category, ([], []))
+            index = bisect.bisect_right(starts, moment) - 1
+            if index < 0 or (rows[index].end is not None and rows[index].end <= moment):
+                result.append(None)
+            else:
+                result.append(rows[index].price)
+        return result
+
+    def listing(self) -> bytes:
+        """Serialized `GET /prices` response with all prices
+
+        Return: bytes - JSON
+        """
+        return self._load()[2]
+
+    def invalidate(self) -> None:
+        """Drop the index and the listing"""
+        with self._lock:
+            self._generation += 1
+            self._state = None
+
+    def metrics(self) -> dict[str, int]:
+        """Index counters
+
+        Return: dict[str, int]
+        """
+        return {"builds_total": self.builds}
+
+    def _load(self) -> tuple[float, dict[int, _Category], bytes]:
+        state = self._state
+        if state is not None and state[0] > self.clock():
+            return state
+        with self._lock:
+            generation = self._generation
+        # read outside of the request session, it may hold unflushed prices
+        with Session(db.engine) as session:
+            prices = session.scalars(
+                db.select(Price).order_by(Price.type_, Price.start_datetime_utc, Price.id_)
+            ).all()
+            listing = responses.OkPrices(
+                items=[
+                    {
+                        "id": price.id_,
+                        "category": price.type_,
+                        "value": price.value,
+                        "start_datetime_utc": price.start_datetime_utc,
+                        "end_datetime_utc": price.end_datetime_utc,
+                        "notes": price.notes,
+                    }
+                    for price in prices
+                ]
+            ).model_dump_json()
+            segments = _segments(prices)
+        state = (self.clock() + self.ttl, segments, listing.encode())
+        with self._lock:
+            # an invalidation while loading leaves the index unset
+            if generation == self._generation:
+                self._state = state
+            self.builds += 1
+        logger.debug("Price index built with %d prices", len(prices))
+        return state
+
+    def _on_price_flushed(self, _mapper, _connection, target: Price) -> None:
+        self.invalidate()
+        session = Session.object_session(target)
+        if session is not None:
+            session.info["price_index_invalidate"] = True
+
+    def _on_commit(self, session: Session) -> None:
+        if session.info.pop("price_index_invalidate", False):
+            self.invalidate()
+
+    def _on_orm_execute(self, orm_execute_state) -> None:
+        if (
+            orm_execute_state.is_update
+            or orm_execute_state.is_delete
+            or orm_execute_state.is_insert
+        ) and orm_execute_state.bind_mapper is Price.__mapper__:
+            self.invalidate()
+
+    def _on_execute(self, _conn, clauseelement, *_args) -> None:
+        if (
+            isinstance(clauseelement, UpdateBase)
+            and getattr(clauseelement, "table", None) is Price.__table__
+        ):
+            self.invalidate()
+
+
+def _naive_utc(moment: dt.datetime) -> dt.datetime:
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(dt.UTC).replace(tzinfo=None)
+
+
+def _segments(prices: Iterable[Price]) -> dict[int, _Category]:
+    """Disjoint segments per category, a sweep over all range boundaries with
+    a heap of the ranges open at a boundary"""
+    by_category: dict[int, list[Price]] = {}
+    for price in prices:
+        if price.end_datetime_utc is None or price.end_datetime_utc > price.start_datetime_utc:
+            by_category.setdefault(price.type_, []).append(price)
+    segments: dict[int, _Category] = {}
+    for category, rows in by_category.items():
+        rows.sort(key=lambda price: (price.start_datetime_utc, price.id_))
+        boundaries = sorted(
+            {price.start_datetime_utc for price in rows}
+            | {price.end_datetime_utc for price in rows if price.end_datetime_utc}
+        )
+        result: list[_Segment] = []
+        # latest start first, ties by the newest row
+        open_prices: list[tuple[dt.timedelta, int, Price]] = []
+        position = 0
+        for index, boundary in enumerate(boundaries):
+            while position < len(rows) and rows[position].start_datetime_utc <= boundary:
+                price = rows[position]
+                heapq.heappush(
+                    open_prices,
+                    (dt.datetime.min - price.start_datetime_utc, -price.id_, price),
+                )
+                position += 1
+            while open_prices and (
+                open_prices[0][2].end_datetime_utc is not None
+                and open_prices[0][2].end_datetime_utc <= boundary
+            ):
+                heapq.heappop(open_prices)
+            if not open_prices:
+                continue
+            price = open_prices[0][2]
+            end = boundaries[index + 1] if index + 1 < len(boundaries) else None
+            applied = AppliedPrice(price.id_, price.value)
+            if result and result[-1].price == applied and result[-1].end == boundary:
+                result[-1] = result[-1]._replace(end=end)
+            else:
+                result.append(_Segment(boundary, end, applied))
+        segments[category] = ([segment.start for segment in result], result)
+    return segments
@@ -0,0 +1,235 @@
+import logging
+import re
+import traceback
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any
+
+from flask import Flask, Response, current_app, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger(__name__)
+MODES = ("off", "warn", "raise")
+_TOKEN_KEY = "attendance_logger.query_log_token"
+# query logs of the enclosing requests and decorated functions
+_active: ContextVar[tuple["QueryLog", ...]] = ContextVar("query_logs", default=())
+# lists of bound parameters differ only in their length
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)|\((?:\s*%\(\w+\)s\s*,)+\s*%\(\w+\)s\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in "raise" mode if a handler exceeds its budget or repeats a
+    statement shape"""
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement, statements of one loop share the same shape
+
+    Keyword arguments:
+    statement: str - SQL statement with bound parameters
+    Return: str
+    """
+    shape = _IN_LIST.sub("(?)", statement)
+    shape = _NUMBER.sub("N", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class QueryLog:
+    """Statements executed while tracking is active.
+
+    The stack is captured once when the budget is exceeded and once per
+    statement shape when it reaches the repeat threshold, so tracking stays
+    cheap for handlers without problems.
+    """
+
+    def __init__(self, budget: int | None = None, repeat_threshold: int = 5) -> None:
+        self.budget = budget
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.shapes: Counter[str] = Counter()
+        self.stacks: dict[str, str] = {}
+        self.budget_stack: str | None = None
+
+    def record(self, statement: str) -> None:
+        """Count a statement and capture stacks of suspicious ones"""
+        self.count += 1
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if self.shapes[shape] == self.repeat_threshold:
+            self.stacks[shape] = _application_stack()
+        if self.budget is not None and self.count == self.budget + 1:
+            self.budget_stack = _application_stack()
+
+    def repeated(self) -> dict[str, int]:
+        """Statement shapes executed at least `repeat_threshold` times
+
+        Return: dict[str, int] - shape to number of executions
+        """
+        return {
+            shape: count
+            for shape, count in self.shapes.items()
+            if count >= self.repeat_threshold
+        }
+
+    def problems(self, label: str) -> list[str]:
+        """Human readable descriptions of exceeded budget and repeated shapes
+
+        Keyword arguments:
+        label: str - handler name used in the messages
+        Return: list[str] - empty if there is nothing to report
+        """
+        problems = []
+        if self.budget is not None and self.count > self.budget:
+            problems.append(
+                f"{label} executed {self.count} statements, budget is "
+                f"{self.budget}. Statement {self.budget + 1} was executed at:\n"
+                f"{self.budget_stack}"
+            )
+        for shape, count in self.repeated().items():
+            problems.append(
+                f"{label} executed the same statement {count} times, possible "
+                f"N+1 query: {shape[:300]}\nRepeated at:\n{self.stacks[shape]}"
+            )
+        return problems
+
+    def check(self, mode: str, label: str) -> None:
+        """Report problems according to the mode
+
+        Keyword arguments:
+        mode: str - "warn" logs a warning, "raise" raises QueryBudgetExceeded
+        label: str - handler name used in the messages
+        """
+        problems = self.problems(label)
+        if not problems or mode == "off":
+            return
+        if mode == "raise":
+            raise QueryBudgetExceeded("\n".join(problems))
+        for problem in problems:
+            logger.warning(problem)
+
+
+@contextmanager
+def track_queries(
+    budget: int | None = None, repeat_threshold: int = 5
+) -> Iterator[QueryLog]:
+    """Record statements executed by any engine in the current context
+
+    Keyword arguments:
+    budget: int | None - maximum number of statements, unlimited if None
+    repeat_threshold: int - executions of one shape reported as N+1
+    Return: Iterator[QueryLog]
+    """
+    _listen()
+    log = QueryLog(budget=budget, repeat_threshold=repeat_threshold)
+    token = _active.set((*_active.get(), log))
+    try:
+        yield log
+    finally:
+        _active.reset(token)
+
+
+def query_budget(limit: int) -> Callable:
+    """A decorator to declare the maximum number of SQL statements of a handler.
+    The budget is checked only if QUERY_BUDGET_MODE is "warn" or "raise".
+
+    Keyword arguments:
+    limit: int - maximum number of statements
+
+    Return: Callable
+    """
+
+    def decorator(func) -> Callable:
+        @wraps(func)
+        def decorated_function(*args, **kwargs) -> Any:
+            inspector = (
+                current_app.extensions.get("query_inspector") if has_app_context() else None
+            )
+            if inspector is None or inspector.mode == "off":
+                return func(*args, **kwargs)
+            with track_queries(limit, inspector.repeat_threshold) as log:
+                result = func(*args, **kwargs)
+            log.check(inspector.mode, func.__qualname__)
+            return result
+
+        decorated_function.query_budget = limit
+        return decorated_function
+
+    return decorator
+
+
+class QueryInspector:
+    """Development and test mode checking every request for repeated
+    statement shapes and enforcing `@query_budget` declarations.
+
+    Disabled with QUERY_BUDGET_MODE "off", no listener is registered then.
+    """
+
+    def __init__(self, app: Flask | None = None) -> None:
+        self.mode = "off"
+        self.repeat_threshold = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Read the mode and register request hooks
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.mode = app.config.get("QUERY_BUDGET_MODE", "off")
+        if self.mode not in MODES:
+            raise ValueError(f"QUERY_BUDGET_MODE must be one of {MODES}")
+        self.repeat_threshold = app.config.get("QUERY_REPEAT_THRESHOLD", 5)
+        app.extensions["query_inspector"] = self
+        if self.mode == "off":
+            return
+        _listen()
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+
+    def _start_request(self) -> None:
+        log = QueryLog(repeat_threshold=self.repeat_threshold)
+        request.environ[_TOKEN_KEY] = (_active.set((*_active.get(), log)), log)
+
+    def _finish_request(self, response: Response) -> Response:
+        token, log = request.environ.pop(_TOKEN_KEY, (None, None))
+        if token is None:
+            return response
+        _active.reset(token)
+        log.check(self.mode, f"{request.method} {request.path}")
+        return response
+
+    def _teardown_request(self, _error: BaseException | None) -> None:
+        # after_request isn't called if the handler failed
+        token, _log = request.environ.pop(_TOKEN_KEY, (None, None))
+        if token is not None:
+            _active.reset(token)
+
+
+def _listen() -> None:
+    if not event.contains(Engine, "before_cursor_execute", _record):
+        event.listen(Engine, "before_cursor_execute", _record)
+
+
+def _record(_conn, _cursor, statement: str, *_args) -> None:
+    for log in _active.get():
+        log.record(statement)
+
+
+def _application_stack(limit: int = 12) -> str:
+    stack = traceback.extract_stack()
+    # frames of installed packages and of this module only add noise
+    frames = [
+        frame
+        for frame in stack
+        if "site-packages" not in frame.filename and frame.filename != __file__
+    ]
+    return "".join(traceback.format_list((frames or stack)[-limit:]))
@@ -0,0 +1,340 @@
+import datetime as dt
+import logging
+from collections import Counter, defaultdict
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import Connection, Table, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Lesson,
+    LessonRollup,
+    Teacher,
+    TeacherRollup,
+    Visitor,
+    VisitorRollup,
+)
+
+
+logger = logging.getLogger(__name__)
+# name of the counts of a rollup in statistics
+SECTIONS = {LessonRollup: "lessons", VisitorRollup: "visitors", TeacherRollup: "teachers"}
+# INSERT ... ON CONFLICT DO UPDATE of the dialects that support it
+_UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+# group id, location id and start of a lesson
+LessonKey = tuple[int, int, dt.datetime]
+
+
+def week_of(moment: dt.date) -> dt.date:
+    """Monday of the ISO week of a date or datetime
+
+    Keyword arguments:
+    moment: dt.date - date or datetime
+    Return: dt.date
+    """
+    date = moment.date() if isinstance(moment, dt.datetime) else moment
+    return date - dt.timedelta(days=date.weekday())
+
+
+class RollupDeltas:
+    """Changes of rollup counts, written with one statement per rollup table"""
+
+    def __init__(self) -> None:
+        self.counts: dict[type, Counter] = {model: Counter() for model in SECTIONS}
+
+    def add(
+        self,
+        model: type,
+        lesson: LessonKey,
+        state: str,
+        count: int = 1,
+        user_id: int | None = None,
+    ) -> None:
+        """Change the count of a state of a lesson
+
+        Keyword arguments:
+        model: type - LessonRollup, VisitorRollup or TeacherRollup
+        lesson: LessonKey - group id, location id and start of the lesson
+        state: str - state of the lesson, visitor or teacher
+        count: int - change of the count, negative for removed rows
+        user_id: int | None - teacher, TeacherRollup only
+        """
+        group_id, location_id, start = lesson
+        key = (group_id, location_id, week_of(start), state)
+        if model is TeacherRollup:
+            key = (user_id, *key)
+        self.counts[model][key] += count
+
+    def apply(self, connection: Connection | None = None) -> None:
+        """Write the changes in the current transaction and reset them
+
+        Keyword arguments:
+        connection: Connection | None - connection of the flushing session,
+        the connection of db.session if None
+        """
+        connection = connection or db.session.connection()
+        for model, counts in self.counts.items():
+            columns = [column.name for column in model.__table__.primary_key]
+            rows = [
+                {**dict(zip(columns, key)), "count": count}
+                for key, count in counts.items()
+                if count
+            ]
+            if rows:
+                _upsert(connection, model.__table__, rows)
+            counts.clear()
+
+
+def _upsert(connection: Connection, table: Table, rows: list[dict]) -> None:
+    keys = [column.name for column in table.primary_key]
+    if connection.dialect.name in _UPSERTS:
+        insert = _UPSERTS[connection.dialect.name](table)
+        connection.execute(
+            insert.on_conflict_do_update(
+                index_elements=keys, set_={"count": table.c.count + insert.excluded.count}
+            ),
+            rows,
+        )
+        return
+    for row in rows:
+        result = connection.execute(
+            table.update()
+            .where(*(table.c[key] == row[key] for key in keys))
+            .values(count=table.c.count + row["count"])
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert(), row)
+
+
+def listen() -> None:
+    """Update rollups whenever the session flushes lessons, visitors or teachers.
+    Bulk statements bypass the flush, their callers use RollupDeltas directly."""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+
+
+def _committed(obj: object, attribute: str) -> object:
+    history = inspect(obj).attrs[attribute].history
+    return history.deleted[0] if history.deleted else getattr(obj, attribute)
+
+
+def _lesson_key(lesson: Lesson, committed: bool) -> LessonKey:
+    value = _committed if committed else getattr
+    return (
+        value(lesson, "group_id"),
+        value(lesson, "location_id"),
+        value(lesson, "start_datetime_utc"),
+    )
+
+
+def _after_flush(session: Session, _context) -> None:
+    # new, dirty and deleted still describe the flushed changes here
+    touched = [
+        (obj, status)
+        for status, objects in (
+            ("new", session.new),
+            ("dirty", session.dirty),
+            ("deleted", session.deleted),
+        )
+        for obj in objects
+        if isinstance(obj, (Lesson, Visitor, Teacher))
+        and (status != "dirty" or session.is_modified(obj))
+    ]
+    if not touched:
+        return
+    deltas = RollupDeltas()
+    before: dict[int, LessonKey] = {}
+    after: dict[int, LessonKey] = {}
+    moved: list[int] = []
+    for obj, status in touched:
+        if not isinstance(obj, Lesson):
+            continue
+        if status != "new":
+            before[obj.id_] = _lesson_key(obj, committed=True)
+            deltas.add(LessonRollup, before[obj.id_], _committed(obj, "state"), -1)
+        if status != "deleted":
+            after[obj.id_] = _lesson_key(obj, committed=False)
+            deltas.add(LessonRollup, after[obj.id_], obj.state)
+        if status == "dirty" and (
+            before[obj.id_][:2] != after[obj.id_][:2]
+            or week_of(before[obj.id_][2]) != week_of(after[obj.id_][2])
+        ):
+            moved.append(obj.id_)
+
+    attendance = [(obj, status) for obj, status in touched if not isinstance(obj, Lesson)]
+    connection = session.connection()
+    unknown = {
+        lesson_id
+        for obj, status in attendance
+        for lesson_id in (
+            None if status == "new" else _committed(obj, "lesson_id"),
+            None if status == "deleted" else obj.lesson_id,
+        )
+        if lesson_id is not None
+    } - before.keys() - after.keys()
+    if unknown:
+        for lesson_id, *key in connection.execute(
+            db.select(
+                Lesson.id_, Lesson.group_id, Lesson.location_id, Lesson.start_datetime_utc
+            ).where(Lesson.id_.in_(unknown))
+        ):
+            before[lesson_id] = after[lesson_id] = tuple(key)
+
+    for obj, status in attendance:
+        teacher = isinstance(obj, Teacher)
+        model = TeacherRollup if teacher else VisitorRollup
+        if status != "new":
+            deltas.add(
+                model,
+                before[_committed(obj, "lesson_id")],
+                _committed(obj, "state"),
+                -1,
+                _committed(obj, "user_id") if teacher else None,
+            )
+        if status != "deleted":
+            deltas.add(
+                model, after[obj.lesson_id], obj.state, 1, obj.user_id if teacher else None
+            )
+
+    if moved:
+        # rows of moved lessons that weren't flushed themselves follow the lesson
+        flushed = {(type(obj), obj.id_) for obj, _status in attendance}
+        for lesson_id, state, count in connection.execute(
+            db.select(Visitor.lesson_id, Visitor.state, db.func.count(Visitor.id_))
+            .where(
+                Visitor.lesson_id.in_(moved),
+                Visitor.id_.not_in([id_ for model, id_ in flushed if model is Visitor]),
+            )
+            .group_by(Visitor.lesson_id, Visitor.state)
+        ):
+            deltas.add(VisitorRollup, before[lesson_id], state, -count)
+            deltas.add(VisitorRollup, after[lesson_id], state, count)
+        for lesson_id, user_id, state in connection.execute(
+            db.select(Teacher.lesson_id, Teacher.user_id, Teacher.state).where(
+                Teacher.lesson_id.in_(moved),
+                Teacher.id_.not_in([id_ for model, id_ in flushed if model is Teacher]),
+            )
+        ):
+            deltas.add(TeacherRollup, before[lesson_id], state, -1, user_id)
+            deltas.add(TeacherRollup, after[lesson_id], state, 1, user_id)
+    deltas.apply(connection)
+
+
+def rebuild_rollups() -> dict[str, int]:
+    """Recompute all rollups from lessons, visitors and teachers
+
+    Return: dict[str, int] - number of rows per rollup table
+    """
+    deltas = RollupDeltas()
+    lesson_columns = (Lesson.group_id, Lesson.location_id, Lesson.start_datetime_utc)
+    for *lesson, state, count in db.session.execute(
+        db.select(*lesson_columns, Lesson.state, db.func.count(Lesson.id_)).group_by(
+            *lesson_columns, Lesson.state
+        )
+    ):
+        deltas.add(LessonRollup, tuple(lesson), state, count)
+    for *lesson, state, count in db.session.execute(
+        db.select(*lesson_columns, Visitor.state, db.func.count(Visitor.id_))
+        .join(Visitor.lesson)
+        .group_by(*lesson_columns, Visitor.state)
+    ):
+        deltas.add(VisitorRollup, tuple(lesson), state, count)
+    for *lesson, user_id, state, count in db.session.execute(
+        db.select(*lesson_columns, Teacher.user_id, Teacher.state, db.func.count(Teacher.id_))
+        .join(Teacher.lesson)
+        .group_by(*lesson_columns, Teacher.user_id, Teacher.state)
+    ):
+        deltas.add(TeacherRollup, tuple(lesson), state, count, user_id)
+    result = {
+        model.__tablename__: sum(1 for count in counts.values() if count)
+        for model, counts in deltas.counts.items()
+    }
+    for model in SECTIONS:
+        db.session.execute(db.delete(model))
+    deltas.apply()
+    db.session.commit()
+    logger.info("Rebuilt rollups: %s", result)
+    return result
+
+
+def weekly(
+    first: dt.date,
+    last: dt.date,
+    group_id: int | None = None,
+    location_id: int | None = None,
+    user_id: int | None = None,
+) -> list[dict]:
+    """Counts per ISO week and state read from the rollups. Lessons and
+    visitors aren't kept per teacher, a user filter returns teachers only.
+
+    Keyword arguments:
+    first: dt.date - first day, the whole week is counted
+    last: dt.date - last day, the whole week is counted
+    group_id: int | None - only lessons of a group
+    location_id: int | None - only lessons at a location
+    user_id: int | None - only a teacher
+    Return: list[dict] - weeks in ascending order with counts per section
+    """
+    weeks: defaultdict[dt.date, dict] = defaultdict(
+        lambda: {section: {} for section in SECTIONS.values()}
+    )
+    filters = {"group_id": group_id, "location_id": location_id, "user_id": user_id}
+    for model, section in SECTIONS.items():
+        if user_id is not None and model is not TeacherRollup:
+            continue
+        rows = db.session.execute(
+            db.select(model.week, model.state, db.func.sum(model.count))
+            .where(
+                model.week.between(week_of(first), week_of(last)),
+                *(
+                    getattr(model, name) == value
+                    for name, value in filters.items()
+                    if value is not None
+                ),
+            )
+            .group_by(model.week, model.state)
+        )
+        for week, state, count in rows:
+            if count:
+                weeks[week][section][state] = count
+    return [{"week": week, **weeks[week]} for week in sorted(weeks)]
+
+
+def totals(by: str, first: dt.date, last: dt.date) -> list[dict]:
+    """Counts per state summed over weeks for every group, location or teacher
+
+    Keyword arguments:
+    by: str - "group_id", "location_id" or "user_id"
+    first: dt.date - first day, the whole week is counted
+    last: dt.date - last day, the whole week is counted
+    Return: list[dict] - entries with the id and counts per section
+    """
+    if by not in ("group_id", "location_id", "user_id"):
+        raise ValueError(f"Unknown statistics key {by!r}")
+    items: defaultdict[int, dict] = defaultdict(
+        lambda: {section: {} for section in SECTIONS.values()}
+    )
+    for model, section in SECTIONS.items():
+        if not hasattr(model, by):
+            continue
+        column = getattr(model, by)
+        rows = db.session.execute(
+            db.select(column, model.state, db.func.sum(model.count))
+            .where(model.week.between(week_of(first), week_of(last)))
+            .group_by(column, model.state)
+        )
+        for id_, state, count in rows:
+            if count:
+                items[id_][section][state] = count
+    return [{"id": id_, **items[id_]} for id_ in sorted(items)]
+
+
+@click.command("rebuild-rollups")
+@with_appcontext
+def rebuild_rollups_command() -> None:
+    """Recompute the statistics rollups from attendance."""
+    result = rebuild_rollups()
+    click.echo(", ".join(f"{count} {table}" for table, count in result.items()))
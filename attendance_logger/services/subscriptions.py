@@ -0,0 +1,82 @@
+import datetime as dt
+from collections.abc import Iterable
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Subscription, Visitor
+from attendance_logger.models.models import COUNTED_VISIT_STATES
+
+
+def remaining_visits(subscription_ids: Iterable[int]) -> dict[int, int]:
+    """Open visits of many subscriptions with one grouped query
+
+    Keyword arguments:
+    subscription_ids: Iterable[int] - primary keys of subscriptions
+    Return: dict[int, int] - subscription id to open visits, unknown ids are missing
+    """
+    ids = set(subscription_ids)
+    if not ids:
+        return {}
+    rows = db.session.execute(
+        db.select(
+            Subscription.id_,
+            Subscription.total_visits - db.func.count(Visitor.id_),
+        )
+        .outerjoin(
+            Visitor,
+            db.and_(
+                Visitor.subscription_id == Subscription.id_,
+                Visitor.state.in_(COUNTED_VISIT_STATES),
+            ),
+        )
+        .where(Subscription.id_.in_(ids))
+        .group_by(Subscription.id_, Subscription.total_visits)
+    )
+    return {subscription_id: remaining for subscription_id, remaining in rows}
+
+
+def valid_subscriptions(
+    client_ids: Iterable[int],
+    date: dt.date | None = None,
+    with_open_visits: bool = True,
+) -> dict[int, Subscription]:
+    """Subscription to deduct a visit from for many clients with one query.
+    If a client has several valid subscriptions, the one ending first is used.
+
+    Keyword arguments:
+    client_ids: Iterable[int] - primary keys of clients
+    date: dt.date | None - date of the visit, today if None
+    with_open_visits: bool - skip subscriptions without open visits
+    Return: dict[int, Subscription] - client id to subscription, clients
+    without a valid subscription are missing
+    """
+    ids = set(client_ids)
+    if not ids:
+        return {}
+    date = date or dt.date.today()
+    conditions = [Subscription.client_id.in_(ids), Subscription.active_on(date)]
+    if with_open_visits:
+        conditions.append(Subscription.open_visits > 0)
+    ranked = (
+        db.select(
+            Subscription.id_,
+            db.func.row_number()
+            .over(
+                partition_by=Subscription.client_id,
+                order_by=(
+                    Subscription.end_date.is_(None),
+                    Subscription.end_date,
+                    Subscription.start_date,
+                    Subscription.id_,
+                ),
+            )
+            .label("rank"),
+        )
+        .where(*conditions)
+        .subquery()
+    )
+    subscriptions = db.session.scalars(
+        db.select(Subscription)
+        .join(ranked, Subscription.id_ == ranked.c.id_)
+        .where(ranked.c.rank == 1)
+    )
+    return {subscription.client_id: subscription for subscription in subscriptions}
@@ -0,0 +1,230 @@
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+
+from flask import Flask
+
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Per-process storage for window counters."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._lock = threading.Lock()
+        self._windows: dict[str, tuple[int, int, int]] = {}
+        self.max_keys = max_keys
+
+    def increment(self, key: str, window: int) -> tuple[int, int]:
+        """Count a hit for the key in the current window
+
+        Return: tuple[int, int] - hits of the previous and the current window
+        including this one
+        """
+        with self._lock:
+            previous, current = self._counts(key, window)
+            if key not in self._windows and len(self._windows) >= self.max_keys:
+                self._prune(window)
+            self._windows[key] = (window, previous, current + 1)
+            return previous, current + 1
+
+    def decrement(self, key: str, window: int) -> None:
+        """Take back a hit counted in the current window"""
+        with self._lock:
+            previous, current = self._counts(key, window)
+            if current > 0:
+                self._windows[key] = (window, previous, current - 1)
+
+    def _counts(self, key: str, window: int) -> tuple[int, int]:
+        stored_window, previous, current = self._windows.get(key, (window, 0, 0))
+        if stored_window == window:
+            return previous, current
+        if stored_window == window - 1:
+            return current, 0
+        return 0, 0
+
+    def _prune(self, window: int) -> None:
+        stale = [
+            key
+            for key, (stored_window, _, _) in self._windows.items()
+            if stored_window < window - 1
+        ]
+        for key in stale:
+            del self._windows[key]
+        if len(self._windows) >= self.max_keys:
+            # every key is fresh, forget the oldest inserted one
+            del self._windows[next(iter(self._windows))]
+
+
+class SQLiteBackend:
+    """Window counters in a SQLite file shared by all worker processes of a host."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_windows ("
+                "key TEXT NOT NULL, window INTEGER NOT NULL, hits INTEGER NOT NULL, "
+                "PRIMARY KEY (key, window))"
+            )
+
+    def increment(self, key: str, window: int) -> tuple[int, int]:
+        """Count a hit for the key in the current window
+
+        Return: tuple[int, int] - hits of the previous and the current window
+        including this one
+        """
+        with self._connection() as connection:
+            # the upsert counts and reads in one statement, concurrent hits
+            # of other processes see distinct counts
+            (current,) = connection.execute(
+                "INSERT INTO rate_limit_windows (key, window, hits) VALUES (?, ?, 1) "
+                "ON CONFLICT (key, window) DO UPDATE SET hits = hits + 1 RETURNING hits",
+                (key, window),
+            ).fetchone()
+            previous = connection.execute(
+                "SELECT hits FROM rate_limit_windows WHERE key = ? AND window = ?",
+                (key, window - 1),
+            ).fetchone()
+            connection.execute(
+                "DELETE FROM rate_limit_windows WHERE key = ? AND window < ?",
+                (key, window - 1),
+            )
+        return (previous[0] if previous else 0), current
+
+    def decrement(self, key: str, window: int) -> None:
+        """Take back a hit counted in the current window"""
+        with self._connection() as connection:
+            connection.execute(
+                "UPDATE rate_limit_windows SET hits = hits - 1 "
+                "WHERE key = ? AND window = ? AND hits > 0",
+                (key, window),
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+
+class LoginLimiter:
+    """Sliding window limiter for login attempts keyed by client IP and email.
+
+    The limiter approximates a sliding window with two fixed windows: hits of
+    the previous window are weighted by the part of it that still overlaps the
+    sliding window. Checks are done before any database or Argon2 work.
+    """
+
+    def __init__(self, app: Flask | None = None, clock: Callable = time.time) -> None:
+        self.clock = clock
+        self.backend: MemoryBackend | SQLiteBackend = MemoryBackend()
+        self.limits: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._rejected: Counter[str] = Counter()
+        self._allowed = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Read limits and the storage backend from the app configuration
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.limits = {
+            "ip": (
+                app.config.get("LOGIN_LIMIT_PER_IP", 100),
+                app.config.get("LOGIN_LIMIT_IP_WINDOW", 60),
+            ),
+            "email": (
+                app.config.get("LOGIN_LIMIT_PER_EMAIL", 10),
+                app.config.get("LOGIN_LIMIT_EMAIL_WINDOW", 300),
+            ),
+        }
+        path = app.config.get("LOGIN_LIMIT_SQLITE_PATH", "")
+        self.backend = SQLiteBackend(path) if path else MemoryBackend()
+        app.extensions["login_limiter"] = self
+
+    def hit(self, ip: str | None, email: str) -> int:
+        """Register a login attempt unless one of its keys is over the limit
+
+        Keyword arguments:
+        ip: str | None - client IP address
+        email: str - email from the login form
+        Return: int - 0 if the attempt is allowed, otherwise seconds until retry
+        """
+        now = self.clock()
+        keys = {"ip": f"ip:{ip}", "email": f"email:{normalize_email(email)}"}
+        counted: list[tuple[str, int]] = []
+        for scope, key in keys.items():
+            # count first and check the returned counts, a check before
+            # counting would let concurrent attempts pass the limit together
+            window = int(now // self.limits[scope][1])
+            previous, current = self.backend.increment(key, window)
+            counted.append((key, window))
+            retry_after = self._retry_after(scope, now, previous, current - 1)
+            if retry_after > 0:
+                # rejected attempts don't count
+                for counted_key, counted_window in counted:
+                    self.backend.decrement(counted_key, counted_window)
+                with self._lock:
+                    self._rejected[scope] += 1
+                logger.warning("Login attempt rejected by %s limit: %s", scope, key)
+                return retry_after
+        with self._lock:
+            self._allowed += 1
+        return 0
+
+    def metrics(self) -> dict[str, int]:
+        """Snapshot of limiter counters
+
+        Return: dict[str, int] - allowed attempts and rejections per key scope
+        """
+        with self._lock:
+            return {
+                "allowed_total": self._allowed,
+                "rejected_ip_total": self._rejected["ip"],
+                "rejected_email_total": self._rejected["email"],
+            }
+
+    def _retry_after(self, scope: str, now: float, previous: int, current: int) -> int:
+        """Seconds until an attempt is allowed, 0 if it is allowed now
+
+        Keyword arguments:
+        scope: str - "ip" or "email"
+        now: float - time of the attempt
+        previous: int - hits of the previous window
+        current: int - hits of the current window before this attempt
+        Return: int
+        """
+        limit, length = self.limits[scope]
+        window = int(now // length)
+        elapsed = (now - window * length) / length
+        if previous * (1 - elapsed) + current < limit:
+            return 0
+        if current >= limit:
+            # wait for the next window until weighted current hits drop below limit
+            allowed_at = (window + 1 + max(0.0, 1 - limit / current)) * length
+        else:
+            allowed_at = (window + max(0.0, 1 - (limit - current) / previous)) * length
+        # the weighted hits must drop strictly below the limit
+        return math.floor(allowed_at - now) + 1
+
+
+def normalize_email(email: str) -> str:
+    """Normalize email for use as a limiter key
+
+    Keyword arguments:
+    email: str - raw email
+    Return: str - stripped lower case email
+    """
+    return email.strip().lower()
@@ -0,0 +1,120 @@
+import logging
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql.dml import UpdateBase
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import User, UserRole, _UserRole_User
+from attendance_logger.utils.cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """Per-process cache of users with their roles for the JWT user lookup.
+
+    Cached users are detached, fully loaded objects. On a hit they are merged
+    into the request session without emitting SQL. Any flush touching a user or
+    its roles drops the entry immediately and once more after commit, the TTL
+    bounds staleness for changes made by other processes.
+    """
+
+    def __init__(self, app: Flask | None = None) -> None:
+        self.cache = TTLCache(maxsize=1024, ttl=30)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure cache size and TTL and hook invalidation events
+
+        Keyword arguments:
+        app: Flask - application instance
+        """
+        self.cache = TTLCache(
+            maxsize=app.config.get("USER_CACHE_SIZE", 1024),
+            ttl=app.config.get("USER_CACHE_TTL", 30),
+        )
+        listeners = (
+            (User, "after_update", self._on_user_flushed),
+            (User, "after_delete", self._on_user_flushed),
+            (User.roles, "append", self._on_roles_changed),
+            (User.roles, "remove", self._on_roles_changed),
+            (UserRole.users, "append", self._on_role_users_changed),
+            (UserRole.users, "remove", self._on_role_users_changed),
+            (Session, "after_commit", self._on_commit),
+            (Session, "do_orm_execute", self._on_orm_execute),
+            (Engine, "after_execute", self._on_execute),
+        )
+        for target, identifier, listener in listeners:
+            if not event.contains(target, identifier, listener):
+                event.listen(target, identifier, listener)
+        app.extensions["user_cache"] = self
+
+    def load(self, user_id: int | str) -> User | None:
+        """Return the user attached to the current session
+
+        Keyword arguments:
+        user_id: int | str - primary key of the user
+        Return: User | None - None if the user doesn't exist
+        """
+        user_id = int(user_id)
+        cached = self.cache.get(user_id)
+        if cached is None:
+            # load outside of the request session to keep a clean detached copy
+            with Session(db.engine, expire_on_commit=False) as session:
+                cached = session.scalar(
+                    db.select(User)
+                    .options(selectinload(User.roles))
+                    .where(User.id_ == user_id)
+                )
+            if cached is None:
+                return None
+            self.cache.set(user_id, cached)
+        return db.session.merge(cached, load=False)
+
+    def invalidate(self, user_id: int | None = None) -> None:
+        """Drop one user or the whole cache
+
+        Keyword arguments:
+        user_id: int | None - primary key, all users if None
+        """
+        if user_id is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(user_id)
+
+    def _remember(self, session: Session | None, user_id: int) -> None:
+        self.invalidate(user_id)
+        if session is not None:
+            session.info.setdefault("user_cache_invalidate", set()).add(user_id)
+
+    def _on_user_flushed(self, _mapper, _connection, target: User) -> None:
+        self._remember(Session.object_session(target), target.id_)
+
+    def _on_roles_changed(self, target: User, value, _initiator) -> None:
+        self._remember(Session.object_session(target), target.id_)
+
+    def _on_role_users_changed(self, target: UserRole, value: User, _initiator):
+        self._remember(Session.object_session(target), value.id_)
+
+    def _on_commit(self, session: Session) -> None:
+        for user_id in session.info.pop("user_cache_invalidate", ()):
+            self.invalidate(user_id)
+
+    def _on_orm_execute(self, orm_execute_state) -> None:
+        if (
+            orm_execute_state.is_update or orm_execute_state.is_delete
+        ) and orm_execute_state.bind_mapper is User.__mapper__:
+            self.invalidate()
+
+    def _on_execute(self, _conn, clauseelement, *_args) -> None:
+        # role assignments written with Core bypass the ORM events above
+        if (
+            isinstance(clauseelement, UpdateBase)
+            and getattr(clauseelement, "table", None) is _UserRole_User
+        ):
+            self.invalidate()
@@ -6,6 +6,45 @@ import email_validator
 logger = logging.getLogger(__name__)
 
 
+def build_password_hasher(
+    memory_cost: int = 65536, time_cost: int = 3, parallelism: int = 4
+) -> argon2.PasswordHasher:
+    """Build Argon2id password hasher
+
+    Keyword arguments:
+    memory_cost: int - memory usage in KiB
+    time_cost: int - number of iterations
+    parallelism: int - number of parallel threads
+    Return: argon2.PasswordHasher
+    """
+    return argon2.PasswordHasher(
+        memory_cost=memory_cost,
+        time_cost=time_cost,
+        parallelism=parallelism,
+        hash_len=32,
+        salt_len=16,
+        type=argon2.Type.ID,
+    )
+
+
+# one hasher per process, PasswordHasher is stateless and thread safe
+_password_hasher = build_password_hasher()
+
+
+def configure_password_hasher(
+    memory_cost: int, time_cost: int, parallelism: int
+) -> None:
+    """Replace Argon2 parameters used by hash_password for the current process
+
+    Keyword arguments:
+    memory_cost: int - memory usage in KiB
+    time_cost: int - number of iterations
+    parallelism: int - number of parallel threads
+    """
+    global _password_hasher
+    _password_hasher = build_password_hasher(memory_cost, time_cost, parallelism)
+
+
 def check_password_hash(password: str, hashed: str) -> bool:
     """Check password against its hash
 
@@ -20,9 +59,8 @@ def check_password_hash(password: str, hashed: str) -> bool:
         VerificationError,
     )
 
-    ph = argon2.PasswordHasher()
     try:
-        ph.verify(hashed, password)
+        _password_hasher.verify(hashed, password)
         return True
     except (VerifyMismatchError, InvalidHashError):
         return False
@@ -38,15 +76,20 @@ def hash_password(password: str) -> str:
     password: str - plain text password
     Return: str - hashed password
     """
-    ph = argon2.PasswordHasher(
-        memory_cost=65536,
-        time_cost=3,
-        parallelism=4,
-        hash_len=32,
-        salt_len=16,
-        type=argon2.Type.ID,
-    )
-    return ph.hash(password)
+    return _password_hasher.hash(password)
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    """Check whether a hash was created with other parameters than the current ones
+
+    Keyword arguments:
+    hashed: str - hashed password
+    Return: bool - True if password should be hashed again
+    """
+    try:
+        return _password_hasher.check_needs_rehash(hashed)
+    except argon2.exceptions.InvalidHashError:
+        return True
 
 
 def validate_email(email: str, check_deliverability: bool = False) -> bool:
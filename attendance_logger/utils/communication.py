@@ -9,24 +9,59 @@ logger = logging.getLogger(__name__)
 
 
 def send_email(email_to: str, subject: str, body: str) -> None:
-    """Send email (stub function)
+    """Queue email in the outbox. The message is stored with the caller's next
+    commit and delivered by the outbox sender, so the request doesn't wait for
+    the mail server.
 
     Keyword arguments:
     email_to: str - recipient email address
     subject: str - email subject
     body: str - email body
     """
-    logger.info("Sending email to %s with subject '%s'", email_to, subject)
+    from attendance_logger.models.database import db
+    from attendance_logger.models.db_models import EmailOutbox
+    from attendance_logger.utils import utils
+
+    db.session.add(
+        EmailOutbox(
+            email_to=email_to,
+            subject=subject,
+            body=body,
+            created_datetime=utils.get_current_utc_datetime(),
+            created_timezone=0,
+        )
+    )
+    logger.info("Queued email to %s with subject '%s'", email_to, subject)
+
+
+def build_message(email_to: str, subject: str, body: str) -> EmailMessage:
+    """Build email message from the configured sender
+
+    Keyword arguments:
+    email_to: str - recipient email address
+    subject: str - email subject
+    body: str - email body
+    Return: EmailMessage
+    """
     msg = EmailMessage(policy=default_policy)
     msg["Subject"] = subject
     msg["From"] = app.config.get("EMAIL_SENDER")
     msg["To"] = email_to
     msg.set_content(body)
+    return msg
 
-    with smtplib.SMTP_SSL(
-        app.config.get("EMAIL_SMTP_SERVER", app.config.get("EMAIL_SMTP_PORT"))
-    ) as smtp:
-        smtp.login(app.config.get("EMAIL_SENDER"), app.config.get("EMAIL_PASSWORD"))
-        smtp.send_message(msg)
 
-    logger.info("Email sent to %s with subject %s", email_to, subject)
+def connect_smtp() -> smtplib.SMTP:
+    """Open an authenticated connection to the configured SMTP server
+
+    Return: smtplib.SMTP - SMTP_SSL unless EMAIL_SMTP_SSL is disabled
+    """
+    smtp_class = smtplib.SMTP_SSL if app.config.get("EMAIL_SMTP_SSL", True) else smtplib.SMTP
+    smtp = smtp_class(
+        app.config.get("EMAIL_SMTP_SERVER"),
+        app.config.get("EMAIL_SMTP_PORT"),
+        timeout=app.config.get("EMAIL_SMTP_TIMEOUT", 10),
+    )
+    if app.config.get("EMAIL_PASSWORD"):
+        smtp.login(app.config.get("EMAIL_SENDER"), app.config.get("EMAIL_PASSWORD"))
+    return smtp
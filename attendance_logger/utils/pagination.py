@@ -0,0 +1,165 @@
+import datetime as dt
+from collections.abc import Mapping
+from typing import Any
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute
+from werkzeug.datastructures import MultiDict
+
+from attendance_logger.models.database import db
+from attendance_logger.utils.utils import extract_offset_limit
+
+
+MAX_LIMIT = 100
+_SALT = "attendance_logger.pagination"
+
+
+class PaginationError(ValueError):
+    """Invalid sort, limit or cursor parameter"""
+
+
+class Page:
+    """Items of one page and the cursor of the next one"""
+
+    def __init__(self, items: list, next_cursor: str | None, page: int | None = None) -> None:
+        self.items = items
+        self.next_cursor = next_cursor
+        # page number in the compatibility mode
+        self.page = page
+
+
+class Paginator:
+    """Keyset pagination over a whitelist of sortable columns.
+
+    The cursor is a signed token with the sort and the key of the last item,
+    the next page starts right after that key. Ties are broken by the primary
+    key, every sort is expected to be backed by an index on (column, id_).
+    Sortable columns must not be nullable.
+
+    `page` switches to OFFSET paging for old clients.
+    """
+
+    def __init__(
+        self,
+        sortable: Mapping[str, InstrumentedAttribute],
+        tie_breaker: InstrumentedAttribute,
+        default: str = "+id",
+    ) -> None:
+        self.sortable = dict(sortable)
+        self.tie_breaker = tie_breaker
+        self.default = self.parse_sort(default)
+
+    def parse_sort(self, value: str | None) -> tuple[tuple[str, bool], ...]:
+        """Parse "+name,-id" like sort parameters
+
+        Keyword arguments:
+        value: str | None - names with leading "+" (ascending, default) or "-"
+        Return: tuple[tuple[str, bool], ...] - names with a descending flag
+        """
+        if not value:
+            return self.default
+        sort = []
+        for part in value.split(","):
+            # "+" arrives as a space if the client doesn't encode it
+            part = part.strip()
+            descending = part.startswith("-")
+            name = part.lstrip("+-")
+            if name not in self.sortable:
+                raise PaginationError(
+                    f"Unknown sort {name!r}, known are {', '.join(self.sortable)}."
+                )
+            sort.append((name, descending))
+        return tuple(sort)
+
+    def paginate(self, query: Select, args: MultiDict) -> Page:
+        """Execute a query of one entity for the page described by request args
+
+        Keyword arguments:
+        query: Select - select of the entity with filters, without ORDER BY
+        args: MultiDict - `sort`, `limit`, `cursor` or `page`
+        Return: Page
+        """
+        offset, limit = extract_offset_limit(args)
+        if not 1 <= limit <= MAX_LIMIT:
+            raise PaginationError(f"limit must be between 1 and {MAX_LIMIT}.")
+        cursor = args.get("cursor")
+        if cursor:
+            sort, last = self._decode(cursor)
+        else:
+            sort, last = self.parse_sort(args.get("sort")), None
+        columns = self._columns(sort)
+        query = query.order_by(
+            *(column.desc() if descending else column.asc() for column, descending in columns)
+        )
+        if offset >= 0:
+            items = db.session.scalars(query.offset(offset).limit(limit)).all()
+            return Page(items, None, page=offset // limit + 1)
+        if last is not None:
+            query = query.where(_after(columns, last))
+        items = db.session.scalars(query.limit(limit + 1)).all()
+        if len(items) <= limit:
+            return Page(items, None)
+        items = items[:limit]
+        key = [getattr(items[-1], column.key) for column, _descending in columns]
+        return Page(items, self._encode(sort, key))
+
+    def _columns(
+        self, sort: tuple[tuple[str, bool], ...]
+    ) -> list[tuple[InstrumentedAttribute, bool]]:
+        columns = [(self.sortable[name], descending) for name, descending in sort]
+        # the tie breaker follows the direction of the last sort column
+        if not any(column is self.tie_breaker for column, _descending in columns):
+            columns.append((self.tie_breaker, columns[-1][1]))
+        return columns
+
+    def _serializer(self) -> URLSafeSerializer:
+        return URLSafeSerializer(current_app.config["SECRET_KEY"], salt=_SALT)
+
+    def _encode(self, sort: tuple[tuple[str, bool], ...], key: list) -> str:
+        values = [value.isoformat() if isinstance(value, dt.date) else value for value in key]
+        return self._serializer().dumps(
+            {"s": [[name, descending] for name, descending in sort], "k": values}
+        )
+
+    def _decode(self, cursor: str) -> tuple[tuple[tuple[str, bool], ...], list]:
+        try:
+            data = self._serializer().loads(cursor)
+            sort = tuple((name, bool(descending)) for name, descending in data["s"])
+            values = list(data["k"])
+        except (BadSignature, KeyError, TypeError, ValueError):
+            raise PaginationError("Invalid cursor.") from None
+        if not sort or any(name not in self.sortable for name, _descending in sort):
+            raise PaginationError("Invalid cursor.")
+        columns = self._columns(sort)
+        if len(values) != len(columns):
+            raise PaginationError("Invalid cursor.")
+        try:
+            key = [
+                _python_value(column, value)
+                for (column, _descending), value in zip(columns, values)
+            ]
+        except (TypeError, ValueError):
+            raise PaginationError("Invalid cursor.") from None
+        return sort, key
+
+
+def _python_value(column: InstrumentedAttribute, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is dt.datetime:
+        return dt.datetime.fromisoformat(value)
+    if python_type is dt.date:
+        return dt.date.fromisoformat(value)
+    return value
+
+
+def _after(columns: list[tuple[InstrumentedAttribute, bool]], key: list):
+    """Rows after the key in the sort order:
+    (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ..."""
+    clauses = []
+    for index, (column, descending) in enumerate(columns):
+        equal = [columns[before][0] == key[before] for before in range(index)]
+        beyond = column < key[index] if descending else column > key[index]
+        clauses.append(db.and_(*equal, beyond))
+    return db.or_(*clauses)
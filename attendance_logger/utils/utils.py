@@ -46,8 +46,9 @@ def extract_offset_limit(request_args: MultiDict) -> tuple[int, int]:
     if offset=-1 paging is not set
     """
 
-    page = request_args.get("page", -1)
-    items_per_page = request_args.get("limit", 20)
-    offset_items = (page - 1) * items_per_page
-    limit_items = offset_items = items_per_page
-    return (offset_items, limit_items)
+    # values that aren't integers fall back to the defaults
+    page = request_args.get("page", -1, type=int)
+    items_per_page = request_args.get("limit", 20, type=int)
+    if page < 1:
+        return (-1, items_per_page)
+    return ((page - 1) * items_per_page, items_per_page)
@@ -0,0 +1,210 @@
+"""Attendance analytics on a synthetic dataset.
+
+    python benchmarks/analytics_benchmark.py --visits 5000000 --load 200000
+
+Arrays are generated in memory for the computation. `--load` rows are
+additionally written to a temporary SQLite database to time the single
+query of load_visits.
+"""
+
+import argparse
+import datetime as dt
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from flask import Flask
+
+from attendance_logger.models.database import db
+from attendance_logger.services.analytics import (
+    ABSENT,
+    ATTENDED,
+    EXCUSED,
+    AttendanceAnalytics,
+    VisitArrays,
+    load_visits,
+)
+
+FIRST_DAY = np.datetime64("2020-01-06")
+
+
+@contextmanager
+def timed(label: str):
+    start = time.perf_counter()
+    yield
+    print(f"{label:<32} {time.perf_counter() - start:8.3f} s")
+
+
+def synthetic(visits: int, children: int, groups: int, seed: int = 1) -> VisitArrays:
+    """Weekly lessons of children in one group each, every child with its own
+    attendance probability"""
+    rng = np.random.default_rng(seed)
+    client = rng.integers(0, children, visits)
+    group = client % groups
+    # consecutive lessons of a child are one week apart
+    order = np.argsort(client, kind="stable")
+    week = np.empty(visits, dtype=np.int64)
+    week[order] = np.arange(visits) - np.searchsorted(client[order], client[order])
+    day = FIRST_DAY + week * np.timedelta64(7, "D")
+    attend = rng.beta(6, 2, children)[client]
+    draw = rng.random(visits)
+    outcome = np.where(
+        draw < attend, ATTENDED, np.where(draw < attend + 0.05, EXCUSED, ABSENT)
+    )
+    return VisitArrays(client, group, day, outcome)
+
+
+def load(rows: int, children: int, groups: int) -> None:
+    from attendance_logger.models.db_models import (
+        Client,
+        ClientParticipant,
+        Group,
+        Lesson,
+        Location,
+        Price,
+        Subscription,
+        Visitor,
+    )
+
+    path = Path(tempfile.mkdtemp()) / "benchmark.db"
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    db.init_app(app)
+    created = {"created_datetime": dt.datetime(2020, 1, 1), "created_timezone": 0}
+    weeks = max(rows // children, 1)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Location), [{"id_": 1, "address": "Main street 1"}])
+        db.session.execute(
+            db.insert(Price),
+            [
+                {
+                    "id_": 1,
+                    "type_": 1,
+                    "value": 100.0,
+                    "start_datetime_utc": dt.datetime(2020, 1, 1),
+                    "start_timezone": 0,
+                    "end_timezone": 0,
+                    **created,
+                }
+            ],
+        )
+        db.session.execute(
+            db.insert(Group),
+            [
+                {"id_": group, "name": f"Group {group}", "location_id": 1, **created}
+                for group in range(1, groups + 1)
+            ],
+        )
+        db.session.execute(
+            db.insert(Client),
+            [
+                {
+                    "id_": client,
+                    "name": "Parent",
+                    "child_name": "Child",
+                    "address": "Street",
+                    "phone": "123",
+                    "childs_birthday": dt.date(2015, 1, 1),
+                    **created,
+                }
+                for client in range(1, children + 1)
+            ],
+        )
+        end = dt.date(2020, 1, 6) + dt.timedelta(weeks=weeks)
+        db.session.execute(
+            db.insert(ClientParticipant),
+            [
+                {
+                    "id_": client,
+                    "client_id": client,
+                    "group_id": client % groups + 1,
+                    "start_date": dt.date(2020, 1, 1),
+                    "end_date": end,
+                    **created,
+                }
+                for client in range(1, children + 1)
+            ],
+        )
+        db.session.execute(
+            db.insert(Subscription),
+            [
+                {
+                    "id_": client,
+                    "client_id": client,
+                    "total_visits": weeks,
+                    "full_price_id": 1,
+                    "start_date": dt.date(2020, 1, 1),
+                    "end_date": end,
+                    **created,
+                }
+                for client in range(1, children + 1)
+            ],
+        )
+        lessons = [
+            {
+                "id_": week * groups + group,
+                "state": "passed",
+                "group_id": group,
+                "location_id": 1,
+                "start_datetime_utc": dt.datetime(2020, 1, 6, 10) + dt.timedelta(weeks=week),
+                "start_timezone": 0,
+                "end_datetime_utc": dt.datetime(2020, 1, 6, 11) + dt.timedelta(weeks=week),
+                "end_timezone": 0,
+                **created,
+            }
+            for week in range(weeks)
+            for group in range(1, groups + 1)
+        ]
+        db.session.execute(db.insert(Lesson), lessons)
+        rng = np.random.default_rng(2)
+        states = rng.choice(
+            ["present", "missing", "vacation"], size=(weeks, children), p=[0.8, 0.15, 0.05]
+        )
+        db.session.execute(
+            db.insert(Visitor),
+            [
+                {
+                    "state": states[week, client - 1],
+                    "lesson_id": week * groups + client % groups + 1,
+                    "subscription_id": client,
+                    **created,
+                }
+                for week in range(weeks)
+                for client in range(1, children + 1)
+            ],
+        )
+        db.session.commit()
+        with timed(f"load_visits ({weeks * children} rows)"):
+            visits = load_visits(dt.date(2020, 1, 1), end)
+        print(f"{'loaded rows':<32} {len(visits):8d}")
+        db.session.remove()
+    path.unlink()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--visits", type=int, default=5_000_000)
+    parser.add_argument("--children", type=int, default=20_000)
+    parser.add_argument("--groups", type=int, default=400)
+    parser.add_argument("--load", type=int, default=0, help="rows written to SQLite")
+    args = parser.parse_args()
+
+    with timed(f"generate and sort ({args.visits} rows)"):
+        visits = synthetic(args.visits, args.children, args.groups)
+    with timed("rates, streaks, clusters"):
+        result = AttendanceAnalytics(visits)
+    with timed("per group percentiles"):
+        percentiles = result.group_percentiles()
+    with timed("per child rows"):
+        children = result.children()
+    print(f"{'children':<32} {len(children):8d}")
+    print(f"{'groups':<32} {len(percentiles):8d}")
+    if args.load:
+        load(args.load, min(args.children, args.load), args.groups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""contract documents in blob store
+
+Revision ID: a6c8e0b2d4f7
+Revises: f3b5d7e9a1c4
+Create Date: 2026-10-18 10:01:48.512769
+
+"""
+import sys
+
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+from attendance_logger.services.blob_store import BlobStore
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c8e0b2d4f7'
+down_revision = 'f3b5d7e9a1c4'
+branch_labels = None
+depends_on = None
+
+DOCUMENTS = ("signed", "canceled")
+# contracts per batch, only the documents of one batch are in memory
+BATCH_SIZE = 50
+
+
+def _store() -> BlobStore:
+    store = BlobStore(root=current_app.config.get("BLOB_STORE_PATH"))
+    # documents stored before the limit existed are moved as they are
+    store.max_size = sys.maxsize
+    return store
+
+
+def _batches(connection, contracts: sa.TableClause, columns: list[str]):
+    """Ids of contracts with any of the columns set, in batches"""
+    last = 0
+    while True:
+        ids = connection.scalars(
+            sa.select(contracts.c.id_)
+            .where(
+                contracts.c.id_ > last,
+                sa.or_(*(contracts.c[column].is_not(None) for column in columns)),
+            )
+            .order_by(contracts.c.id_)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+
+def upgrade():
+    with op.batch_alter_table('contracts', schema=None) as batch_op:
+        for kind in DOCUMENTS:
+            batch_op.add_column(sa.Column(f'{kind}_pdf_digest', sa.String(length=64), nullable=True))
+            batch_op.add_column(sa.Column(f'{kind}_pdf_size', sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column(f'{kind}_pdf_mime', sa.String(length=100), nullable=True))
+
+    connection = op.get_bind()
+    contracts = sa.table(
+        "contracts",
+        sa.column("id_", sa.Integer),
+        *(
+            column
+            for kind in DOCUMENTS
+            for column in (
+                sa.column(f"{kind}_pdf", sa.LargeBinary),
+                sa.column(f"{kind}_pdf_digest", sa.String),
+                sa.column(f"{kind}_pdf_size", sa.Integer),
+                sa.column(f"{kind}_pdf_mime", sa.String),
+            )
+        ),
+    )
+    store = None
+    for ids in _batches(connection, contracts, [f"{kind}_pdf" for kind in DOCUMENTS]):
+        store = store or _store()
+        rows = connection.execute(
+            sa.select(contracts.c.id_, *(contracts.c[f"{kind}_pdf"] for kind in DOCUMENTS))
+            .where(contracts.c.id_.in_(ids))
+        )
+        updates = []
+        for id_, *documents in rows:
+            values = {"contract_id": id_}
+            for kind, content in zip(DOCUMENTS, documents):
+                blob = store.put([content]) if content is not None else None
+                values[f"{kind}_pdf_digest"] = blob and blob.digest
+                values[f"{kind}_pdf_size"] = blob and blob.size
+                values[f"{kind}_pdf_mime"] = blob and "application/pdf"
+            updates.append(values)
+        connection.execute(
+            contracts.update()
+            .where(contracts.c.id_ == sa.bindparam("contract_id"))
+            .values({name: sa.bindparam(name) for name in updates[0] if name != "contract_id"}),
+            updates,
+        )
+
+    with op.batch_alter_table('contracts', schema=None) as batch_op:
+        batch_op.drop_column('signed_pdf')
+        batch_op.drop_column('canceled_pdf')
+
+
+def downgrade():
+    with op.batch_alter_table('contracts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('canceled_pdf', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('signed_pdf', sa.LargeBinary(), nullable=True))
+
+    connection = op.get_bind()
+    contracts = sa.table(
+        "contracts",
+        sa.column("id_", sa.Integer),
+        *(
+            column
+            for kind in DOCUMENTS
+            for column in (
+                sa.column(f"{kind}_pdf", sa.LargeBinary),
+                sa.column(f"{kind}_pdf_digest", sa.String),
+            )
+        ),
+    )
+    store = None
+    for ids in _batches(connection, contracts, [f"{kind}_pdf_digest" for kind in DOCUMENTS]):
+        store = store or _store()
+        rows = connection.execute(
+            sa.select(
+                contracts.c.id_, *(contracts.c[f"{kind}_pdf_digest"] for kind in DOCUMENTS)
+            ).where(contracts.c.id_.in_(ids))
+        )
+        updates = [
+            {
+                "contract_id": id_,
+                **{
+                    f"{kind}_pdf": digest and b"".join(store.read(digest))
+                    for kind, digest in zip(DOCUMENTS, digests)
+                },
+            }
+            for id_, *digests in rows
+        ]
+        connection.execute(
+            contracts.update()
+            .where(contracts.c.id_ == sa.bindparam("contract_id"))
+            .values({f"{kind}_pdf": sa.bindparam(f"{kind}_pdf") for kind in DOCUMENTS}),
+            updates,
+        )
+
+    # blobs stay in the store, see `flask collect-blobs`
+    with op.batch_alter_table('contracts', schema=None) as batch_op:
+        for kind in reversed(DOCUMENTS):
+            batch_op.drop_column(f'{kind}_pdf_mime')
+            batch_op.drop_column(f'{kind}_pdf_size')
+            batch_op.drop_column(f'{kind}_pdf_digest')
@@ -0,0 +1,87 @@
+"""attendance primary keys
+
+The old keys let a subscription or a user appear several times in a lesson,
+only the last recorded row of each is kept. `id_` was unique only together
+with the lesson and the subscription or user, rows sharing an `id_` get new
+ones. Outside of SQLite `id_` isn't an alias of the rowid, it gets the
+sequence a serial column would have.
+
+Revision ID: b4e6a8c0d2f1
+Revises: 9a3c5e7b2d14
+Create Date: 2026-10-18 09:43:35.097064
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e6a8c0d2f1'
+down_revision = '9a3c5e7b2d14'
+branch_labels = None
+depends_on = None
+
+
+def _keep_last_rows(table: str, column: str) -> None:
+    rows = sa.table(table, sa.column("id_", sa.Integer), sa.column("lesson_id"), sa.column(column))
+    later = rows.alias("later")
+    op.execute(
+        rows.delete().where(
+            sa.exists().where(
+                later.c.lesson_id == rows.c.lesson_id,
+                later.c[column] == rows.c[column],
+                later.c.id_ > rows.c.id_,
+            )
+        )
+    )
+
+
+def _renumber_duplicates(table: str, new_id: sa.ColumnElement) -> None:
+    rows = sa.table(table, sa.column("id_", sa.Integer))
+    duplicates = sa.select(rows.c.id_).group_by(rows.c.id_).having(sa.func.count() > 1)
+    op.execute(
+        rows.update().where(rows.c.id_.in_(duplicates.scalar_subquery())).values(id_=new_id)
+    )
+
+
+# primary key changes aren't detected by autogenerate
+def upgrade():
+    dialect = op.get_context().dialect.name
+    for table, column in (("teachers", "user_id"), ("visitors", "subscription_id")):
+        sequence = f"{table}_id__seq"
+        # ids of one lesson and subscription or user are distinct under the old key
+        _keep_last_rows(table, column)
+        if dialect == "sqlite":
+            # rowids are unique, the sum stays above every kept id_
+            _renumber_duplicates(table, sa.text(f"(SELECT max(id_) FROM {table}) + rowid"))
+        else:
+            op.execute(sa.schema.CreateSequence(sa.Sequence(sequence)))
+            op.execute(
+                f"SELECT setval('{sequence}', coalesce(max(id_), 0) + 1, false) FROM {table}"
+            )
+            _renumber_duplicates(table, sa.text(f"nextval('{sequence}'::regclass)"))
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f"pk_{table}", type_="primary")
+            batch_op.create_primary_key(f"pk_{table}", ["id_"])
+            batch_op.create_unique_constraint(
+                batch_op.f(f"uq_{table}_lesson_id"), ["lesson_id", column]
+            )
+            if dialect != "sqlite":
+                batch_op.alter_column(
+                    "id_", server_default=sa.text(f"nextval('{sequence}'::regclass)")
+                )
+        if dialect != "sqlite":
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id_")
+
+
+def downgrade():
+    dialect = op.get_context().dialect.name
+    for table, column in (("visitors", "subscription_id"), ("teachers", "user_id")):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            if dialect != "sqlite":
+                batch_op.alter_column("id_", server_default=None)
+            batch_op.drop_constraint(batch_op.f(f"uq_{table}_lesson_id"), type_="unique")
+            batch_op.drop_constraint(f"pk_{table}", type_="primary")
+            batch_op.create_primary_key(f"pk_{table}", [column, "id_", "lesson_id"])
+        if dialect != "sqlite":
+            op.execute(sa.schema.DropSequence(sa.Sequence(f"{table}_id__seq")))
@@ -0,0 +1,130 @@
+"""attendance rollups
+
+The tables are filled from the existing lessons, visitors and teachers.
+
+Revision ID: d1f3a5c7e9b2
+Revises: b4e6a8c0d2f1
+Create Date: 2026-10-18 09:47:50.016675
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1f3a5c7e9b2'
+down_revision = 'b4e6a8c0d2f1'
+branch_labels = None
+depends_on = None
+
+
+def _week(moment: sa.ColumnElement) -> sa.ColumnElement:
+    """Monday of the ISO week of a datetime, see services.statistics.week_of"""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sa.func.date(moment, "-6 days", "weekday 1")
+    if dialect == "postgresql":
+        return sa.cast(sa.func.date_trunc("week", moment), sa.Date)
+    raise NotImplementedError(f"Rollups can't be filled on {dialect}")
+
+
+def _fill_rollups() -> None:
+    lessons = sa.table(
+        "lessons",
+        sa.column("id_", sa.Integer),
+        sa.column("group_id", sa.Integer),
+        sa.column("location_id", sa.Integer),
+        sa.column("start_datetime_utc", sa.DateTime),
+        sa.column("state", sa.String),
+    )
+    visitors = sa.table(
+        "visitors",
+        sa.column("id_", sa.Integer),
+        sa.column("lesson_id", sa.Integer),
+        sa.column("state", sa.String),
+    )
+    teachers = sa.table(
+        "teachers",
+        sa.column("id_", sa.Integer),
+        sa.column("lesson_id", sa.Integer),
+        sa.column("user_id", sa.Integer),
+        sa.column("state", sa.String),
+    )
+    keys = [
+        lessons.c.group_id,
+        lessons.c.location_id,
+        _week(lessons.c.start_datetime_utc).label("week"),
+    ]
+    # one INSERT ... SELECT ... GROUP BY per rollup table
+    for name, source, extra in (
+        ("lesson_rollups", lessons, []),
+        ("visitor_rollups", visitors, []),
+        ("teacher_rollups", teachers, [teachers.c.user_id]),
+    ):
+        columns = [*extra, *keys, source.c.state]
+        select = sa.select(*columns, sa.func.count(source.c.id_)).group_by(*columns)
+        if source is not lessons:
+            select = select.select_from(
+                source.join(lessons, source.c.lesson_id == lessons.c.id_)
+            )
+        names = [column.name for column in columns] + ["count"]
+        target = sa.table(name, *(sa.column(column) for column in names))
+        op.execute(target.insert().from_select(names, select))
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('lesson_rollups',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('state', sa.String(length=256), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id_'], name=op.f('fk_lesson_rollups_group_id_groups')),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id_'], name=op.f('fk_lesson_rollups_location_id_locations')),
+    sa.PrimaryKeyConstraint('group_id', 'location_id', 'week', 'state', name=op.f('pk_lesson_rollups'))
+    )
+    with op.batch_alter_table('lesson_rollups', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_lesson_rollups_location_id'), ['location_id', 'week'], unique=False)
+
+    op.create_table('teacher_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('state', sa.String(length=256), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id_'], name=op.f('fk_teacher_rollups_group_id_groups')),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id_'], name=op.f('fk_teacher_rollups_location_id_locations')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id_'], name=op.f('fk_teacher_rollups_user_id_users')),
+    sa.PrimaryKeyConstraint('user_id', 'group_id', 'location_id', 'week', 'state', name=op.f('pk_teacher_rollups'))
+    )
+    op.create_table('visitor_rollups',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('state', sa.String(length=256), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id_'], name=op.f('fk_visitor_rollups_group_id_groups')),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id_'], name=op.f('fk_visitor_rollups_location_id_locations')),
+    sa.PrimaryKeyConstraint('group_id', 'location_id', 'week', 'state', name=op.f('pk_visitor_rollups'))
+    )
+    with op.batch_alter_table('visitor_rollups', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_visitor_rollups_location_id'), ['location_id', 'week'], unique=False)
+
+    # ### end Alembic commands ###
+    _fill_rollups()
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('visitor_rollups', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_visitor_rollups_location_id'))
+
+    op.drop_table('visitor_rollups')
+    op.drop_table('teacher_rollups')
+    with op.batch_alter_table('lesson_rollups', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lesson_rollups_location_id'))
+
+    op.drop_table('lesson_rollups')
+    # ### end Alembic commands ###
@@ -0,0 +1,73 @@
+"""participant primary keys
+
+`id_` was unique only together with the group and the client or user, rows
+sharing an `id_` get new ones. Outside of SQLite `id_` isn't an alias of the
+rowid, it gets the sequence a serial column would have.
+
+Revision ID: d8f0b2c4e6a9
+Revises: c7e9a1b3d5f8
+Create Date: 2026-10-18 10:12:05.318412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f0b2c4e6a9'
+down_revision = 'c7e9a1b3d5f8'
+branch_labels = None
+depends_on = None
+
+TABLES = ("client_participants", "user_participants")
+
+
+def _renumber_duplicates(table: str, new_id: sa.ColumnElement) -> None:
+    participants = sa.table(table, sa.column("id_", sa.Integer))
+    duplicates = (
+        sa.select(participants.c.id_)
+        .group_by(participants.c.id_)
+        .having(sa.func.count() > 1)
+    )
+    op.execute(
+        participants.update()
+        .where(participants.c.id_.in_(duplicates.scalar_subquery()))
+        .values(id_=new_id)
+    )
+
+
+# primary key changes aren't detected by autogenerate
+def upgrade():
+    dialect = op.get_context().dialect.name
+    for table in TABLES:
+        sequence = f"{table}_id__seq"
+        if dialect == "sqlite":
+            # rowids are unique, the sum stays above every kept id_
+            _renumber_duplicates(table, sa.text(f"(SELECT max(id_) FROM {table}) + rowid"))
+        else:
+            op.execute(sa.schema.CreateSequence(sa.Sequence(sequence)))
+            op.execute(
+                f"SELECT setval('{sequence}', coalesce(max(id_), 0) + 1, false) FROM {table}"
+            )
+            _renumber_duplicates(table, sa.text(f"nextval('{sequence}'::regclass)"))
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f"pk_{table}", type_="primary")
+            batch_op.create_primary_key(f"pk_{table}", ["id_"])
+            if dialect != "sqlite":
+                batch_op.alter_column(
+                    "id_", server_default=sa.text(f"nextval('{sequence}'::regclass)")
+                )
+        if dialect != "sqlite":
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id_")
+
+
+def downgrade():
+    dialect = op.get_context().dialect.name
+    for table, column in (("user_participants", "user_id"), ("client_participants", "client_id")):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            if dialect != "sqlite":
+                batch_op.alter_column("id_", server_default=None)
+            batch_op.drop_constraint(f"pk_{table}", type_="primary")
+            batch_op.create_primary_key(f"pk_{table}", [column, "id_", "group_id"])
+        if dialect != "sqlite":
+            op.execute(sa.schema.DropSequence(sa.Sequence(f"{table}_id__seq")))
@@ -0,0 +1,34 @@
+import pytest
+from flask import Flask
+
+from attendance_logger.models.database import db
+
+
+@pytest.fixture
+def app():
+    """Minimal application with an in-memory SQLite database"""
+    app = Flask(__name__)
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI="sqlite://")
+    db.init_app(app)
+    with app.app_context():
+        from attendance_logger.models import db_models  # noqa: F401
+
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def statements(app):
+    """List of SQL statements executed while the test runs"""
+    from sqlalchemy import event
+
+    executed = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:
+        executed.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db.engine, "before_cursor_execute", record)
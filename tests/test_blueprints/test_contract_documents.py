@@ -0,0 +1,90 @@
+import datetime as dt
+
+import pytest
+from flask_jwt_extended import JWTManager, create_access_token
+
+from attendance_logger import blob_store
+from attendance_logger.blueprints.contracts.routes_v1 import contracts_bp
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Client, Contract
+
+CREATED = {"created_datetime": dt.datetime(2025, 1, 1), "created_timezone": 0}
+DOCUMENT = b"%PDF-1.7\n" + bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client(app, tmp_path):
+    app.config.update(
+        JWT_SECRET_KEY="test-secret-key-with-at-least-32-bytes",
+        SECRET_KEY="test",
+        BLOB_STORE_PATH=str(tmp_path),
+        BLOB_CHUNK_SIZE=1024,
+    )
+    JWTManager(app)
+    blob_store.init_app(app)
+    app.register_blueprint(contracts_bp)
+    owner = Client(
+        name="Parent",
+        child_name="Child",
+        address="",
+        phone="",
+        childs_birthday=dt.date(2018, 1, 1),
+        **CREATED,
+    )
+    db.session.add(Contract(number="2025/1", client=owner, **CREATED))
+    db.session.commit()
+    token = create_access_token(identity="1", additional_claims={"lvl": 3})
+    client = app.test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+
+def test_upload_and_ranged_download(client) -> None:
+    response = client.put(
+        "/api/v1/contracts/1/documents/signed",
+        data=DOCUMENT,
+        content_type="application/pdf",
+    )
+    assert response.status_code == 200
+    digest = response.get_json()["digest"]
+    assert db.session.get(Contract, 1).signed_pdf_size == len(DOCUMENT)
+
+    response = client.get("/api/v1/contracts/1/documents/signed")
+    assert response.status_code == 200
+    assert response.data == DOCUMENT
+    assert response.headers["ETag"] == f'"{digest}"'
+    assert response.headers["Accept-Ranges"] == "bytes"
+
+    response = client.get(
+        "/api/v1/contracts/1/documents/signed", headers={"Range": "bytes=100-199"}
+    )
+    assert response.status_code == 206
+    assert response.data == DOCUMENT[100:200]
+
+    response = client.get(
+        "/api/v1/contracts/1/documents/signed", headers={"If-None-Match": f'"{digest}"'}
+    )
+    assert response.status_code == 304
+
+
+def test_rejected_uploads(client) -> None:
+    url = "/api/v1/contracts/1/documents/canceled"
+    assert client.put(url, data=b"text", content_type="text/plain").status_code == 400
+    blob_store.max_size = 100
+    assert client.put(url, data=DOCUMENT, content_type="application/pdf").status_code == 413
+    assert (
+        client.put(
+            "/api/v1/contracts/2/documents/signed", data=b"%PDF", content_type="application/pdf"
+        ).status_code
+        == 404
+    )
+    assert client.get(url).status_code == 404
+
+
+def test_contract_list_filters(client) -> None:
+    response = client.get("/api/v1/contracts?client=1")
+    assert response.status_code == 200
+    assert [item["number"] for item in response.get_json()["items"]] == ["2025/1"]
+    assert client.get("/api/v1/contracts?client=2").get_json()["items"] == []
+    assert client.get("/api/v1/contracts?client=abc").status_code == 400
+    assert client.get("/api/v1/contracts?date_from=soon").status_code == 400
@@ -0,0 +1,56 @@
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from attendance_logger.blueprints.common.decorators import (
+    permission_level,
+    policy_table,
+    roles_required,
+)
+from attendance_logger.models.models import PermissionLevels
+
+
+def make_app() -> Flask:
+    app = Flask(__name__)
+    app.config.update(TESTING=True, JWT_SECRET_KEY="test-secret-key-with-at-least-32-bytes")
+    JWTManager(app)
+
+    @app.route("/employees")
+    @roles_required("employee", "manager")
+    def employees() -> dict:
+        return {"status": "OK"}
+
+    @app.route("/public")
+    def public() -> dict:
+        return {"status": "OK"}
+
+    return app
+
+
+def headers(app: Flask, claims: dict) -> dict:
+    with app.app_context():
+        token = create_access_token(identity="1", additional_claims=claims)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_permission_level() -> None:
+    assert permission_level([]) == PermissionLevels.USER
+    assert permission_level(["employee", "owner"]) == PermissionLevels.OWNER
+
+
+def test_roles_required_follows_hierarchy() -> None:
+    app = make_app()
+    client = app.test_client()
+    assert client.get("/employees", headers=headers(app, {"lvl": 2})).status_code == 403
+    assert client.get("/employees", headers=headers(app, {"lvl": 3})).status_code == 200
+    assert client.get("/employees", headers=headers(app, {"lvl": 7})).status_code == 200
+    # tokens without level claim
+    legacy = headers(app, {"roles": ["head manager"]})
+    assert client.get("/employees", headers=legacy).status_code == 200
+
+
+def test_policy_table() -> None:
+    app = make_app()
+    with app.app_context():
+        table = {row[0]: row[3] for row in policy_table()}
+    assert table["/employees"] == "3 EMPLOYEE"
+    assert table["/public"] == "0 UNAUTHORIZED"
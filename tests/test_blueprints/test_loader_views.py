@@ -0,0 +1,149 @@
+import datetime as dt
+
+import pytest
+from flask_jwt_extended import JWTManager, create_access_token
+
+from attendance_logger.blueprints.clients.routes_v1 import clients_bp
+from attendance_logger.blueprints.groups.routes_v1 import groups_bp
+from attendance_logger.blueprints.lessons.routes_v1 import lessons_bp
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Client,
+    ClientParticipant,
+    Contract,
+    Group,
+    Lesson,
+    Location,
+    Price,
+    Schedule,
+    Subscription,
+    Teacher,
+    User,
+    UserParticipant,
+    Visitor,
+)
+from attendance_logger.services.query_budget import QueryInspector
+
+NOW = dt.datetime(2025, 3, 3, 10)
+CREATED = {"created_datetime": NOW, "created_timezone": 0}
+
+
+@pytest.fixture
+def client(app):
+    # budgets raise and lazy loads outside of the loader profiles fail
+    app.config.update(
+        JWT_SECRET_KEY="test-secret-key-with-at-least-32-bytes",
+        SECRET_KEY="test",
+        QUERY_BUDGET_MODE="raise",
+        LOADER_STRICT=True,
+    )
+    JWTManager(app)
+    QueryInspector(app)
+    for blueprint in (clients_bp, groups_bp, lessons_bp):
+        app.register_blueprint(blueprint)
+    token = create_access_token(identity="1", additional_claims={"lvl": 3})
+    client = app.test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+
+def add_groups(count: int, children: int) -> None:
+    price = Price(
+        type_=1, value=100.0, start_datetime_utc=NOW, start_timezone=0, end_timezone=0, **CREATED
+    )
+    location = Location(name="Hall", address="Main street 1")
+    schedule = Schedule(
+        weekday=0,
+        start_time_utc=dt.time(10),
+        start_timezone=0,
+        end_time_utc=dt.time(11),
+        end_timezone=0,
+    )
+    for number in range(count):
+        group = Group(name=f"Group {number}", location=location, **CREATED)
+        group.schedules.append(schedule)
+        teacher = User(
+            username=f"teacher {number}",
+            email=f"teacher{number}@example.com",
+            password="hash",
+            **CREATED,
+        )
+        group.teachers.append(
+            UserParticipant(
+                user=teacher, start_date=NOW.date(), end_date=dt.date(2025, 12, 31), **CREATED
+            )
+        )
+        lesson = Lesson(
+            state="passed",
+            group=group,
+            location=location,
+            start_datetime_utc=NOW,
+            start_timezone=0,
+            end_datetime_utc=NOW + dt.timedelta(hours=1),
+            end_timezone=0,
+            **CREATED,
+        )
+        lesson.teachers.append(Teacher(state="present", user=teacher, **CREATED))
+        for child in range(children):
+            owner = Client(
+                name=f"Parent {number}.{child}",
+                child_name=f"Child {number}.{child}",
+                address="Street",
+                phone="123",
+                childs_birthday=dt.date(2018, 1, 1),
+                **CREATED,
+            )
+            owner.contracts.append(Contract(number=f"{number}/{child}", **CREATED))
+            owner.participations.append(
+                ClientParticipant(
+                    group=group, start_date=NOW.date(), end_date=dt.date(2025, 12, 31), **CREATED
+                )
+            )
+            subscription = Subscription(
+                total_visits=8, full_price=price, client=owner, start_date=NOW.date(), **CREATED
+            )
+            lesson.visitors.append(
+                Visitor(state="present", subscription=subscription, **CREATED)
+            )
+        db.session.add(lesson)
+    db.session.commit()
+    db.session.remove()
+
+
+def test_attendance_sheet(client) -> None:
+    add_groups(1, children=5)
+    response = client.get("/api/v1/lessons/1/attendance")
+    assert response.status_code == 200
+    sheet = response.get_json()
+    assert (sheet["group_name"], sheet["location"]) == ("Group 0", "Hall")
+    assert [visitor["child_name"] for visitor in sheet["visitors"]] == [
+        f"Child 0.{child}" for child in range(5)
+    ]
+    assert sheet["teachers"] == [{"user_id": 1, "username": "teacher 0", "state": "present"}]
+    assert client.get("/api/v1/lessons/2/attendance").status_code == 404
+
+
+def test_client_card(client) -> None:
+    add_groups(1, children=1)
+    response = client.get("/api/v1/clients/1")
+    assert response.status_code == 200
+    card = response.get_json()
+    assert [contract["number"] for contract in card["contracts"]] == ["0/0"]
+    assert card["subscriptions"][0]["open_visits"] == 7
+    assert card["subscriptions"][0]["full_price"] == 100.0
+    assert card["participations"][0]["group_name"] == "Group 0"
+    assert client.get("/api/v1/clients/2").status_code == 404
+
+
+def test_group_list(client) -> None:
+    add_groups(6, children=0)
+    response = client.get("/api/v1/groups?limit=4")
+    assert response.status_code == 200
+    page = response.get_json()
+    assert [group["name"] for group in page["items"]] == [f"Group {number}" for number in range(4)]
+    assert page["items"][0]["schedules"] == [
+        {"weekday": 0, "start_time_utc": "10:00:00", "end_time_utc": "11:00:00"}
+    ]
+    assert page["items"][3]["teachers"][0]["username"] == "teacher 3"
+    response = client.get(f"/api/v1/groups?cursor={page['next']}")
+    assert [group["id"] for group in response.get_json()["items"]] == [5, 6]
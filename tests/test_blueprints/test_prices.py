@@ -0,0 +1,50 @@
+import datetime as dt
+
+import pytest
+
+from attendance_logger import price_index
+from attendance_logger.blueprints.prices.routes_v1 import prices_bp
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Price
+
+
+@pytest.fixture
+def client(app):
+    app.config["SECRET_KEY"] = "test"
+    price_index.init_app(app)
+    price_index.invalidate()
+    app.register_blueprint(prices_bp)
+    for category, month in ((2, 1), (1, 3), (1, 1)):
+        db.session.add(
+            Price(
+                type_=category,
+                value=100 * month,
+                start_datetime_utc=dt.datetime(2025, month, 1),
+                start_timezone=0,
+                end_timezone=0,
+                created_datetime=dt.datetime(2025, 1, 1),
+                created_timezone=0,
+            )
+        )
+    db.session.commit()
+    return app.test_client()
+
+
+def test_full_listing_is_cached(client) -> None:
+    response = client.get("/api/v1/prices")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.get_json()["items"]] == [3, 2, 1]
+    etag = response.headers["ETag"]
+    assert client.get("/api/v1/prices", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_listing_is_paged_with_parameters(client) -> None:
+    response = client.get("/api/v1/prices?sort=-id&limit=2")
+    body = response.get_json()
+    assert [item["id"] for item in body["items"]] == [3, 2]
+    response = client.get(f"/api/v1/prices?cursor={body['next']}")
+    assert [item["id"] for item in response.get_json()["items"]] == [1]
+
+    body = client.get("/api/v1/prices?page=2&limit=2").get_json()
+    assert (body["page"], [item["id"] for item in body["items"]]) == (2, [1])
+    assert client.get("/api/v1/prices?sort=value").status_code == 400
@@ -0,0 +1,261 @@
+import datetime as dt
+
+import flask_migrate
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask import Flask
+from flask_migrate import Migrate
+from sqlalchemy import event, inspect, text
+
+from attendance_logger.models.bootstrap import (
+    INITIAL_REVISION,
+    MIGRATIONS_DIR,
+    bootstrap,
+    upgrade_schema,
+)
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Client,
+    ClientParticipant,
+    Group,
+    Lesson,
+    LessonRollup,
+    Location,
+    Price,
+    Subscription,
+    Teacher,
+    TeacherRollup,
+    User,
+    UserRole,
+    Visitor,
+    VisitorRollup,
+)
+from attendance_logger.services.statistics import rebuild_rollups
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'bootstrap.db'}",
+        APP_ADMIN_EMAIL="admin@example.com",
+        APP_ADMIN_DEFAULT_PASSWORD="adminadminadmin",
+        BOOTSTRAP_TIME_BUDGET_MS=200,
+    )
+    db.init_app(app)
+    Migrate(app, db, directory=str(MIGRATIONS_DIR), render_as_batch=True)
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+def test_second_bootstrap_is_skipped(file_app) -> None:
+    first = bootstrap()
+    assert not first["skipped"]
+    assert db.session.scalar(db.select(db.func.count(UserRole.id_))) == 6
+    assert db.session.scalar(db.select(User.email)) == "admin@example.com"
+
+    executed = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:
+        executed.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    second = bootstrap()
+    event.remove(db.engine, "before_cursor_execute", record)
+    assert second["skipped"]
+    assert second["version"] == first["version"]
+    assert len(executed) == 1
+    assert second["elapsed_ms"] < 200
+
+
+def test_database_created_without_migrations_is_upgraded(file_app) -> None:
+    # the baseline schema of db.create_all() lacks these objects of the
+    # initial revision
+    flask_migrate.upgrade(directory=str(MIGRATIONS_DIR), revision=INITIAL_REVISION)
+    with db.engine.begin() as connection:
+        for statement in (
+            "DROP INDEX ix_email_confirmations_email",
+            "DROP TABLE email_outbox",
+            "DROP TABLE bootstrap_state",
+            "DROP TABLE alembic_version",
+        ):
+            connection.exec_driver_sql(statement)
+
+    upgrade_schema()
+    assert "email_outbox" in inspect(db.engine).get_table_names()
+    with db.engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), db.metadata) == []
+
+
+def test_rollups_are_filled_by_their_migration(file_app) -> None:
+    flask_migrate.upgrade(directory=str(MIGRATIONS_DIR), revision="b4e6a8c0d2f1")
+    created = {"created_datetime": dt.datetime(2024, 9, 1), "created_timezone": 0}
+    location = Location(address="Main street 1")
+    group = Group(name="Piano", location=location, **created)
+    price = Price(
+        type_=1,
+        value=100.0,
+        start_datetime_utc=dt.datetime(2024, 9, 1),
+        start_timezone=0,
+        end_timezone=0,
+        **created,
+    )
+    client = Client(
+        name="Parent",
+        child_name="Child",
+        address="",
+        phone="",
+        childs_birthday=dt.date(2018, 1, 1),
+        **created,
+    )
+    subscription = Subscription(total_visits=8, full_price=price, client=client, **created)
+    user = User(username="teacher", email="teacher@example.com", password="", **created)
+    # Sunday and Monday 23:30 fall into two ISO weeks
+    for day in (1, 2, 3, 9):
+        start = dt.datetime(2024, 9, day, 23, 30)
+        lesson = Lesson(
+            state="passed" if day < 9 else "planed",
+            group=group,
+            location=location,
+            start_datetime_utc=start,
+            start_timezone=0,
+            end_datetime_utc=start + dt.timedelta(hours=1),
+            end_timezone=0,
+            **created,
+        )
+        lesson.visitors.append(Visitor(state="present", subscription=subscription, **created))
+        lesson.teachers.append(Teacher(state="present", user=user, **created))
+        db.session.add(lesson)
+    db.session.commit()
+
+    flask_migrate.upgrade(directory=str(MIGRATIONS_DIR))
+
+    def rollups() -> list[tuple]:
+        return [
+            row
+            for model in (LessonRollup, VisitorRollup, TeacherRollup)
+            for row in db.session.execute(
+                db.select(model.__table__).order_by(*model.__table__.primary_key)
+            ).all()
+        ]
+
+    migrated = rollups()
+    assert (1, 1, dt.date(2024, 8, 26), "passed", 1) in migrated
+    assert (1, 1, dt.date(2024, 9, 2), "passed", 2) in migrated
+    rebuild_rollups()
+    assert rollups() == migrated
+
+
+def test_participants_sharing_an_id_get_new_ones(file_app) -> None:
+    flask_migrate.upgrade(directory=str(MIGRATIONS_DIR), revision="c7e9a1b3d5f8")
+    created = {"created_datetime": dt.datetime(2024, 9, 1), "created_timezone": 0}
+    group = Group(name="Piano", location=Location(address="Main street 1"), **created)
+    clients = [
+        Client(
+            name=f"Parent {number}",
+            child_name="Child",
+            address="",
+            phone="",
+            childs_birthday=dt.date(2018, 1, 1),
+            **created,
+        )
+        for number in range(3)
+    ]
+    db.session.add_all([group, *clients])
+    db.session.flush()
+    # the old primary key let rows of different clients share an id_
+    for client, id_ in zip(clients, (5, 5, 7)):
+        db.session.execute(
+            text(
+                "INSERT INTO client_participants (client_id, id_, start_date, end_date, "
+                "group_id, created_datetime, created_timezone) "
+                "VALUES (:client, :id, '2024-09-01', '2024-12-31', :group, '2024-09-01', 0)"
+            ),
+            {"client": client.id_, "id": id_, "group": group.id_},
+        )
+    db.session.commit()
+
+    flask_migrate.upgrade(directory=str(MIGRATIONS_DIR))
+
+    ids = db.session.scalars(
+        db.select(ClientParticipant.id_).order_by(ClientParticipant.client_id)
+    ).all()
+    assert len(set(ids)) == 3
+    assert ids[2] == 7
+    assert min(ids[:2]) > 7
+
+
+def test_attendance_sharing_ids_or_lessons_is_merged(file_app) -> None:
+    flask_migrate.upgrade(directory=str(MIGRATIONS_DIR), revision="9a3c5e7b2d14")
+    created = {"created_datetime": dt.datetime(2024, 9, 1), "created_timezone": 0}
+    location = Location(address="Main street 1")
+    price = Price(
+        type_=1,
+        value=100.0,
+        start_datetime_utc=dt.datetime(2024, 9, 1),
+        start_timezone=0,
+        end_timezone=0,
+        **created,
+    )
+    client = Client(
+        name="Parent",
+        child_name="Child",
+        address="",
+        phone="",
+        childs_birthday=dt.date(2018, 1, 1),
+        **created,
+    )
+    subscriptions = [
+        Subscription(total_visits=8, full_price=price, client=client, **created)
+        for _ in range(2)
+    ]
+    users = [
+        User(username=name, email=f"{name}@example.com", password="", **created)
+        for name in ("first", "second")
+    ]
+    lesson = Lesson(
+        state="passed",
+        group=Group(name="Piano", location=location, **created),
+        location=location,
+        start_datetime_utc=dt.datetime(2024, 9, 2, 10),
+        start_timezone=0,
+        end_datetime_utc=dt.datetime(2024, 9, 2, 11),
+        end_timezone=0,
+        **created,
+    )
+    db.session.add_all([lesson, *subscriptions, *users])
+    db.session.flush()
+    # the old primary keys let rows share an id_ and a lesson
+    for table, column, rows in (
+        ("visitors", "subscription_id", ((5, 0, "absent"), (5, 1, "present"), (6, 1, "sick"))),
+        ("teachers", "user_id", ((5, 0, "present"), (5, 1, "present"))),
+    ):
+        owners = subscriptions if table == "visitors" else users
+        for id_, owner, state in rows:
+            db.session.execute(
+                text(
+                    f"INSERT INTO {table} (id_, {column}, lesson_id, state, "
+                    "created_datetime, created_timezone) "
+                    "VALUES (:id, :owner, :lesson, :state, '2024-09-01', 0)"
+                ),
+                {"id": id_, "owner": owners[owner].id_, "lesson": lesson.id_, "state": state},
+            )
+    db.session.commit()
+
+    flask_migrate.upgrade(directory=str(MIGRATIONS_DIR))
+
+    visitors = db.session.execute(
+        db.select(Visitor.id_, Visitor.subscription_id, Visitor.state).order_by(
+            Visitor.subscription_id
+        )
+    ).all()
+    assert [(row.subscription_id, row.state) for row in visitors] == [
+        (subscriptions[0].id_, "absent"),
+        (subscriptions[1].id_, "sick"),
+    ]
+    assert visitors[1].id_ == 6
+    teachers = db.session.scalars(db.select(Teacher.id_).order_by(Teacher.user_id)).all()
+    assert len(set(teachers)) == 2
@@ -0,0 +1,105 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Client,
+    Group,
+    Lesson,
+    Location,
+    Price,
+    Subscription,
+    Teacher,
+    User,
+    Visitor,
+)
+from attendance_logger.models.loaders import loader_profile
+
+NOW = dt.datetime(2024, 9, 2, 10)
+CREATED = {"created_datetime": NOW, "created_timezone": 0}
+
+
+def add_lesson(visitors: int = 3) -> int:
+    location = Location(name="Hall", address="Main street 1")
+    group = Group(name="Piano", location=location, **CREATED)
+    price = Price(
+        type_=1, value=100.0, start_datetime_utc=NOW, start_timezone=0, end_timezone=0, **CREATED
+    )
+    teacher = User(
+        username="teacher", email="teacher@example.com", password="hash", **CREATED
+    )
+    lesson = Lesson(
+        state="planned",
+        group=group,
+        location=location,
+        start_datetime_utc=NOW,
+        start_timezone=0,
+        end_datetime_utc=NOW + dt.timedelta(hours=1),
+        end_timezone=0,
+        **CREATED,
+    )
+    lesson.teachers.append(Teacher(id_=1, state="present", user=teacher, **CREATED))
+    for number in range(visitors):
+        client = Client(
+            name=f"Parent {number}",
+            child_name=f"Child {number}",
+            address="Street",
+            phone="123",
+            childs_birthday=dt.date(2018, 1, 1),
+            **CREATED,
+        )
+        subscription = Subscription(
+            total_visits=8, full_price=price, client=client, **CREATED
+        )
+        lesson.visitors.append(
+            Visitor(
+                id_=number + 1, state="present", subscription=subscription, **CREATED
+            )
+        )
+    db.session.add(lesson)
+    db.session.commit()
+    lesson_id = lesson.id_
+    db.session.remove()
+    return lesson_id
+
+
+def test_attendance_sheet_needs_constant_queries(app, statements) -> None:
+    lesson_id = add_lesson(visitors=5)
+    statements.clear()
+    lesson = db.session.scalar(
+        db.select(Lesson)
+        .where(Lesson.id_ == lesson_id)
+        .options(*loader_profile("lesson_attendance_sheet", strict=True))
+    )
+    sheet = [
+        (visitor.subscription.client.child_name, visitor.state)
+        for visitor in lesson.visitors
+    ]
+    teachers = [teacher.user.username for teacher in lesson.teachers]
+    assert len(sheet) == 5
+    assert teachers == ["teacher"]
+    assert lesson.group.name == "Piano"
+    assert len(statements) == 3
+    assert repr(lesson).startswith("<Lesson")
+
+
+def test_strict_mode_raises_on_unplanned_loads(app) -> None:
+    lesson_id = add_lesson(visitors=1)
+    lesson = db.session.scalar(
+        db.select(Lesson)
+        .where(Lesson.id_ == lesson_id)
+        .options(*loader_profile("lesson_attendance_sheet", strict=True))
+    )
+    with pytest.raises(InvalidRequestError):
+        lesson.favorites
+    with pytest.raises(InvalidRequestError):
+        lesson.visitors[0].subscription.client.phone
+
+
+def test_strict_mode_follows_config(app) -> None:
+    app.config["LOADER_STRICT"] = True
+    assert loader_profile("group_list") == loader_profile("group_list", strict=True)
+    with pytest.raises(KeyError):
+        loader_profile("unknown")
@@ -0,0 +1,78 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy import Select
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    ClientParticipant,
+    Lesson,
+    Price,
+    Subscription,
+    Teacher,
+    UserParticipant,
+    Visitor,
+)
+
+
+DAY = dt.date(2025, 3, 3)
+MOMENT = dt.datetime(2025, 3, 3, 12)
+
+
+def query_plan(query: Select) -> list[str]:
+    """Details of SQLite's EXPLAIN QUERY PLAN of a query"""
+    sql = query.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}"))
+    return [detail for _id, _parent, _unused, detail in rows]
+
+
+def full_scans(plan: list[str]) -> list[str]:
+    # "SCAN t USING COVERING INDEX" reads the whole index and is a full scan too
+    return [detail for detail in plan if detail.startswith("SCAN")]
+
+
+HOT_PATHS = {
+    "lessons of a group": db.select(Lesson).where(
+        Lesson.group_id == 1,
+        Lesson.start_datetime_utc >= MOMENT,
+        Lesson.start_datetime_utc < MOMENT + dt.timedelta(weeks=4),
+    ),
+    "visitors of lessons by state": db.select(Visitor.state, db.func.count(Visitor.id_))
+    .where(Visitor.lesson_id.in_([1, 2]))
+    .group_by(Visitor.lesson_id, Visitor.state),
+    "attendance of lessons": db.select(Visitor.id_, Visitor.state, Subscription.client_id)
+    .join(Visitor.subscription)
+    .where(Visitor.lesson_id.in_([1, 2])),
+    "used visits of a subscription": db.select(Subscription.used_visits).where(
+        Subscription.id_ == 1
+    ),
+    "valid subscriptions of clients": db.select(Subscription.id_).where(
+        Subscription.client_id.in_([1, 2]),
+        Subscription.freezed == db.false(),
+        Subscription.start_date <= DAY,
+    ),
+    "children of a group on a date": db.select(ClientParticipant.client_id).where(
+        ClientParticipant.group_id == 1,
+        ClientParticipant.start_date <= DAY,
+        ClientParticipant.end_date >= DAY,
+    ),
+    "teachers of a group on a date": db.select(UserParticipant.user_id).where(
+        UserParticipant.group_id == 1,
+        UserParticipant.start_date <= DAY,
+        UserParticipant.end_date >= DAY,
+    ),
+    "price at a moment": db.select(Price)
+    .where(Price.type_ == 1, Price.start_datetime_utc <= MOMENT)
+    .order_by(Price.start_datetime_utc.desc())
+    .limit(1),
+    "lessons of an employee": db.select(Lesson)
+    .join(Teacher.lesson)
+    .where(Teacher.user_id == 1)
+    .order_by(Teacher.lesson_id),
+}
+
+
+@pytest.mark.parametrize("name", HOT_PATHS)
+def test_hot_path_uses_index(app, name) -> None:
+    plan = query_plan(HOT_PATHS[name])
+    assert not full_scans(plan), plan
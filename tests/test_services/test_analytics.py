@@ -0,0 +1,172 @@
+import datetime as dt
+
+import pytest
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Client,
+    ClientParticipant,
+    Group,
+    Lesson,
+    Location,
+    Price,
+    Subscription,
+    Teacher,
+    User,
+    Visitor,
+)
+from attendance_logger.models.models import VisitRoles
+from attendance_logger.services.analytics import (
+    ABSENT,
+    ATTENDED,
+    EXCUSED,
+    AttendanceAnalytics,
+    VisitArrays,
+    load_visits,
+)
+
+np = pytest.importorskip("numpy")
+
+NOW = dt.datetime(2024, 9, 2, 10)
+CREATED = {"created_datetime": NOW, "created_timezone": 0}
+CODES = {"A": ATTENDED, "X": ABSENT, "E": EXCUSED}
+
+
+def arrays(sequences: dict[tuple[int, int], str]) -> VisitArrays:
+    """Weekly lessons per (client, group) from strings of outcome codes,
+    passed in random order"""
+    rows = [
+        (client, group, np.datetime64("2024-09-02") + np.timedelta64(7 * week, "D"), CODES[code])
+        for (client, group), sequence in sequences.items()
+        for week, code in enumerate(sequence)
+    ]
+    rows = [rows[index] for index in np.random.default_rng(1).permutation(len(rows))]
+    return VisitArrays(*zip(*rows))
+
+
+def test_rates_streaks_and_clusters() -> None:
+    result = AttendanceAnalytics(
+        arrays({(1, 1): "AAXEAAA", (2, 1): "XXAXXX", (3, 1): "AAAA", (3, 2): "EE"})
+    )
+    children = {(child["client_id"], child["group_id"]): child for child in result.children()}
+    first = children[(1, 1)]
+    # the excused lesson neither counts nor breaks the streak
+    assert (first["lessons"], first["attended"], first["excused"]) == (7, 5, 1)
+    assert first["rate"] == round(5 / 6, 4)
+    assert (first["current_streak"], first["longest_streak"]) == (3, 3)
+    assert first["last_visit"] == dt.date(2024, 10, 14)
+    second = children[(2, 1)]
+    assert (second["current_streak"], second["longest_streak"]) == (0, 1)
+    assert (second["absence_clusters"], second["longest_absence"]) == (2, 3)
+    assert children[(3, 2)]["rate"] is None
+    assert children[(3, 2)]["last_visit"] is None
+
+    [group] = result.group_percentiles()
+    rates = [5 / 6, 1 / 6, 1.0]
+    assert group["group_id"] == 1 and group["children"] == 3
+    for name, value in group["percentiles"].items():
+        assert value == round(float(np.percentile(rates, int(name[1:]))), 4)
+
+
+def test_load_visits_with_one_query(app, statements) -> None:
+    location = Location(address="Main street 1")
+    group = Group(name="Piano", location=location, **CREATED)
+    lessons = [
+        Lesson(
+            state=state,
+            group=group,
+            location=location,
+            start_datetime_utc=NOW + dt.timedelta(weeks=week),
+            start_timezone=0,
+            end_datetime_utc=NOW + dt.timedelta(weeks=week, hours=1),
+            end_timezone=0,
+            **CREATED,
+        )
+        for week, state in enumerate(
+            [VisitRoles.PASSED, VisitRoles.CANCELED, VisitRoles.PASSED, VisitRoles.PASSED]
+        )
+    ]
+    client = Client(
+        name="Parent",
+        child_name="Child",
+        address="Street",
+        phone="123",
+        childs_birthday=dt.date(2018, 1, 1),
+        **CREATED,
+    )
+    price = Price(
+        type_=1, value=100.0, start_datetime_utc=NOW, start_timezone=0, end_timezone=0, **CREATED
+    )
+    subscription = Subscription(total_visits=8, full_price=price, client=client, **CREATED)
+    # participation ends before the last lesson
+    participation = ClientParticipant(
+        group=group,
+        client=client,
+        start_date=NOW.date(),
+        end_date=NOW.date() + dt.timedelta(weeks=2),
+        **CREATED,
+    )
+    visits = [
+        Visitor(state=VisitRoles.PRESENT, lesson=lessons[0], subscription=subscription, **CREATED),
+        Visitor(state=VisitRoles.PRESENT, lesson=lessons[3], subscription=subscription, **CREATED),
+    ]
+    db.session.add_all([participation, *visits])
+    db.session.commit()
+    statements.clear()
+
+    visits = load_visits(NOW.date(), NOW.date() + dt.timedelta(weeks=4))
+    assert len(statements) == 1
+    assert visits.outcome.tolist() == [ATTENDED, ABSENT]
+    assert visits.day.tolist() == [NOW.date(), NOW.date() + dt.timedelta(weeks=2)]
+    assert len(load_visits(NOW.date(), NOW.date(), group_ids=[group.id_ + 1])) == 0
+
+
+def test_planned_lessons_count_once_attendance_is_recorded(app) -> None:
+    location = Location(address="Main street 1")
+    group = Group(name="Piano", location=location, **CREATED)
+    lessons = [
+        Lesson(
+            state=VisitRoles.PLANED,
+            group=group,
+            location=location,
+            start_datetime_utc=NOW + dt.timedelta(weeks=week),
+            start_timezone=0,
+            end_datetime_utc=NOW + dt.timedelta(weeks=week, hours=1),
+            end_timezone=0,
+            **CREATED,
+        )
+        for week in range(4)
+    ]
+    client = Client(
+        name="Parent",
+        child_name="Child",
+        address="Street",
+        phone="123",
+        childs_birthday=dt.date(2018, 1, 1),
+        **CREATED,
+    )
+    price = Price(
+        type_=1, value=100.0, start_datetime_utc=NOW, start_timezone=0, end_timezone=0, **CREATED
+    )
+    subscription = Subscription(total_visits=8, full_price=price, client=client, **CREATED)
+    participation = ClientParticipant(
+        group=group,
+        client=client,
+        start_date=NOW.date(),
+        end_date=NOW.date() + dt.timedelta(weeks=4),
+        **CREATED,
+    )
+    user = User(username="teacher", email="teacher@example.com", password="", **CREATED)
+    # first lesson with the child, second with the teacher only, the others
+    # haven't been recorded yet
+    rows = [
+        Visitor(state=VisitRoles.PRESENT, lesson=lessons[0], subscription=subscription, **CREATED),
+        Teacher(state=VisitRoles.PRESENT, lesson=lessons[1], user=user, **CREATED),
+    ]
+    db.session.add_all([participation, *rows])
+    db.session.commit()
+
+    visits = load_visits(NOW.date(), NOW.date() + dt.timedelta(weeks=4))
+    assert visits.outcome.tolist() == [ATTENDED, ABSENT]
+    [child] = AttendanceAnalytics(visits).children()
+    assert (child["rate"], child["longest_absence"]) == (0.5, 1)
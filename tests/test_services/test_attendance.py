@@ -0,0 +1,173 @@
+import datetime as dt
+
+import pytest
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Client,
+    Group,
+    Lesson,
+    Location,
+    Price,
+    Subscription,
+    Teacher,
+    User,
+    Visitor,
+)
+from attendance_logger.models.models import VisitRoles
+from attendance_logger.schemes.lessons_v1 import LessonAttendance
+from attendance_logger.services.attendance import AttendanceError, apply_attendance
+
+NOW = dt.datetime(2024, 9, 2, 10)
+CREATED = {"created_datetime": NOW, "created_timezone": 0}
+
+
+@pytest.fixture
+def week(app) -> dict:
+    """Five daily lessons, 30 clients with a subscription and two users"""
+    location = Location(address="Main street 1")
+    group = Group(name="Piano", location=location, **CREATED)
+    lessons = [
+        Lesson(
+            state=VisitRoles.PLANED,
+            group=group,
+            location=location,
+            start_datetime_utc=NOW + dt.timedelta(days=day),
+            start_timezone=0,
+            end_datetime_utc=NOW + dt.timedelta(days=day, hours=1),
+            end_timezone=0,
+            **CREATED,
+        )
+        for day in range(5)
+    ]
+    price = Price(
+        type_=1, value=100.0, start_datetime_utc=NOW, start_timezone=0, end_timezone=0, **CREATED
+    )
+    clients = [
+        Client(
+            name="Parent",
+            child_name=f"Child {number}",
+            address="Street",
+            phone="123",
+            childs_birthday=dt.date(2018, 1, 1),
+            **CREATED,
+        )
+        for number in range(30)
+    ]
+    subscriptions = [
+        Subscription(
+            total_visits=4,
+            full_price=price,
+            client=client,
+            start_date=dt.date(2024, 9, 1),
+            end_date=dt.date(2024, 9, 30),
+            **CREATED,
+        )
+        for client in clients
+    ]
+    users = [
+        User(username=f"teacher{number}", password="", email=f"t{number}@example.com", **CREATED)
+        for number in range(2)
+    ]
+    db.session.add_all([*lessons, *subscriptions, *users])
+    db.session.commit()
+    data = {
+        "lessons": [lesson.id_ for lesson in lessons],
+        "clients": [client.id_ for client in clients],
+        "users": [user.id_ for user in users],
+    }
+    db.session.remove()
+    return data
+
+
+def sheet(lesson_id: int, client_ids: list[int], user_ids: list[int], state: str) -> LessonAttendance:
+    return LessonAttendance(
+        lesson_id=lesson_id,
+        visitors=[{"client_id": client_id, "state": state} for client_id in client_ids],
+        teachers=[{"user_id": user_id, "state": state} for user_id in user_ids],
+    )
+
+
+def test_week_is_written_with_constant_statements(week, statements) -> None:
+    sheets = [
+        sheet(lesson_id, week["clients"], week["users"], VisitRoles.PRESENT)
+        for lesson_id in week["lessons"][:3]
+    ]
+    statements.clear()
+    assert apply_attendance(sheets) == {"inserted": 96, "updated": 0}
+    # lessons, visitors, teachers, subscriptions, users, two inserts, two rollups
+    assert len([s for s in statements if not s.startswith(("BEGIN", "COMMIT"))]) == 9
+
+    sheets = [
+        sheet(lesson_id, week["clients"], week["users"], VisitRoles.MISSING)
+        for lesson_id in week["lessons"]
+    ]
+    statements.clear()
+    # the subscriptions still have a visit left for two more missing lessons
+    assert apply_attendance(sheets) == {"inserted": 64, "updated": 96}
+    assert len([s for s in statements if not s.startswith(("BEGIN", "COMMIT"))]) == 11
+    counts = db.session.execute(
+        db.select(Visitor.state, db.func.count()).group_by(Visitor.state)
+    ).all()
+    assert counts == [(VisitRoles.MISSING.value, 150)]
+    assert db.session.scalar(db.select(db.func.count(Teacher.id_))) == 10
+
+
+def test_open_visits_are_consumed_within_a_batch(week) -> None:
+    client_id = week["clients"][0]
+    sheets = [sheet(lesson_id, [client_id], [], VisitRoles.PRESENT) for lesson_id in week["lessons"]]
+    with pytest.raises(AttendanceError) as error:
+        apply_attendance(sheets)
+    # four visits on the subscription, the fifth lesson has none left
+    assert list(error.value.messages) == ["lessons.4.visitors.0"]
+    assert db.session.scalar(db.select(db.func.count(Visitor.id_))) == 0
+
+
+def test_updates_to_counted_states_consume_open_visits(week) -> None:
+    client_id = week["clients"][0]
+    lesson_ids = week["lessons"]
+    apply_attendance(
+        [sheet(lesson_id, [client_id], [], VisitRoles.MISSING) for lesson_id in lesson_ids]
+    )
+    with pytest.raises(AttendanceError) as error:
+        apply_attendance(
+            [sheet(lesson_id, [client_id], [], VisitRoles.PRESENT) for lesson_id in lesson_ids]
+        )
+    assert list(error.value.messages) == ["lessons.4.visitors.0"]
+    # a visit freed earlier in the batch can be used again
+    sheets = [sheet(lesson_id, [client_id], [], VisitRoles.PRESENT) for lesson_id in lesson_ids[:4]]
+    apply_attendance(sheets)
+    sheets = [
+        sheet(lesson_ids[0], [client_id], [], VisitRoles.VACATION),
+        sheet(lesson_ids[4], [client_id], [], VisitRoles.ILL),
+    ]
+    assert apply_attendance(sheets) == {"inserted": 0, "updated": 2}
+    subscription = db.session.scalar(
+        db.select(Subscription).where(Subscription.client_id == client_id)
+    )
+    assert subscription.open_visits == 0
+
+
+def test_invalid_entries_are_reported_together(week) -> None:
+    lesson_id = week["lessons"][0]
+    sheets = [
+        LessonAttendance(
+            lesson_id=lesson_id,
+            visitors=[
+                {"client_id": week["clients"][0], "state": VisitRoles.PRESENT},
+                {"client_id": week["clients"][0], "state": VisitRoles.ILL},
+                {"client_id": 999, "state": VisitRoles.PRESENT},
+            ],
+            teachers=[{"user_id": 999, "state": VisitRoles.PRESENT}],
+        ),
+        sheet(999, week["clients"], [], VisitRoles.PRESENT),
+    ]
+    with pytest.raises(AttendanceError) as error:
+        apply_attendance(sheets)
+    assert sorted(error.value.messages) == [
+        "lessons.0.teachers.0",
+        "lessons.0.visitors.1",
+        "lessons.0.visitors.2",
+        "lessons.1",
+    ]
+    assert db.session.scalar(db.select(db.func.count(Visitor.id_))) == 0
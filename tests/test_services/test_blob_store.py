@@ -0,0 +1,47 @@
+import hashlib
+import io
+import os
+import time
+
+import pytest
+
+from attendance_logger.services.blob_store import BlobStore, BlobTooLarge
+
+
+def test_identical_content_is_stored_once(tmp_path) -> None:
+    store = BlobStore(root=tmp_path)
+    store.chunk_size = 3
+    content = b"%PDF-1.7 contract"
+    first = store.put_stream(io.BytesIO(content))
+    second = store.put([content[:5], content[5:]])
+    assert first == second
+    assert first.digest == hashlib.sha256(content).hexdigest()
+    assert first.size == len(content)
+    assert b"".join(store.read(first.digest)) == content
+    assert len(list(tmp_path.glob("??/??/*"))) == 1
+    assert list((tmp_path / "incoming").iterdir()) == []
+
+
+def test_too_large_content_leaves_nothing(tmp_path) -> None:
+    store = BlobStore(root=tmp_path)
+    store.max_size = 10
+    with pytest.raises(BlobTooLarge):
+        store.put([b"x" * 6, b"x" * 6])
+    assert list(tmp_path.glob("??/??/*")) == []
+    assert list((tmp_path / "incoming").iterdir()) == []
+
+
+def test_invalid_digest(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        BlobStore(root=tmp_path).path("../../etc/passwd")
+
+
+def test_collect_garbage_keeps_referenced_and_recent_blobs(tmp_path) -> None:
+    store = BlobStore(root=tmp_path)
+    kept, orphan, recent = (store.put([content]) for content in (b"a", b"b", b"c"))
+    old = time.time() - 7200
+    for blob in (kept, orphan):
+        os.utime(store.path(blob.digest), (old, old))
+    assert store.collect_garbage({kept.digest}) == 1
+    assert store.exists(kept.digest) and store.exists(recent.digest)
+    assert not store.exists(orphan.digest)
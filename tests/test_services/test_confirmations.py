@@ -0,0 +1,36 @@
+import datetime as dt
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import EmailConfirmation
+from attendance_logger.services.confirmations import count_outstanding, purge_expired
+
+
+def add_confirmation(token: str, expired: dt.datetime | None = None) -> None:
+    db.session.add(
+        EmailConfirmation(
+            email="parent@example.com",
+            token=token,
+            created_datetime=dt.datetime.now(dt.UTC),
+            created_timezone=0,
+            expired_datetime_utc=expired,
+        )
+    )
+    db.session.commit()
+
+
+def test_expiry_is_computed_per_row(app) -> None:
+    add_confirmation("first")
+    first = db.session.scalar(db.select(EmailConfirmation))
+    now = dt.datetime.now(dt.UTC).replace(tzinfo=None)
+    assert first.expired_datetime_utc > now + dt.timedelta(minutes=119)
+
+
+def test_purge_expired_in_batches(app) -> None:
+    past = dt.datetime.now(dt.UTC) - dt.timedelta(hours=1)
+    for number in range(5):
+        add_confirmation(f"expired-{number}", expired=past)
+    add_confirmation("valid")
+    assert count_outstanding("parent@example.com") == 1
+    assert purge_expired(batch_size=2) == 5
+    tokens = db.session.scalars(db.select(EmailConfirmation.token)).all()
+    assert tokens == ["valid"]
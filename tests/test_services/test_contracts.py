@@ -1,4 +1,14 @@
-from attendance_logger.services.contracts import generate_contract_number
+import datetime as dt
+import multiprocessing
+
+from flask import Flask
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Client, Contract, ContractNumberCounter
+from attendance_logger.services.contracts import (
+    ContractNumberAllocator,
+    generate_contract_number,
+)
 
 
 def test_generate_contract_number() -> None:
@@ -12,3 +22,89 @@ def test_generate_contract_number_user_defined() -> None:
     user_defined = "asdf298ijlnasdhfoe"
     contract = generate_contract_number(user_defined=user_defined)
     assert user_defined == contract
+
+
+def test_blocks_are_reserved_once_per_block(app, statements) -> None:
+    app.config["CONTRACT_NUMBER_BLOCK_SIZE"] = 10
+    allocator = ContractNumberAllocator(app)
+    numbers = allocator.allocate(4, year=2025) + allocator.allocate(6, year=2025)
+    assert numbers == [f"2025/{value:06d}" for value in range(1, 11)]
+    # the counter row is created on first use
+    assert allocator.reservations == 1
+    statements.clear()
+    assert allocator.allocate(25, year=2025)[-1] == "2025/000035"
+    assert len([sql for sql in statements if sql.startswith("UPDATE")]) == 1
+    assert allocator.next("custom") == "custom"
+    # a second process continues after the reserved block
+    other = ContractNumberAllocator(app)
+    assert other.allocate(year=2025) == ["2025/000036"]
+    assert db.session.get(ContractNumberCounter, 2025).next_value == 46
+
+
+def test_random_mode_skips_existing_numbers(app, monkeypatch) -> None:
+    app.config["CONTRACT_NUMBER_MODE"] = "random"
+    allocator = ContractNumberAllocator(app)
+    owner = Client(
+        name="",
+        child_name="",
+        address="",
+        phone="",
+        childs_birthday=dt.date(2018, 1, 1),
+        created_datetime=dt.datetime(2025, 1, 1),
+        created_timezone=0,
+    )
+    db.session.add(
+        Contract(
+            number="2025/aaaaaaaa",
+            client=owner,
+            created_datetime=dt.datetime(2025, 1, 1),
+            created_timezone=0,
+        )
+    )
+    db.session.commit()
+    tokens = iter(["aaaaaaaa", "bbbbbbbb", "aaaaaaaa", "cccccccc"])
+    monkeypatch.setattr("secrets.token_hex", lambda _size: next(tokens))
+    assert allocator.allocate(2, year=2025) == ["2025/bbbbbbbb", "2025/cccccccc"]
+
+
+def allocate_in_process(
+    app: Flask, allocator: ContractNumberAllocator, rounds: int, results
+) -> None:
+    with app.app_context():
+        # connections of the parent stay with the parent
+        db.engine.dispose(close=False)
+        numbers = []
+        for count in range(1, rounds + 1):
+            numbers += allocator.allocate(count % 5 + 1, year=2025)
+    results.put(numbers)
+
+
+def test_processes_allocate_unique_numbers(tmp_path) -> None:
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'numbers.db'}",
+        CONTRACT_NUMBER_BLOCK_SIZE=7,
+    )
+    db.init_app(app)
+    allocator = ContractNumberAllocator(app)
+    with app.app_context():
+        db.create_all()
+        # forked workers inherit the reserved block of the parent
+        numbers = allocator.allocate(year=2025)
+    # fork shares the allocator and the app without pickling them
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [
+        context.Process(target=allocate_in_process, args=(app, allocator, 40, results))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        numbers += results.get(timeout=60)
+    for process in processes:
+        process.join()
+    with app.app_context():
+        numbers += allocator.allocate(3, year=2025)
+    assert len(numbers) == 1 + 4 * sum(count % 5 + 1 for count in range(1, 41)) + 3
+    assert len(set(numbers)) == len(numbers)
@@ -0,0 +1,36 @@
+from flask import Flask
+
+from attendance_logger.services.email_domains import DomainDeliverabilityCache
+
+
+class StubResolver:
+    def __init__(self, answers: dict[str, bool | None]) -> None:
+        self.answers = answers
+        self.calls: list[str] = []
+
+    def __call__(self, domain: str, timeout: float) -> bool | None:
+        self.calls.append(domain)
+        return self.answers.get(domain, False)
+
+
+def make_cache(resolver: StubResolver) -> DomainDeliverabilityCache:
+    app = Flask(__name__)
+    return DomainDeliverabilityCache(app, resolver=resolver)
+
+
+def test_domain_lookups_are_cached() -> None:
+    resolver = StubResolver({"example.com": True})
+    cache = make_cache(resolver)
+    assert cache.validate_email("parent@example.com") is True
+    assert cache.validate_email("teacher@EXAMPLE.com") is True
+    assert cache.validate_email("nobody@invalid.example") is False
+    assert cache.validate_email("somebody@invalid.example") is False
+    assert resolver.calls == ["example.com", "invalid.example"]
+
+
+def test_unknown_deliverability_falls_back_to_syntax() -> None:
+    resolver = StubResolver({"slow.example": None})
+    cache = make_cache(resolver)
+    assert cache.validate_email("parent@slow.example") is True
+    assert cache.validate_email("not an email") is False
+    assert cache.metrics()["unknown_total"] == 1
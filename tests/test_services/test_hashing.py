@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from attendance_logger.services.hashing import (
+    HashingService,
+    HashingPoolSaturated,
+    calibrate,
+)
+
+
+def make_service(**config) -> HashingService:
+    app = Flask(__name__)
+    app.config.update(config)
+    return HashingService(app)
+
+
+def test_hash_and_verify() -> None:
+    service = make_service(HASHING_MAX_WORKERS=1)
+    hashed = service.hash("Hello world!")
+    assert service.verify("Hello world!", hashed) is True
+    assert service.verify("Hello Wor1d!", hashed) is False
+    metrics = service.metrics()
+    assert metrics["jobs_total"] == 3
+    assert metrics["in_flight"] == 0
+    assert metrics["latency_seconds_sum"] > 0
+
+
+def test_saturated_pool_rejects_fast() -> None:
+    service = make_service(
+        HASHING_MAX_WORKERS=1, HASHING_MAX_QUEUE=0, HASHING_QUEUE_TIMEOUT=0.01
+    )
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_job() -> None:
+        started.set()
+        release.wait()
+
+    worker = threading.Thread(target=service._run, args=(blocking_job,))
+    worker.start()
+    started.wait()
+    with pytest.raises(HashingPoolSaturated):
+        service.hash("Hello world!")
+    release.set()
+    worker.join()
+    assert service.metrics()["rejected_total"] == 1
+
+
+def test_calibrate_prefers_memory_then_time() -> None:
+    # fake host: 1 ms per MiB and iteration
+    def measure(memory_cost, time_cost, parallelism, samples) -> list[float]:
+        return [memory_cost / 1024 * time_cost] * samples
+
+    result = calibrate(target_ms=150, max_memory_cost=262144, measure=measure)
+    assert result["memory_cost"] == 131072
+    assert result["time_cost"] == 1
+    result = calibrate(target_ms=150, max_memory_cost=32768, measure=measure)
+    assert result["memory_cost"] == 32768
+    assert result["time_cost"] == 4
+
+
+def test_calibrate_percentile_range() -> None:
+    def measure(memory_cost, time_cost, parallelism, samples) -> list[float]:
+        return [float(sample) for sample in range(samples)]
+
+    assert calibrate(percentile=100, samples=10, measure=measure)["latency_ms"] == 9.0
+    with pytest.raises(ValueError):
+        calibrate(percentile=0, measure=measure)
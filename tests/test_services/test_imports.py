@@ -0,0 +1,131 @@
+import datetime as dt
+import io
+
+import pytest
+from flask_jwt_extended import JWTManager, create_access_token
+
+from attendance_logger.blueprints.clients.routes_v1 import clients_bp
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Client,
+    ClientParticipant,
+    Contract,
+    Group,
+    Location,
+)
+from attendance_logger.services.contracts import ContractNumberAllocator
+from attendance_logger.services.imports import (
+    ImportFormatError,
+    ImportReport,
+    import_clients,
+)
+
+CREATED = {"created_datetime": dt.datetime(2025, 1, 1), "created_timezone": 0}
+HEADER = (
+    "name,child_name,childs_birthday,contract_number,contract_signed_on,"
+    "group,location,participation_start,participation_end\n"
+)
+
+
+@pytest.fixture
+def groups(app) -> dict[str, int]:
+    """Piano at two locations and chess at one, each ends with 2025"""
+    ContractNumberAllocator(app)
+    north = Location(name="North", address="North street 1")
+    south = Location(name="South", address="South street 1")
+    groups = {
+        "piano north": Group(name="Piano", location=north, **CREATED),
+        "piano south": Group(name="Piano", location=south, **CREATED),
+        "chess": Group(name="Chess", location=north, **CREATED),
+    }
+    for group in groups.values():
+        group.active_until = dt.date(2025, 12, 31)
+    owner = Client(
+        name="Old", child_name="Old", address="", phone="", childs_birthday=dt.date(2015, 1, 1), **CREATED
+    )
+    db.session.add_all([*groups.values(), Contract(number="C-1", client=owner, **CREATED)])
+    db.session.commit()
+    return {name: group.id_ for name, group in groups.items()}
+
+
+def test_valid_rows_are_imported_and_invalid_ones_reported(groups) -> None:
+    csv = HEADER + (
+        "Anna,Max,2018-03-01,C-2,2025-01-10,Chess,,2025-02-01,2025-06-30\n"
+        "Bert,Mia,2018-04-01,,2025-01-11,Piano,south street 1,2025-02-01,\n"
+        "Carl,Tom,not a date,,,,,,\n"
+        "Dora,Lea,2018-05-01,C-1,,,,,\n"
+        "Emil,Ben,2018-06-01,,,Piano,,2025-02-01,\n"
+        "Finn,Ida,2018-07-01,C-2,,,,,\n"
+        "Gina,Ole,2018-08-01,,,Violin,,2025-02-01,\n"
+        "Hans,Eva,2018-09-01,,,,,,\n"
+    )
+    report = import_clients(io.StringIO(csv), batch_size=3)
+    assert (report.rows, report.clients, report.contracts, report.participants) == (8, 3, 2, 2)
+    assert {error["row"]: list(error["messages"]) for error in report.errors} == {
+        3: ["childs_birthday"],
+        4: ["contract_number"],
+        5: ["group"],
+        6: ["contract_number"],
+        7: ["group"],
+    }
+    contracts = dict(
+        db.session.execute(
+            db.select(Client.name, Contract.number).join(Contract.client).where(Client.name != "Old")
+        ).all()
+    )
+    assert contracts["Anna"] == "C-2"
+    assert contracts["Bert"] == f"{dt.date.today().year}/000001"
+    participants = db.session.execute(
+        db.select(ClientParticipant.group_id, ClientParticipant.end_date).order_by(
+            ClientParticipant.id_
+        )
+    ).all()
+    assert participants == [
+        (groups["chess"], dt.date(2025, 6, 30)),
+        (groups["piano south"], dt.date(2025, 12, 31)),
+    ]
+
+
+def test_statements_per_batch_are_constant(groups, statements) -> None:
+    rows = "".join(f"Parent {index},Child {index},2018-01-01,,2025-01-01,Chess,,2025-02-01,\n" for index in range(120))
+    statements.clear()
+    report = import_clients(io.StringIO(HEADER + rows), batch_size=50)
+    assert report.clients == report.contracts == report.participants == 120
+    inserts = [sql.split("(")[0].strip() for sql in statements if sql.startswith("INSERT")]
+    # three batches, the counter row of the contract numbers is created once
+    assert inserts.count("INSERT INTO clients") == 3
+    assert inserts.count("INSERT INTO contracts") == 3
+    assert inserts.count("INSERT INTO client_participants") == 3
+
+
+def test_missing_columns(groups) -> None:
+    with pytest.raises(ImportFormatError):
+        import_clients(io.StringIO("name,child_name\nAnna,Max\n"))
+    assert db.session.scalar(db.select(db.func.count(Client.id_))) == 1
+
+
+def test_upload_endpoint(app, groups) -> None:
+    app.config["JWT_SECRET_KEY"] = "test-secret-key-with-at-least-32-bytes"
+    JWTManager(app)
+    app.register_blueprint(clients_bp)
+    token = create_access_token(identity="1", additional_claims={"lvl": 4})
+    response = app.test_client().post(
+        "/api/v1/clients/import",
+        data=(HEADER + "Anna,Max,2018-03-01,,,,,,\nBert,,2018-03-01,,,,,,\n").encode(),
+        content_type="text/csv",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert response.get_json()["clients"] == 1
+    assert response.get_json()["errors"] == [
+        {"row": 2, "messages": {"child_name": "Input should be a valid string"}}
+    ]
+
+
+def test_errors_beyond_the_limit_are_counted(groups) -> None:
+    seen = []
+    report = ImportReport(max_errors=1, on_error=lambda row, messages: seen.append(row))
+    import_clients(io.StringIO(HEADER + ",,,,,,,,\n" * 3), report)
+    assert report.rejected == 3
+    assert len(report.errors) == 1
+    assert seen == [1, 2, 3]
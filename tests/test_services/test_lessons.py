@@ -0,0 +1,102 @@
+import datetime as dt
+import time
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Group, Lesson, Location, Schedule
+from attendance_logger.services.lessons import materialize_lessons
+
+START = dt.date(2024, 9, 2)  # Monday
+CREATED = {"created_datetime": dt.datetime(2024, 9, 1), "created_timezone": 0}
+
+
+def add_groups(number: int, weekdays: tuple[int, ...] = (1, 3)) -> list[int]:
+    location = Location(address="Main street 1")
+    groups = []
+    for index in range(number):
+        schedules = [
+            Schedule(
+                weekday=weekday,
+                start_time_utc=dt.time(15),
+                start_timezone=3,
+                end_time_utc=dt.time(16),
+                end_timezone=3,
+            )
+            for weekday in weekdays
+        ]
+        groups.append(
+            Group(
+                name=f"Group {index}",
+                location=location,
+                active_from=START,
+                active_until=START + dt.timedelta(days=400),
+                schedules=schedules,
+                **CREATED,
+            )
+        )
+    db.session.add_all(groups)
+    db.session.commit()
+    return [group.id_ for group in groups]
+
+
+def lesson_starts(group_id: int) -> list[dt.datetime]:
+    return db.session.scalars(
+        db.select(Lesson.start_datetime_utc)
+        .where(Lesson.group_id == group_id)
+        .order_by(Lesson.start_datetime_utc)
+    ).all()
+
+
+def test_only_new_weeks_are_added(app) -> None:
+    [group_id] = add_groups(1)
+    result = materialize_lessons(START + dt.timedelta(days=13), start=START)
+    assert result == {"groups": 1, "inserted": 4, "deleted": 0}
+    starts = lesson_starts(group_id)
+    assert starts[:2] == [dt.datetime(2024, 9, 2, 15), dt.datetime(2024, 9, 4, 15)]
+    assert materialize_lessons(START + dt.timedelta(days=13), start=START)["inserted"] == 0
+    result = materialize_lessons(START + dt.timedelta(days=20), start=START)
+    assert result["inserted"] == 2
+    assert len(lesson_starts(group_id)) == 6
+
+
+def test_schedule_edits_are_diffed(app) -> None:
+    [group_id] = add_groups(1)
+    materialize_lessons(START + dt.timedelta(days=13), start=START)
+    group = db.session.get(Group, group_id)
+    wednesday = next(schedule for schedule in group.schedules if schedule.weekday == 3)
+    wednesday.weekday = 5
+    group.active_until = START + dt.timedelta(days=8)
+    db.session.commit()
+    kept = db.session.scalars(
+        db.select(Lesson.id_).where(Lesson.start_datetime_utc == dt.datetime(2024, 9, 2, 15))
+    ).one()
+    result = materialize_lessons(START + dt.timedelta(days=13), start=START)
+    # Mondays 2nd and 9th stay, Wednesdays are replaced by Friday the 6th
+    assert result == {"groups": 1, "inserted": 1, "deleted": 2}
+    assert lesson_starts(group_id) == [
+        dt.datetime(2024, 9, 2, 15),
+        dt.datetime(2024, 9, 6, 15),
+        dt.datetime(2024, 9, 9, 15),
+    ]
+    assert db.session.get(Lesson, kept) is not None
+
+
+def test_ended_groups_lose_their_planned_lessons(app) -> None:
+    [group_id] = add_groups(1)
+    materialize_lessons(START + dt.timedelta(days=27), start=START)
+    group = db.session.get(Group, group_id)
+    group.active_until = START + dt.timedelta(days=3)
+    db.session.commit()
+    result = materialize_lessons(START + dt.timedelta(days=27), start=START + dt.timedelta(days=7))
+    assert result == {"groups": 1, "inserted": 0, "deleted": 6}
+    assert lesson_starts(group_id) == [dt.datetime(2024, 9, 2, 15), dt.datetime(2024, 9, 4, 15)]
+    # the ended group isn't loaded again
+    result = materialize_lessons(START + dt.timedelta(days=27), start=START + dt.timedelta(days=7))
+    assert result["groups"] == 0
+
+
+def test_a_year_for_200_groups_takes_seconds(app) -> None:
+    add_groups(200)
+    started = time.perf_counter()
+    result = materialize_lessons(START + dt.timedelta(days=364), start=START)
+    assert result["inserted"] == 200 * 105
+    assert time.perf_counter() - started < 10
@@ -0,0 +1,81 @@
+import json
+import logging
+import queue
+
+import pytest
+from flask import Flask
+
+from attendance_logger.services.log_pipeline import (
+    DroppingQueueHandler,
+    LoggingPipeline,
+    parse_levels,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(self.format(record))
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = LoggingPipeline()
+    yield pipeline
+    pipeline.stop()
+
+
+def test_full_queue_drops_instead_of_blocking(monkeypatch) -> None:
+    handler = DroppingQueueHandler(queue.Queue(2))
+    logger = logging.getLogger("test.log_pipeline.drop")
+    monkeypatch.setattr(logger, "propagate", False)
+    logger.addHandler(handler)
+    try:
+        for number in range(5):
+            logger.warning("record %d", number)
+    finally:
+        logger.removeHandler(handler)
+    assert (handler.queued, handler.dropped) == (2, 3)
+    assert handler.queue.get_nowait().msg == "record 0"
+
+
+def test_drop_old_keeps_newest_records() -> None:
+    handler = DroppingQueueHandler(queue.Queue(2), overflow="drop_old")
+    for number in range(4):
+        handler.handle(logging.makeLogRecord({"msg": f"record {number}"}))
+    assert handler.dropped == 2
+    assert [handler.queue.get_nowait().msg for _ in range(2)] == ["record 2", "record 3"]
+
+
+def test_json_lines_carry_request_context(pipeline) -> None:
+    app = Flask(__name__)
+    app.config["LOG_FILE"] = ""
+    pipeline.init_app(app)
+    output = ListHandler()
+    pipeline.configure(
+        log_format="json", levels="test.log_pipeline=DEBUG", handlers=[output]
+    )
+
+    @app.get("/")
+    def index() -> str:
+        logging.getLogger("test.log_pipeline").debug("handled %s", "index")
+        return "ok"
+
+    response = app.test_client().get("/", headers={"X-Request-ID": "abc"})
+    assert response.headers["X-Request-ID"] == "abc"
+    pipeline.stop()
+    record = json.loads(output.lines[0])
+    assert record["message"] == "handled index"
+    assert record["level"] == "DEBUG"
+    assert record["request_id"] == "abc"
+    assert record["latency_ms"] >= 0
+    assert "GET / 200" in json.loads(output.lines[1])["message"]
+
+
+def test_parse_levels() -> None:
+    assert parse_levels(" a.b=debug, c=WARNING ,") == {"a.b": "DEBUG", "c": "WARNING"}
+    with pytest.raises(ValueError):
+        parse_levels("a.b")
@@ -0,0 +1,100 @@
+import smtplib
+
+import pytest
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import EmailOutbox
+from attendance_logger.models.models import OutboxStates
+from attendance_logger.services.mail_outbox import OutboxSender
+from attendance_logger.utils.communication import send_email
+
+
+class FakeSMTP:
+    """Stand-in SMTP server connection"""
+
+    def __init__(self, fail_for: tuple[str, ...] = ()) -> None:
+        self.connections = 0
+        self.fail_for = fail_for
+        self.sent: list[str] = []
+
+    def send_message(self, msg) -> None:
+        if msg["To"] in self.fail_for:
+            raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"unknown")})
+        self.sent.append(msg["To"])
+
+    def quit(self) -> None:
+        pass
+
+
+@pytest.fixture
+def smtp(app):
+    app.config.update(EMAIL_SENDER="club@example.com", EMAIL_OUTBOX_BATCH_SIZE=2)
+    return FakeSMTP(fail_for=("broken@example.com",))
+
+
+def factory(smtp: FakeSMTP):
+    def connect() -> FakeSMTP:
+        smtp.connections += 1
+        return smtp
+
+    return connect
+
+
+def test_batches_reuse_connection(app, smtp) -> None:
+    for number in range(3):
+        send_email(f"parent{number}@example.com", "Subject", "Body")
+    db.session.commit()
+    sender = OutboxSender(app, smtp_factory=factory(smtp))
+    assert sender.metrics()["queue_depth"] == 3
+    assert sender.send_batch() == 2
+    assert sender.send_batch() == 1
+    assert sender.send_batch() == 0
+    assert smtp.sent == [f"parent{number}@example.com" for number in range(3)]
+    assert smtp.connections == 1
+    assert sender.metrics()["queue_depth"] == 0
+
+
+def test_failed_message_is_retried_with_backoff(app, smtp) -> None:
+    app.config.update(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    send_email("broken@example.com", "Subject", "Body")
+    db.session.commit()
+    sender = OutboxSender(app, smtp_factory=factory(smtp))
+    assert sender.send_batch() == 1
+    message = db.session.scalar(db.select(EmailOutbox))
+    assert message.state == OutboxStates.PENDING.value
+    assert message.attempts == 1
+    # not due yet
+    assert sender.send_batch() == 0
+    message.next_attempt_utc = message.created_datetime
+    db.session.commit()
+    assert sender.send_batch() == 1
+    assert message.state == OutboxStates.FAILED.value
+    assert sender.metrics()["failed_total"] == 1
+
+
+def test_unreachable_server_is_polled(app, smtp, monkeypatch) -> None:
+    app.config.update(EMAIL_OUTBOX_POLL_INTERVAL=0)
+    for number in range(3):
+        send_email(f"parent{number}@example.com", "Subject", "Body")
+    db.session.commit()
+    connections = []
+
+    def unreachable() -> FakeSMTP:
+        connections.append(len(polls))
+        raise OSError("Connection refused")
+
+    sender = OutboxSender(app, smtp_factory=unreachable)
+    polls = []
+
+    def wait(timeout: float) -> None:
+        polls.append(timeout)
+        if len(polls) == 3:
+            sender._stop.set()
+
+    monkeypatch.setattr(sender._wake, "wait", wait)
+    sender.run()
+    assert connections == [0, 1, 2]
+    messages = db.session.scalars(db.select(EmailOutbox)).all()
+    assert [message.attempts for message in messages] == [0, 0, 0]
+    assert messages[0].last_error == "Connection refused"
+    assert sender.metrics()["queue_depth"] == 3
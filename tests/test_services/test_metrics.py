@@ -0,0 +1,42 @@
+from attendance_logger.models.database import db
+from attendance_logger.services.metrics import Histogram, Metrics
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    histogram = Histogram((0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+    assert histogram.count == 4
+
+
+def test_requests_are_recorded_with_db_queries(app) -> None:
+    metrics = Metrics(app)
+
+    @app.get("/two-queries")
+    def two_queries() -> str:
+        db.session.execute(db.select(1))
+        db.session.execute(db.select(2))
+        return "ok"
+
+    client = app.test_client()
+    client.get("/two-queries")
+    client.get("/missing")
+    text = metrics.render()
+    assert (
+        'http_request_duration_seconds_count{endpoint="two_queries",method="GET"} 1'
+        in text
+    )
+    assert (
+        'http_request_db_queries_bucket{endpoint="two_queries",method="GET",le="2"} 1'
+        in text
+    )
+    assert (
+        'http_request_db_queries_bucket{endpoint="two_queries",method="GET",le="1"} 0'
+        in text
+    )
+    assert (
+        'http_responses_total{endpoint="unmatched",method="GET",status="404"} 1'
+        in text
+    )
+    assert "db_pool_checkouts_total" in text
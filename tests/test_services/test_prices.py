@@ -0,0 +1,113 @@
+import datetime as dt
+import json
+import random
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Price
+from attendance_logger.services.prices import AppliedPrice, PriceIndex
+
+
+def add_price(
+    category: int, value: float, start: dt.datetime, end: dt.datetime | None = None
+) -> int:
+    price = Price(
+        type_=category,
+        value=value,
+        start_datetime_utc=start,
+        start_timezone=0,
+        end_datetime_utc=end,
+        end_timezone=0,
+        created_datetime=dt.datetime(2025, 1, 1),
+        created_timezone=0,
+    )
+    db.session.add(price)
+    db.session.commit()
+    return price.id_
+
+
+def test_latest_start_applies_where_ranges_overlap(app) -> None:
+    index = PriceIndex(app)
+    base = add_price(1, 100, dt.datetime(2025, 1, 1))
+    promotion = add_price(1, 80, dt.datetime(2025, 2, 1), dt.datetime(2025, 2, 15))
+    assert index.resolve_many(
+        [
+            (1, dt.datetime(2024, 12, 31)),
+            (1, dt.datetime(2025, 1, 20)),
+            (1, dt.datetime(2025, 2, 1)),
+            (1, dt.datetime(2025, 2, 15)),
+            (2, dt.datetime(2025, 2, 1)),
+        ]
+    ) == [
+        None,
+        AppliedPrice(base, 100),
+        AppliedPrice(promotion, 80),
+        AppliedPrice(base, 100),
+        None,
+    ]
+    aware = dt.datetime(2025, 2, 1, 3, tzinfo=dt.timezone(dt.timedelta(hours=5)))
+    assert index.resolve(1, aware) == AppliedPrice(base, 100)
+
+
+def test_resolve_matches_a_scan_of_all_prices(app) -> None:
+    index = PriceIndex(app)
+    generator = random.Random(7)
+    origin = dt.datetime(2025, 1, 1)
+    for _ in range(60):
+        start = origin + dt.timedelta(days=generator.randrange(100))
+        end = (
+            None
+            if generator.random() < 0.2
+            else start + dt.timedelta(days=generator.randrange(1, 30))
+        )
+        add_price(generator.randrange(1, 4), generator.randrange(50, 150), start, end)
+    prices = db.session.scalars(db.select(Price)).all()
+    pairs = [
+        (generator.randrange(1, 4), origin + dt.timedelta(hours=generator.randrange(3000)))
+        for _ in range(500)
+    ]
+
+    def scan(category: int, moment: dt.datetime) -> AppliedPrice | None:
+        covering = [
+            price
+            for price in prices
+            if price.type_ == category
+            and price.start_datetime_utc <= moment
+            and (price.end_datetime_utc is None or moment < price.end_datetime_utc)
+        ]
+        if not covering:
+            return None
+        price = max(covering, key=lambda price: (price.start_datetime_utc, price.id_))
+        return AppliedPrice(price.id_, price.value)
+
+    assert index.resolve_many(pairs) == [scan(*pair) for pair in pairs]
+
+
+def test_index_is_cached_until_prices_change(app, statements) -> None:
+    index = PriceIndex(app)
+    add_price(1, 100, dt.datetime(2025, 1, 1))
+    moment = dt.datetime(2025, 3, 1)
+    assert index.resolve(1, moment).value == 100
+    statements.clear()
+    assert index.resolve(1, moment).value == 100
+    assert json.loads(index.listing())["items"][0]["value"] == 100
+    assert statements == []
+
+    add_price(1, 120, dt.datetime(2025, 2, 1))
+    assert index.resolve(1, moment).value == 120
+    db.session.execute(db.update(Price).values(value=130))
+    db.session.commit()
+    assert index.resolve(1, moment).value == 130
+    assert index.builds == 3
+
+
+def test_ttl_bounds_staleness(app) -> None:
+    now = [0.0]
+    index = PriceIndex(clock=lambda: now[0])
+    index.init_app(app)
+    add_price(1, 100, dt.datetime(2025, 1, 1))
+    assert json.loads(index.listing())["items"][0]["category"] == 1
+    # a change by another process doesn't invalidate this one
+    index.builds = 0
+    now[0] += index.ttl + 1
+    index.listing()
+    assert index.builds == 1
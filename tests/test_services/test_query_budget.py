@@ -0,0 +1,83 @@
+import datetime as dt
+
+import pytest
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import User, UserRole
+from attendance_logger.services.query_budget import (
+    QueryBudgetExceeded,
+    QueryInspector,
+    query_budget,
+    statement_shape,
+    track_queries,
+)
+
+
+def add_users(number: int) -> None:
+    role = UserRole(name="user")
+    for index in range(number):
+        db.session.add(
+            User(
+                username=f"user{index}",
+                email=f"user{index}@example.com",
+                password="hash",
+                created_datetime=dt.datetime.now(dt.UTC),
+                created_timezone=0,
+                roles=[role],
+            )
+        )
+    db.session.commit()
+    db.session.remove()
+
+
+def role_names() -> list[list[str]]:
+    users = db.session.scalars(db.select(User)).all()
+    return [[role.name for role in user.roles] for user in users]
+
+
+def test_statement_shape_ignores_in_list_length() -> None:
+    assert statement_shape("SELECT a FROM t WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT a FROM t\n WHERE id IN (?, ?)"
+    )
+
+
+def test_repeated_lazy_loads_are_detected(app) -> None:
+    add_users(6)
+    with track_queries(repeat_threshold=5) as log:
+        role_names()
+    assert log.count == 7
+    [(shape, count)] = log.repeated().items()
+    assert count == 6
+    assert "user_roles" in shape
+    [problem] = log.problems("role_names")
+    assert "N+1" in problem
+    assert "in role_names" in problem
+
+
+def test_budget_is_enforced_in_raise_mode(app) -> None:
+    app.config["QUERY_BUDGET_MODE"] = "raise"
+    QueryInspector(app)
+    add_users(2)
+    budgeted = query_budget(2)(role_names)
+    assert budgeted.query_budget == 2
+    with pytest.raises(QueryBudgetExceeded, match="budget is 2"):
+        budgeted()
+
+
+def test_requests_warn_about_repeats(app, caplog) -> None:
+    app.config.update(QUERY_BUDGET_MODE="warn", QUERY_REPEAT_THRESHOLD=3)
+    QueryInspector(app)
+    add_users(3)
+
+    @app.get("/roles")
+    def roles() -> dict:
+        return {"roles": role_names()}
+
+    assert app.test_client().get("/roles").status_code == 200
+    assert "GET /roles executed the same statement 3 times" in caplog.text
+
+
+def test_off_mode_does_not_track(app) -> None:
+    QueryInspector(app)
+    add_users(1)
+    assert query_budget(0)(role_names)() == [["user"]]
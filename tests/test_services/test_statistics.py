@@ -0,0 +1,220 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Client,
+    Group,
+    Lesson,
+    LessonRollup,
+    Location,
+    Price,
+    Schedule,
+    Subscription,
+    Teacher,
+    TeacherRollup,
+    User,
+    Visitor,
+    VisitorRollup,
+)
+from attendance_logger.models.models import VisitRoles
+from attendance_logger.schemes.lessons_v1 import LessonAttendance
+from attendance_logger.services import statistics
+from attendance_logger.services.attendance import apply_attendance
+from attendance_logger.services.lessons import materialize_lessons
+
+NOW = dt.datetime(2024, 9, 2, 10)
+CREATED = {"created_datetime": NOW, "created_timezone": 0}
+
+
+@pytest.fixture
+def rollups(app):
+    statistics.listen()
+    yield
+    event.remove(Session, "after_flush", statistics._after_flush)
+
+
+def snapshot() -> dict:
+    return {
+        model.__tablename__: sorted(
+            tuple(row)
+            for row in db.session.execute(
+                db.select(*model.__table__.primary_key.columns, model.count).where(
+                    model.count != 0
+                )
+            )
+        )
+        for model in (LessonRollup, VisitorRollup, TeacherRollup)
+    }
+
+
+def assert_matches_rebuild() -> dict:
+    incremental = snapshot()
+    statistics.rebuild_rollups()
+    assert snapshot() == incremental
+    return incremental
+
+
+def add_lesson(group: Group, start: dt.datetime) -> Lesson:
+    return Lesson(
+        state=VisitRoles.PLANED,
+        group=group,
+        location=group.location,
+        start_datetime_utc=start,
+        start_timezone=0,
+        end_datetime_utc=start + dt.timedelta(hours=1),
+        end_timezone=0,
+        **CREATED,
+    )
+
+
+@pytest.fixture
+def club(rollups) -> dict:
+    group = Group(name="Piano", location=Location(address="Main street 1"), **CREATED)
+    price = Price(
+        type_=1, value=100.0, start_datetime_utc=NOW, start_timezone=0, end_timezone=0, **CREATED
+    )
+    subscriptions = [
+        Subscription(
+            total_visits=8,
+            full_price=price,
+            client=Client(
+                name="Parent",
+                child_name=f"Child {number}",
+                address="Street",
+                phone="123",
+                childs_birthday=dt.date(2018, 1, 1),
+                **CREATED,
+            ),
+            start_date=dt.date(2024, 9, 1),
+            end_date=dt.date(2024, 10, 31),
+            **CREATED,
+        )
+        for number in range(3)
+    ]
+    user = User(username="teacher", password="", email="t@example.com", **CREATED)
+    db.session.add_all([group, *subscriptions, user])
+    db.session.commit()
+    return {"group": group, "subscriptions": subscriptions, "user": user}
+
+
+def test_orm_changes_update_rollups(club) -> None:
+    group, user = club["group"], club["user"]
+    lesson = add_lesson(group, NOW)
+    for subscription in club["subscriptions"]:
+        lesson.visitors.append(
+            Visitor(state=VisitRoles.PRESENT, subscription=subscription, **CREATED)
+        )
+    lesson.teachers.append(Teacher(state=VisitRoles.PRESENT, user=user, **CREATED))
+    db.session.add(lesson)
+    db.session.commit()
+    rows = assert_matches_rebuild()
+    week = dt.date(2024, 9, 2)
+    assert rows["visitor_rollups"] == [(group.id_, group.location_id, week, "present", 3)]
+
+    lesson.visitors[0].state = VisitRoles.ILL
+    lesson.state = VisitRoles.PASSED
+    db.session.commit()
+    assert_matches_rebuild()
+
+    # moving the lesson to the next week moves its visitors and teachers
+    lesson.start_datetime_utc += dt.timedelta(days=7)
+    lesson.visitors[1].state = VisitRoles.MISSING
+    db.session.delete(lesson.visitors[2])
+    db.session.commit()
+    rows = assert_matches_rebuild()
+    assert {row[2] for row in rows["visitor_rollups"]} == {week + dt.timedelta(days=7)}
+    assert rows["teacher_rollups"] == [
+        (user.id_, group.id_, group.location_id, week + dt.timedelta(days=7), "present", 1)
+    ]
+
+
+def test_bulk_writes_update_rollups(club) -> None:
+    group = club["group"]
+    group.schedules.append(
+        Schedule(
+            weekday=1,
+            start_time_utc=dt.time(10),
+            start_timezone=0,
+            end_time_utc=dt.time(11),
+            end_timezone=0,
+        )
+    )
+    group.active_from, group.active_until = dt.date(2024, 9, 1), dt.date(2024, 12, 31)
+    db.session.commit()
+    materialize_lessons(dt.date(2024, 9, 30), start=dt.date(2024, 9, 1))
+    assert_matches_rebuild()
+
+    lesson_ids = db.session.scalars(db.select(Lesson.id_).order_by(Lesson.id_)).all()
+    client_ids = [subscription.client_id for subscription in club["subscriptions"]]
+    sheets = [
+        LessonAttendance(
+            lesson_id=lesson_id,
+            visitors=[
+                {"client_id": client_id, "state": VisitRoles.PRESENT} for client_id in client_ids
+            ],
+            teachers=[{"user_id": club["user"].id_, "state": VisitRoles.PRESENT}],
+        )
+        for lesson_id in lesson_ids
+    ]
+    apply_attendance(sheets)
+    apply_attendance(sheets[:2] + [sheets[2].model_copy(update={"visitors": []})])
+    sheets[0].visitors[0].state = VisitRoles.ILL
+    apply_attendance(sheets[:1])
+    rows = assert_matches_rebuild()
+    assert sum(row[-1] for row in rows["visitor_rollups"]) == 3 * len(lesson_ids)
+
+    # a schedule change deletes the planned lessons nobody refers to
+    db.session.execute(db.delete(Visitor).where(Visitor.lesson_id != lesson_ids[0]))
+    db.session.execute(db.delete(Teacher).where(Teacher.lesson_id != lesson_ids[0]))
+    statistics.rebuild_rollups()
+    group.schedules[0].weekday = 2
+    db.session.commit()
+    result = materialize_lessons(dt.date(2024, 9, 30), start=dt.date(2024, 9, 1))
+    assert result["deleted"] == len(lesson_ids) - 1
+    assert_matches_rebuild()
+
+
+def test_statistics_read_rollups_only(club, statements) -> None:
+    group, user = club["group"], club["user"]
+    for day in (0, 1, 7):
+        lesson = add_lesson(group, NOW + dt.timedelta(days=day))
+        lesson.visitors.append(
+            Visitor(state=VisitRoles.PRESENT, subscription=club["subscriptions"][0], **CREATED)
+        )
+        lesson.teachers.append(Teacher(state=VisitRoles.PRESENT, user=user, **CREATED))
+        db.session.add(lesson)
+    db.session.commit()
+    group_id, location_id, user_id = group.id_, group.location_id, user.id_
+    statements.clear()
+    weeks = statistics.weekly(dt.date(2024, 9, 1), dt.date(2024, 9, 30), group_id=group_id)
+    assert weeks == [
+        {
+            "week": dt.date(2024, 9, 2),
+            "lessons": {"planed": 2},
+            "visitors": {"present": 2},
+            "teachers": {"present": 2},
+        },
+        {
+            "week": dt.date(2024, 9, 9),
+            "lessons": {"planed": 1},
+            "visitors": {"present": 1},
+            "teachers": {"present": 1},
+        },
+    ]
+    assert statistics.weekly(NOW.date(), NOW.date(), user_id=user_id) == [
+        {"week": dt.date(2024, 9, 2), "lessons": {}, "visitors": {}, "teachers": {"present": 2}}
+    ]
+    assert statistics.totals("location_id", NOW.date(), NOW.date()) == [
+        {
+            "id": location_id,
+            "lessons": {"planed": 2},
+            "visitors": {"present": 2},
+            "teachers": {"present": 2},
+        }
+    ]
+    assert statements
+    assert all("_rollups" in statement for statement in statements)
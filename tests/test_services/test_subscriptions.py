@@ -0,0 +1,143 @@
+import datetime as dt
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import (
+    Client,
+    Group,
+    Lesson,
+    Location,
+    Price,
+    Subscription,
+    Visitor,
+)
+from attendance_logger.models.models import VisitRoles
+from attendance_logger.services.subscriptions import (
+    remaining_visits,
+    valid_subscriptions,
+)
+
+NOW = dt.datetime(2024, 9, 2, 10)
+CREATED = {"created_datetime": NOW, "created_timezone": 0}
+
+
+def add_subscriptions(states: list[list[str]]) -> list[int]:
+    """One subscription with 4 visits per list of visit states, the n-th visit
+    of every subscription belongs to the n-th lesson"""
+    location = Location(address="Main street 1")
+    group = Group(name="Piano", location=location, **CREATED)
+    lessons = [
+        Lesson(
+            state="done",
+            group=group,
+            location=location,
+            start_datetime_utc=NOW,
+            start_timezone=0,
+            end_datetime_utc=NOW,
+            end_timezone=0,
+            **CREATED,
+        )
+        for _ in range(max(map(len, states), default=0))
+    ]
+    price = Price(
+        type_=1, value=100.0, start_datetime_utc=NOW, start_timezone=0, end_timezone=0, **CREATED
+    )
+    subscriptions = []
+    for visit_states in states:
+        client = Client(
+            name="Parent",
+            child_name="Child",
+            address="Street",
+            phone="123",
+            childs_birthday=dt.date(2018, 1, 1),
+            **CREATED,
+        )
+        subscription = Subscription(
+            total_visits=4, full_price=price, client=client, **CREATED
+        )
+        for lesson, state in zip(lessons, visit_states):
+            subscription.visits.append(Visitor(state=state, lesson=lesson, **CREATED))
+        subscriptions.append(subscription)
+    db.session.add_all(subscriptions)
+    db.session.commit()
+    ids = [subscription.id_ for subscription in subscriptions]
+    db.session.remove()
+    return ids
+
+
+def test_open_visits_are_loaded_with_the_subscription(app, statements) -> None:
+    [first, second] = add_subscriptions(
+        [
+            [VisitRoles.PRESENT, VisitRoles.ILL, VisitRoles.VACATION],
+            [VisitRoles.PRESENT] * 4,
+        ]
+    )
+    statements.clear()
+    subscriptions = db.session.scalars(
+        db.select(Subscription).order_by(Subscription.id_)
+    ).all()
+    assert [subscription.open_visits for subscription in subscriptions] == [2, 0]
+    assert len(statements) == 1
+    open_ids = db.session.scalars(
+        db.select(Subscription.id_).where(Subscription.open_visits > 0)
+    ).all()
+    assert open_ids == [first]
+
+
+def test_remaining_visits_in_one_query(app, statements) -> None:
+    ids = add_subscriptions([[], [VisitRoles.PRESENT], [VisitRoles.MISSING]])
+    statements.clear()
+    assert remaining_visits([*ids, 999]) == dict(zip(ids, [4, 3, 4]))
+    assert len(statements) == 1
+    assert remaining_visits([]) == {}
+
+
+def test_active_matches_python_and_sql(app) -> None:
+    today = dt.date.today()
+    ids = add_subscriptions([[], [], [], []])
+    dates = [
+        (today - dt.timedelta(days=5), today + dt.timedelta(days=5), False),
+        (today - dt.timedelta(days=5), None, False),
+        (today - dt.timedelta(days=5), today - dt.timedelta(days=1), False),
+        (today - dt.timedelta(days=5), today + dt.timedelta(days=5), True),
+    ]
+    for id_, (start, end, freezed) in zip(ids, dates):
+        subscription = db.session.get(Subscription, id_)
+        subscription.start_date, subscription.end_date = start, end
+        subscription.freezed = freezed
+    db.session.commit()
+    subscriptions = db.session.scalars(db.select(Subscription)).all()
+    assert [subscription.active for subscription in subscriptions] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    active_ids = db.session.scalars(
+        db.select(Subscription.id_).where(Subscription.active_on(today))
+    ).all()
+    assert active_ids == ids[:2]
+
+
+def test_valid_subscriptions_for_many_clients(app, statements) -> None:
+    ids = add_subscriptions([[], [VisitRoles.PRESENT] * 4, []])
+    subscriptions = db.session.scalars(
+        db.select(Subscription).order_by(Subscription.id_)
+    ).all()
+    day = dt.date(2024, 9, 10)
+    # the first two subscriptions belong to one client, the used up one ends first
+    subscriptions[1].client_id = subscriptions[0].client_id
+    for subscription, end in zip(subscriptions, (30, 20, 25)):
+        subscription.start_date = dt.date(2024, 9, 1)
+        subscription.end_date = dt.date(2024, 9, end)
+    db.session.commit()
+    clients = [subscription.client_id for subscription in subscriptions]
+    statements.clear()
+    valid = valid_subscriptions(clients, day)
+    assert len(statements) == 1
+    assert {client: found.id_ for client, found in valid.items()} == {
+        clients[0]: ids[0],
+        clients[2]: ids[2],
+    }
+    ending_first = valid_subscriptions(clients[:1], day, with_open_visits=False)
+    assert ending_first[clients[0]].id_ == ids[1]
+    assert valid_subscriptions(clients, dt.date(2024, 10, 1)) == {}
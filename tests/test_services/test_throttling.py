@@ -0,0 +1,79 @@
+import threading
+
+from flask import Flask
+
+from attendance_logger.services.throttling import LoginLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_limiter(**config) -> tuple[LoginLimiter, FakeClock]:
+    app = Flask(__name__)
+    app.config.update(
+        LOGIN_LIMIT_PER_IP=100,
+        LOGIN_LIMIT_IP_WINDOW=60,
+        LOGIN_LIMIT_PER_EMAIL=3,
+        LOGIN_LIMIT_EMAIL_WINDOW=60,
+        **config,
+    )
+    clock = FakeClock()
+    return LoginLimiter(app, clock=clock), clock
+
+
+def test_email_limit_is_normalized() -> None:
+    limiter, _ = make_limiter()
+    assert limiter.hit("10.0.0.1", "Teacher@Example.com") == 0
+    assert limiter.hit("10.0.0.2", "teacher@example.com ") == 0
+    assert limiter.hit("10.0.0.3", "TEACHER@example.com") == 0
+    assert limiter.hit("10.0.0.4", "teacher@example.com") > 0
+    assert limiter.hit("10.0.0.4", "other@example.com") == 0
+    assert limiter.metrics() == {
+        "allowed_total": 4,
+        "rejected_ip_total": 0,
+        "rejected_email_total": 1,
+    }
+
+
+def test_window_slides() -> None:
+    limiter, clock = make_limiter()
+    for _ in range(3):
+        assert limiter.hit("10.0.0.1", "teacher@example.com") == 0
+    retry_after = limiter.hit("10.0.0.1", "teacher@example.com")
+    assert 0 < retry_after <= 120
+    clock.now += retry_after
+    assert limiter.hit("10.0.0.1", "teacher@example.com") == 0
+
+
+def test_sqlite_backend_is_shared(tmp_path) -> None:
+    path = str(tmp_path / "limits.sqlite")
+    first, _ = make_limiter(LOGIN_LIMIT_SQLITE_PATH=path)
+    second, _ = make_limiter(LOGIN_LIMIT_SQLITE_PATH=path)
+    for _ in range(3):
+        assert first.hit("10.0.0.1", "teacher@example.com") == 0
+    assert second.hit("10.0.0.2", "teacher@example.com") > 0
+
+
+def test_concurrent_attempts_stay_within_the_limit(tmp_path) -> None:
+    path = str(tmp_path / "limits.sqlite")
+    limiters = [make_limiter(LOGIN_LIMIT_SQLITE_PATH=path)[0] for _ in range(8)]
+    barrier = threading.Barrier(len(limiters))
+    results = []
+
+    def attempt(limiter: LoginLimiter) -> None:
+        barrier.wait()
+        results.append(limiter.hit("10.0.0.1", "teacher@example.com"))
+
+    threads = [threading.Thread(target=attempt, args=(limiter,)) for limiter in limiters]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(0) == 3
+    # rejected attempts aren't counted
+    assert limiters[0].hit("10.0.0.2", "other@example.com") == 0
@@ -0,0 +1,61 @@
+import datetime as dt
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import User, UserRole
+from attendance_logger.services.user_cache import UserCache
+
+
+def add_user(role_name: str = "employee") -> int:
+    role = UserRole(name=role_name)
+    user = User(
+        username="teacher",
+        email="teacher@example.com",
+        password="hash",
+        created_datetime=dt.datetime.now(dt.UTC),
+        created_timezone=0,
+        roles=[role],
+    )
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.id_
+    db.session.remove()
+    return user_id
+
+
+def test_cached_lookup_emits_no_queries(app, statements) -> None:
+    cache = UserCache(app)
+    user_id = add_user()
+    assert cache.load(str(user_id)).email == "teacher@example.com"
+    db.session.remove()
+    statements.clear()
+    user = cache.load(user_id)
+    assert [role.name for role in user.roles] == ["employee"]
+    assert user.is_active()
+    assert statements == []
+
+
+def test_deactivation_invalidates(app) -> None:
+    cache = UserCache(app)
+    user_id = add_user()
+    user = cache.load(user_id)
+    user.active = False
+    db.session.commit()
+    db.session.remove()
+    assert cache.load(user_id).is_active() is False
+
+
+def test_role_change_invalidates(app) -> None:
+    cache = UserCache(app)
+    user_id = add_user()
+    cache.load(user_id)
+    db.session.remove()
+    role = db.session.scalar(db.select(UserRole))
+    role.users.clear()
+    db.session.commit()
+    db.session.remove()
+    assert cache.load(user_id).roles == []
+
+
+def test_missing_user(app) -> None:
+    cache = UserCache(app)
+    assert cache.load(42) is None
@@ -1,4 +1,9 @@
-from attendance_logger.utils.auth import hash_password, check_password_hash
+from attendance_logger.utils.auth import (
+    hash_password,
+    check_password_hash,
+    build_password_hasher,
+    password_needs_rehash,
+)
 
 
 def test_check_password_hash() -> None:
@@ -12,3 +17,10 @@ def test_check_password_hash_mismatch() -> None:
     wrong_password = "Hello Wor1d!"
     hash = hash_password(password)
     assert check_password_hash(wrong_password, hash) is False
+
+
+def test_password_needs_rehash() -> None:
+    outdated = build_password_hasher(memory_cost=8192, time_cost=1).hash("Hello world!")
+    assert password_needs_rehash(outdated) is True
+    assert password_needs_rehash(hash_password("Hello world!")) is False
+    assert password_needs_rehash("not a hash") is True
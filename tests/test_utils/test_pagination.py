@@ -0,0 +1,89 @@
+import datetime as dt
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from attendance_logger.models.database import db
+from attendance_logger.models.db_models import Client
+from attendance_logger.utils.pagination import PaginationError, Paginator
+
+
+@pytest.fixture
+def clients(app) -> list[Client]:
+    app.config["SECRET_KEY"] = "test"
+    now = dt.datetime(2025, 1, 1)
+    clients = [
+        Client(
+            name=f"Parent {index % 4}",
+            child_name=f"Child {index}",
+            address="",
+            phone="",
+            childs_birthday=dt.date(2018, 1, 1 + index % 3),
+            created_datetime=now,
+            created_timezone=0,
+            changed_datetime=now,
+            changed_timezone=0,
+        )
+        for index in range(23)
+    ]
+    db.session.add_all(clients)
+    db.session.commit()
+    return clients
+
+
+@pytest.fixture
+def paginator() -> Paginator:
+    return Paginator(
+        {"id": Client.id_, "name": Client.name, "birthday": Client.childs_birthday},
+        tie_breaker=Client.id_,
+    )
+
+
+def _walk(paginator: Paginator, **args) -> list[int]:
+    ids = []
+    page = paginator.paginate(db.select(Client), MultiDict(args))
+    while True:
+        ids += [client.id_ for client in page.items]
+        if page.next_cursor is None:
+            return ids
+        page = paginator.paginate(
+            db.select(Client), MultiDict({"cursor": page.next_cursor, "limit": args["limit"]})
+        )
+
+
+def test_cursor_walks_every_item_once(clients, paginator) -> None:
+    ids = _walk(paginator, sort="-birthday,name", limit="5")
+    # ties of the last sort column are ordered by id in the same direction
+    expected = sorted(
+        clients,
+        key=lambda client: (-client.childs_birthday.toordinal(), client.name, client.id_),
+    )
+    assert ids == [client.id_ for client in expected]
+
+
+def test_page_mode_uses_offset(clients, paginator) -> None:
+    page = paginator.paginate(db.select(Client), MultiDict({"page": "2", "limit": "10"}))
+    assert page.page == 2
+    assert page.next_cursor is None
+    assert [client.id_ for client in page.items] == list(range(11, 21))
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        {"sort": "phone"},
+        {"limit": "0"},
+        {"limit": "101"},
+        {"cursor": "not a cursor"},
+    ],
+)
+def test_invalid_arguments(clients, paginator, args) -> None:
+    with pytest.raises(PaginationError):
+        paginator.paginate(db.select(Client), MultiDict(args))
+
+
+def test_tampered_cursor(clients, paginator) -> None:
+    cursor = paginator.paginate(db.select(Client), MultiDict({"limit": "5"})).next_cursor
+    payload, signature = cursor.rsplit(".", 1)
+    with pytest.raises(PaginationError):
+        paginator.paginate(db.select(Client), MultiDict({"cursor": payload + "x." + signature}))
@@ -1,4 +1,6 @@
-from attendance_logger.utils.utils import convert_naive_time_to_aware
+from werkzeug.datastructures import MultiDict
+
+from attendance_logger.utils.utils import convert_naive_time_to_aware, extract_offset_limit
 import datetime as dt
 
 
@@ -9,3 +11,10 @@ def test_convert_native_time_to_aware() -> None:
     datetime = dt.datetime(2025, 10, 15, 18, 20, tzinfo=dt.UTC)
     print(datetime)
     assert result == datetime
+
+
+def test_extract_offset_limit() -> None:
+    assert extract_offset_limit(MultiDict({"page": "3", "limit": "10"})) == (20, 10)
+    assert extract_offset_limit(MultiDict({"limit": "10"})) == (-1, 10)
+    # values that aren't integers fall back to the defaults
+    assert extract_offset_limit(MultiDict({"page": "x", "limit": "y"})) == (-1, 20)